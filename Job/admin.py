@@ -4,7 +4,7 @@ from .models import *
 
 @admin.register(JobCategory)
 class JobCategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'created_at']
+    list_display = ['name', 'slug', 'active_jobs_count', 'created_at']
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ['name']
 
@@ -0,0 +1,176 @@
+"""
+Versioned response cache for anonymous job browsing.
+
+Responses are cached under a key built from a canonical form of the query
+string and a generation counter. Any Job, JobCategory or Employer write
+bumps the generation when it commits (see Job.signals), as does any
+application write that changes a job's applications_count (see
+Job.counters). A bump makes every cached entry unreachable at once; stale
+entries then age out of the cache backend.
+"""
+import hashlib
+import threading
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+GENERATION_KEY = 'job-response-cache:generation'
+
+
+def get_cache():
+    return caches[getattr(settings, 'JOB_RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def get_generation():
+    return get_cache().get_or_set(GENERATION_KEY, 1, None)
+
+
+async def aget_generation():
+    return await get_cache().aget_or_set(GENERATION_KEY, 1, None)
+
+
+def bump_generation():
+    cache = get_cache()
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, None)
+        return 2
+
+
+def bump_generation_on_commit():
+    """
+    Bump the generation once the current transaction commits (at once
+    outside one), so no reader caches pre-commit data under the new one
+    """
+    transaction.on_commit(bump_generation)
+
+
+def _normalize_decimal(value):
+    try:
+        return format(Decimal(value).normalize(), 'f')
+    except InvalidOperation:
+        return value
+
+
+def _normalize_int(value):
+    try:
+        return str(int(value))
+    except ValueError:
+        return value
+
+
+PARAM_NORMALIZERS = {
+    'min_salary': _normalize_decimal,
+    'max_salary': _normalize_decimal,
+    'experience': _normalize_int,
+    'page': _normalize_int,
+    'search': lambda value: ' '.join(value.lower().split()),
+    'near': lambda value: ' '.join(value.lower().split()),
+    'radius': _normalize_decimal,
+    'lat': _normalize_decimal,
+    'lon': _normalize_decimal,
+    'ordering': lambda value: ','.join(part.strip() for part in value.split(',') if part.strip()),
+}
+
+
+def canonical_query(params):
+    """
+    Return a canonical query string: sorted keys, normalised values and
+    empty values dropped, so equivalent requests share one cache entry
+    """
+    items = []
+    for key in sorted(params):
+        normalize = PARAM_NORMALIZERS.get(key, str.strip)
+        for value in sorted(params.getlist(key)):
+            value = normalize(value.strip())
+            if value:
+                items.append((key, value))
+    return urlencode(items)
+
+
+class CacheStats:
+    """
+    Per-view hit/miss counters for this process
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def record(self, name, hit):
+        with self._lock:
+            self._counts[name]['hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {**counts, 'hit_rate': round(counts['hits'] / max(sum(counts.values()), 1), 4)}
+                for name, counts in self._counts.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+cache_stats = CacheStats()
+
+
+class CachedListMixin:
+    """
+    Serve anonymous list() responses from the versioned response cache, or
+    every caller's when the response does not depend on the user
+    """
+    cache_name = None
+    cache_anonymous_only = True
+
+    def get_cache_key(self, request, generation=None):
+        query = canonical_query(request.query_params)
+        digest = hashlib.md5(f'{request.get_host()}?{query}'.encode()).hexdigest()
+        return f'job-response-cache:{self.cache_name}:{generation or get_generation()}:{digest}'
+
+    def list(self, request, *args, **kwargs):
+        if self.cache_anonymous_only and request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        cache_stats.record(self.cache_name, data is not None)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, getattr(settings, 'JOB_RESPONSE_CACHE_TIMEOUT', 300))
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class AsyncCachedListMixin(CachedListMixin):
+    """
+    CachedListMixin for async views, using the cache backend's async API
+    """
+
+    async def list(self, request, *args, **kwargs):
+        if self.cache_anonymous_only and request.user.is_authenticated:
+            return await super().list(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_cache_key(request, await aget_generation())
+        data = await cache.aget(key)
+        cache_stats.record(self.cache_name, data is not None)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = await super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(key, response.data, getattr(settings, 'JOB_RESPONSE_CACHE_TIMEOUT', 300))
+        response['X-Cache'] = 'MISS'
+        return response
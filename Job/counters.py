@@ -0,0 +1,210 @@
+"""
+Denormalized counters.
+
+JobCategory.active_jobs_count and JobCategoryTypeCount are adjusted with
+F() expressions whenever a Job is created, deleted, (de)activated or moved
+to another category/job type. The application pipeline counters on Job
+(total and per status) follow JobApplication creates, status changes and
+deletes, and applications_count is mirrored to the job's JobListing row.
+Writes that bypass model signals (queryset.update, bulk_create) must apply
+the deltas themselves or call the rebuild_* functions.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import bump_generation_on_commit
+from .models import (
+    APPLICATION_STATUS_COUNT_FIELDS, Job, JobApplication, JobCategory, JobCategoryTypeCount, JobListing
+)
+
+COUNTER_FIELDS = ('category_id', 'job_type', 'is_active')
+
+
+def counter_state(job):
+    """
+    Return the (category_id, job_type) key a job counts towards, or None
+    when the job is inactive or uncategorised
+    """
+    if job is None or not job['is_active'] or job['category_id'] is None:
+        return None
+    return job['category_id'], job['job_type']
+
+
+def snapshot(instance):
+    """
+    Capture the counter fields as loaded from the database, without
+    triggering queries for deferred fields
+    """
+    values = instance.__dict__
+    if any(field not in values for field in COUNTER_FIELDS):
+        return None
+    return {field: values[field] for field in COUNTER_FIELDS}
+
+
+def _adjust(key, delta):
+    category_id, job_type = key
+    categories = JobCategory.objects.filter(pk=category_id)
+    job_types = JobCategoryTypeCount.objects.filter(category_id=category_id, job_type=job_type)
+    if delta < 0:
+        categories = categories.filter(active_jobs_count__gte=-delta)
+        job_types = job_types.filter(active_jobs_count__gte=-delta)
+
+    categories.update(active_jobs_count=F('active_jobs_count') + delta)
+    if not job_types.update(active_jobs_count=F('active_jobs_count') + delta) and delta > 0:
+        counter, created = JobCategoryTypeCount.objects.get_or_create(
+            category_id=category_id, job_type=job_type,
+            defaults={'active_jobs_count': delta}
+        )
+        if not created:
+            job_types.update(active_jobs_count=F('active_jobs_count') + delta)
+
+
+def apply_change(old, new):
+    """
+    Move a job's contribution from its old counter key to the new one
+    """
+    old_key, new_key = counter_state(old), counter_state(new)
+    if old_key == new_key:
+        return
+    with transaction.atomic():
+        if old_key:
+            _adjust(old_key, -1)
+        if new_key:
+            _adjust(new_key, 1)
+
+
+def apply_deltas(deltas):
+    """
+    Apply a {(category_id, job_type): delta} mapping in one transaction,
+    for bulk writers that already know the net change
+    """
+    with transaction.atomic():
+        for key, delta in deltas.items():
+            if delta:
+                _adjust(key, delta)
+    bump_generation_on_commit()
+
+
+def rebuild_category_counters(category_ids=None):
+    """
+    Recompute the counters from the jobs table. Returns the number of
+    categories whose stored total was wrong.
+    """
+    categories = JobCategory.objects.all()
+    if category_ids is not None:
+        categories = categories.filter(pk__in=category_ids)
+
+    jobs = Job.objects.filter(is_active=True, category__in=categories)
+    by_type = {
+        (row['category_id'], row['job_type']): row['total']
+        for row in jobs.values('category_id', 'job_type').annotate(total=Count('id')).order_by()
+    }
+    totals = Counter()
+    for (category_id, _), total in by_type.items():
+        totals[category_id] += total
+
+    repaired = 0
+    with transaction.atomic():
+        for category in categories.select_for_update().only('id', 'active_jobs_count'):
+            if category.active_jobs_count != totals[category.pk]:
+                repaired += 1
+                JobCategory.objects.filter(pk=category.pk).update(active_jobs_count=totals[category.pk])
+
+        JobCategoryTypeCount.objects.filter(category__in=categories).delete()
+        JobCategoryTypeCount.objects.bulk_create([
+            JobCategoryTypeCount(category_id=category_id, job_type=job_type, active_jobs_count=total)
+            for (category_id, job_type), total in by_type.items()
+        ])
+    if repaired:
+        bump_generation_on_commit()
+    return repaired
+
+
+def _shift(field, delta):
+    if delta < 0:
+        return Greatest(F(field) + delta, Value(0))
+    return F(field) + delta
+
+
+def application_deltas(old_status, new_status, count=1):
+    """
+    Counter deltas for ``count`` applications moving from old_status to
+    new_status (None for created / deleted)
+    """
+    deltas = Counter()
+    if old_status is None:
+        deltas['applications_count'] += count
+    if new_status is None:
+        deltas['applications_count'] -= count
+    if old_status is not None:
+        deltas[APPLICATION_STATUS_COUNT_FIELDS[old_status]] -= count
+    if new_status is not None:
+        deltas[APPLICATION_STATUS_COUNT_FIELDS[new_status]] += count
+    return deltas
+
+
+def apply_application_deltas(job_id, deltas):
+    updates = {field: _shift(field, delta) for field, delta in deltas.items() if delta}
+    if updates:
+        Job.objects.filter(pk=job_id).update(**updates)
+    if deltas.get('applications_count'):
+        JobListing.objects.filter(pk=job_id).update(applications_count=updates['applications_count'])
+        # anonymous job cards show applications_count
+        bump_generation_on_commit()
+
+
+def apply_application_transitions(transitions):
+    """
+    Apply counter deltas for many (job_id, old_status, new_status)
+    transitions, with one UPDATE per distinct set of deltas
+    """
+    by_job = {}
+    for job_id, old_status, new_status in transitions:
+        if old_status != new_status:
+            by_job.setdefault(job_id, Counter()).update(application_deltas(old_status, new_status))
+
+    jobs_by_deltas = {}
+    for job_id, deltas in by_job.items():
+        key = tuple(sorted((field, delta) for field, delta in deltas.items() if delta))
+        if key:
+            jobs_by_deltas.setdefault(key, []).append(job_id)
+    for key, job_ids in jobs_by_deltas.items():
+        updates = {field: _shift(field, delta) for field, delta in key}
+        Job.objects.filter(pk__in=job_ids).update(**updates)
+        if 'applications_count' in updates:
+            JobListing.objects.filter(pk__in=job_ids).update(applications_count=updates['applications_count'])
+    if any('applications_count' in dict(key) for key in jobs_by_deltas):
+        bump_generation_on_commit()
+
+
+def apply_application_change(job_id, old_status, new_status):
+    if old_status != new_status:
+        apply_application_deltas(job_id, application_deltas(old_status, new_status))
+
+
+def rebuild_application_counters(job_ids=None):
+    """
+    Recompute the application pipeline counters from job_applications in a
+    single UPDATE with correlated subqueries, then copy the totals to the
+    listings
+    """
+    def count_of(**filters):
+        counts = JobApplication.objects.filter(job=OuterRef('pk'), **filters).order_by()
+        counts = counts.values('job').annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    jobs, listings = Job.objects.all(), JobListing.objects.all()
+    if job_ids is not None:
+        jobs, listings = jobs.filter(pk__in=job_ids), listings.filter(pk__in=job_ids)
+    updated = jobs.update(
+        applications_count=count_of(),
+        **{field: count_of(status=status) for status, field in APPLICATION_STATUS_COUNT_FIELDS.items()}
+    )
+    listings.update(applications_count=Subquery(
+        Job.objects.filter(pk=OuterRef('pk')).values('applications_count')[:1]
+    ))
+    bump_generation_on_commit()
+    return updated
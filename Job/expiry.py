@@ -0,0 +1,87 @@
+"""
+Deadline expiry.
+
+Jobs whose deadline has passed are deactivated by expire_jobs(), which the
+``Job.tasks.expire_jobs`` task runs every JOB_EXPIRY_INTERVAL seconds (and
+``manage.py expire_jobs`` on demand). Expired jobs are taken in batches of
+JOB_EXPIRY_BATCH_SIZE, oldest deadline first, and each batch is one short
+transaction: the rows are locked (skipping rows other writers hold, where
+the database supports it), deactivated with one UPDATE, and their category
+counters and listings are adjusted in the same transaction, which also
+bumps the response cache generation. The sweep sleeps
+JOB_EXPIRY_BATCH_PAUSE seconds between batches so request writes are not
+starved.
+
+Until the next sweep, list endpoints also leave out jobs past their
+deadline (Job.listings.open_listings()).
+"""
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters, recommendations
+from .models import Job, JobListing
+
+
+def batch_size():
+    return getattr(settings, 'JOB_EXPIRY_BATCH_SIZE', 500)
+
+
+def batch_pause():
+    return getattr(settings, 'JOB_EXPIRY_BATCH_PAUSE', 0.05)
+
+
+def expired_jobs(today=None):
+    """
+    Active jobs whose deadline is before ``today``
+    """
+    return Job.objects.filter(is_active=True, deadline__lt=today or timezone.now().date())
+
+
+def expire_batch(today, size):
+    """
+    Deactivate up to ``size`` expired jobs in one transaction. Returns the
+    ids of the jobs deactivated.
+    """
+    with transaction.atomic():
+        rows = list(
+            expired_jobs(today).select_for_update(skip_locked=True)
+            .order_by('deadline', 'pk').values_list('pk', 'category_id', 'job_type')[:size]
+        )
+        if not rows:
+            return []
+        job_ids = [pk for pk, _, _ in rows]
+        now = timezone.now()
+        Job.objects.filter(pk__in=job_ids).update(is_active=False, updated_at=now)
+        JobListing.objects.filter(pk__in=job_ids).update(is_active=False, updated_at=now)
+        deltas = Counter()
+        for _, category_id, job_type in rows:
+            if category_id is not None:
+                deltas[category_id, job_type] -= 1
+        counters.apply_deltas(deltas)
+    return job_ids
+
+
+def expire_jobs(today=None, size=None, pause=None):
+    """
+    Deactivate every job whose deadline is before ``today``. Returns the
+    number of jobs deactivated.
+    """
+    today = today or timezone.now().date()
+    size = size or batch_size()
+    pause = batch_pause() if pause is None else pause
+
+    total = 0
+    while True:
+        job_ids = expire_batch(today, size)
+        for job_id in job_ids:
+            recommendations.job_removed(job_id)
+        total += len(job_ids)
+        if len(job_ids) < size:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
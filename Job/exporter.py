@@ -0,0 +1,147 @@
+"""
+Streaming export of job applications as CSV or JSONL.
+
+Rows are read with a values() projection over JobApplication joined to
+Job, JobSeeker and User, fetched through iterator(chunk_size=...) (a
+server-side cursor where the database supports one), and encoded one line
+at a time, so memory stays flat however many applications are exported.
+Under ASGI the lines are handed out as an async iterator, a chunk at a time.
+"""
+import csv
+import datetime
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+CHUNK_SIZE = 2000
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# (column name, values() lookup)
+EXPORT_FIELDS = (
+    ('application_id', 'id'),
+    ('job_id', 'job_id'),
+    ('job_title', 'job__title'),
+    ('status', 'status'),
+    ('applied_at', 'applied_at'),
+    ('reviewed_at', 'reviewed_at'),
+    ('applicant_id', 'applicant_id'),
+    ('full_name', 'applicant__full_name'),
+    ('email', 'applicant__user__email'),
+    ('phone', 'applicant__phone'),
+    ('experience_years', 'applicant__experience_years'),
+    ('skills', 'applicant__skills'),
+    ('resume', 'applicant__resume'),
+    ('linkedin_url', 'applicant__linkedin_url'),
+    ('github_url', 'applicant__github_url'),
+    ('cover_letter', 'cover_letter'),
+)
+COLUMNS = [column for column, _ in EXPORT_FIELDS]
+
+
+class _Echo:
+    """
+    File-like object whose write() hands the line back to the caller, so
+    csv.writer can encode a single row without buffering
+    """
+
+    def write(self, value):
+        return value
+
+
+def parse_boundary(value, end=False):
+    """
+    Parse a date or datetime query value. A bare date used as an upper
+    bound covers that whole day.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date "{value}"')
+        if end:
+            day += datetime.timedelta(days=1)
+        moment = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_applications(queryset, job_ids=None, statuses=None, applied_after=None, applied_before=None):
+    if job_ids:
+        queryset = queryset.filter(job_id__in=job_ids)
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    if applied_after:
+        queryset = queryset.filter(applied_at__gte=applied_after)
+    if applied_before:
+        queryset = queryset.filter(applied_at__lt=applied_before)
+    return queryset
+
+
+def iter_applications(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield one dict per application, keyed by the export column names
+    """
+    lookups = [lookup for _, lookup in EXPORT_FIELDS]
+    rows = queryset.order_by('job_id', 'id').values_list(*lookups)
+    for row in rows.iterator(chunk_size=chunk_size):
+        record = dict(zip(COLUMNS, row))
+        if record['resume']:
+            record['resume'] = default_storage.url(record['resume'])
+        yield record
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _cell(value):
+    # spreadsheets evaluate a cell starting with one of these as a formula
+    value = _text(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(records):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for record in records:
+        yield writer.writerow([_cell(record[column]) for column in COLUMNS])
+
+
+def jsonl_lines(records):
+    for record in records:
+        yield json.dumps(record, default=_text, ensure_ascii=False) + '\n'
+
+
+def export_lines(queryset, file_format, chunk_size=CHUNK_SIZE):
+    records = iter_applications(queryset, chunk_size)
+    return jsonl_lines(records) if file_format == 'jsonl' else csv_lines(records)
+
+
+async def aexport_lines(queryset, file_format, chunk_size=CHUNK_SIZE):
+    """
+    export_lines() as an async iterator. ASGI reads a sync iterator whole
+    before sending any of it; this one reads each chunk in a worker thread
+    and sends it as it comes.
+    """
+    lines = export_lines(queryset, file_format, chunk_size)
+    try:
+        while chunk := await sync_to_async(list)(islice(lines, chunk_size)):
+            for line in chunk:
+                yield line
+    finally:
+        await sync_to_async(lines.close)()
@@ -0,0 +1,134 @@
+"""
+Facet counts for the job browser.
+
+The jobs matching a request's search, area and range filters (search,
+near / lat / lon / radius / bbox, min_salary, max_salary, experience) are
+counted in one grouped query over JobListing, by category, job type,
+location and salary band together. The
+result, a "cube" of at most categories x job types x locations x bands
+rows, is cached per response cache generation and those filters, so the
+unfiltered and facet-only requests of a generation share one cube and
+need no query at all.
+
+Counts per facet are then summed from the cube in Python. The category,
+job_type and location filters are applied to every facet except their
+own, so a selected category still shows the counts of the others.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from .cache import canonical_query, get_cache, get_generation
+from .models import Job
+
+# list filters that narrow the set being counted rather than pick a facet value
+RANGE_PARAMS = ('search', 'near', 'lat', 'lon', 'radius', 'bbox', 'min_salary', 'max_salary', 'experience')
+FACETS = ('category', 'job_type', 'location', 'salary_band')
+SELECTABLE_FACETS = ('category', 'job_type', 'location')
+UNSPECIFIED_BAND = -1
+
+
+def salary_bands():
+    """
+    [(lower, upper)] salary_min bands from JOB_FACET_SALARY_BANDS
+    boundaries; the last band has no upper bound
+    """
+    bounds = [0, *getattr(settings, 'JOB_FACET_SALARY_BANDS', [50000, 100000, 200000, 300000])]
+    return list(zip(bounds, [*bounds[1:], None]))
+
+
+def band_expression():
+    whens = [When(salary_min__isnull=True, then=Value(UNSPECIFIED_BAND))]
+    for index, (_, upper) in enumerate(salary_bands()[:-1]):
+        whens.append(When(salary_min__lt=upper, then=Value(index)))
+    return Case(*whens, default=Value(len(salary_bands()) - 1), output_field=IntegerField())
+
+
+def build_cube(queryset):
+    """
+    (category_id, category_name, job_type, location, band, count) rows of
+    ``queryset``, from a single GROUP BY
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(band=band_expression())
+        .values_list('category_id', 'category_name', 'job_type', 'location', 'band')
+        .annotate(total=Count('pk'))
+    )
+    return [tuple(row) for row in rows]
+
+
+def cube_cache_key(params, today):
+    digest = hashlib.md5(canonical_query(params).encode()).hexdigest()
+    return f'job-response-cache:facet-cube:{get_generation()}:{today.isoformat()}:{digest}'
+
+
+def cached_cube(params, today, build):
+    """
+    The cube for the range filters in ``params`` (a QueryDict of
+    RANGE_PARAMS), from the cache or from ``build()``
+    """
+    cache = get_cache()
+    key = cube_cache_key(params, today)
+    cube = cache.get(key)
+    if cube is None:
+        cube = build()
+        cache.set(key, cube, getattr(settings, 'JOB_RESPONSE_CACHE_TIMEOUT', 300))
+    return cube
+
+
+def facet_counts(cube, selected, location_limit=None):
+    """
+    Facet values and counts for the jobs of ``cube``. ``selected`` maps
+    category / job_type / location to the chosen value (or None).
+    """
+    def matches(row, skip=None):
+        values = {'category': row[0], 'job_type': row[2], 'location': row[3]}
+        return all(
+            selected.get(name) is None or values[name] == selected[name]
+            for name in SELECTABLE_FACETS if name != skip
+        )
+
+    counts = {name: {} for name in FACETS}
+    labels = {}
+    total = 0
+    for row in cube:
+        category_id, category_name, job_type, location, band, count = row
+        if matches(row):
+            total += count
+            counts['salary_band'][band] = counts['salary_band'].get(band, 0) + count
+        for name, value in (('category', category_id), ('job_type', job_type), ('location', location)):
+            if value is not None and matches(row, skip=name):
+                counts[name][value] = counts[name].get(value, 0) + count
+        labels[category_id] = category_name
+
+    job_types = dict(Job.JOB_TYPE_CHOICES)
+    locations = sorted(counts['location'].items(), key=lambda item: (-item[1], item[0]))
+    bands = salary_bands()
+    return {
+        'count': total,
+        'facets': {
+            'category': [
+                {'value': value, 'label': labels[value], 'count': count}
+                for value, count in sorted(counts['category'].items(), key=lambda item: (-item[1], labels[item[0]]))
+            ],
+            'job_type': [
+                {'value': value, 'label': job_types.get(value, value), 'count': counts['job_type'][value]}
+                for value in job_types if value in counts['job_type']
+            ],
+            'location': [
+                {'value': value, 'label': value, 'count': count}
+                for value, count in locations[:location_limit]
+            ],
+            'salary_band': [
+                {
+                    'value': band,
+                    'min': bands[band][0] if band != UNSPECIFIED_BAND else None,
+                    'max': bands[band][1] if band != UNSPECIFIED_BAND else None,
+                    'count': count,
+                }
+                for band, count in sorted(counts['salary_band'].items())
+            ],
+        },
+    }
@@ -0,0 +1,271 @@
+"""
+Radius and bounding-box search over job locations.
+
+Job.location is free text. It is matched against a bundled offline
+gazetteer (Job/data/gazetteer.tsv, or JOB_GAZETTEER_PATH) when a job is
+saved, and the coordinates of the matching place are stored on the job
+and, with their geohash, on its JobListing. Locations that match no place
+("Remote") have no coordinates and are left out of area searches.
+
+Listings carry the geohash cell of their coordinates. An area search
+turns the circle or box into the cells covering it and reads the
+candidates with equality lookups on the (geohash, latitude, longitude)
+index, which SQLite plans well even without table statistics (unlike
+ranges of geohash prefixes). Candidates outside the area are dropped with
+plain arithmetic on the stored coordinates, an equirectangular distance
+off the great-circle one by a few percent at most at JOB_GEO_MAX_RADIUS_KM
+and far less closer in, so no per-row math functions run in the database.
+Distances shown to clients are great-circle distances.
+"""
+import csv
+import math
+import re
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+Place = namedtuple('Place', ['name', 'country', 'latitude', 'longitude'])
+Area = namedtuple('Area', ['origin', 'radius', 'south', 'west', 'north', 'east'])
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+# cells of 0.18 x 0.35 degrees, about 20 x 37 km at Indian latitudes
+GEOHASH_PRECISION = 4
+# larger areas match too many jobs for the cell index to help
+MAX_COVER_CELLS = 400
+
+
+def gazetteer_path():
+    return Path(getattr(settings, 'JOB_GAZETTEER_PATH', Path(__file__).parent / 'data' / 'gazetteer.tsv'))
+
+
+def place_key(text):
+    """
+    Lookup key of a place name: case, accents and punctuation dropped
+    """
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.casefold()).split())
+
+
+@lru_cache(maxsize=None)
+def gazetteer():
+    """
+    {place key: Place} for every name and alias in the gazetteer file
+    """
+    places = {}
+    with open(gazetteer_path(), encoding='utf-8', newline='') as file:
+        rows = csv.reader((line for line in file if not line.startswith('#')), delimiter='\t')
+        for name, country, latitude, longitude, aliases in rows:
+            place = Place(name, country, float(latitude), float(longitude))
+            for alias in [name, *aliases.split(',')]:
+                key = place_key(alias)
+                if key:
+                    places.setdefault(key, place)
+    return places
+
+
+def find_place(location):
+    """
+    The gazetteer place named by ``location``, or None. "Pune, Maharashtra"
+    and "Bengaluru (Hybrid)" are tried as a whole and then part by part.
+    """
+    if not location:
+        return None
+    places = gazetteer()
+    for part in [location, *re.split(r'[,(/|;]', location)]:
+        place = places.get(place_key(part))
+        if place is not None:
+            return place
+    return None
+
+
+def coordinates(location):
+    """
+    (latitude, longitude) of ``location``, or (None, None)
+    """
+    place = find_place(location)
+    if place is None:
+        return None, None
+    return place.latitude, place.longitude
+
+
+def distance_km(latitude, longitude, other_latitude, other_longitude):
+    """
+    Great-circle (haversine) distance between two points
+    """
+    lat1, lat2 = math.radians(latitude), math.radians(other_latitude)
+    dlat = lat2 - lat1
+    dlon = math.radians(other_longitude - longitude)
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _bits(precision):
+    # (latitude bits, longitude bits); geohash interleaves longitude first
+    total = 5 * precision
+    return total // 2, total - total // 2
+
+
+def cell_size(precision):
+    """
+    (height, width) in degrees of a geohash cell of ``precision``
+    """
+    lat_bits, lon_bits = _bits(precision)
+    return 180 / 2 ** lat_bits, 360 / 2 ** lon_bits
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    code, bit, value, even = [], 0, 0, True
+    while len(code) < precision:
+        value_range, point = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (value_range[0] + value_range[1]) / 2
+        value <<= 1
+        if point >= middle:
+            value |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        even = not even
+        bit += 1
+        if bit == 5:
+            code.append(GEOHASH_ALPHABET[value])
+            bit, value = 0, 0
+    return ''.join(code)
+
+
+def geohash_of(latitude, longitude):
+    if latitude is None or longitude is None:
+        return ''
+    return encode(latitude, longitude)
+
+
+def cover(south, west, north, east):
+    """
+    The geohash cells covering the box, or None when there are more than
+    MAX_COVER_CELLS (large areas are read without the cell index)
+    """
+    height, width = cell_size(GEOHASH_PRECISION)
+    lat_bits, lon_bits = _bits(GEOHASH_PRECISION)
+    rows = [min(int((value + 90) // height), 2 ** lat_bits - 1) for value in (south, north)]
+    columns = [min(int((value + 180) // width), 2 ** lon_bits - 1) for value in (west, east)]
+    if (rows[1] - rows[0] + 1) * (columns[1] - columns[0] + 1) > MAX_COVER_CELLS:
+        return None
+    return sorted(
+        encode(-90 + (row + 0.5) * height, -180 + (column + 0.5) * width)
+        for row in range(rows[0], rows[1] + 1)
+        for column in range(columns[0], columns[1] + 1)
+    )
+
+
+def default_radius():
+    return getattr(settings, 'JOB_GEO_DEFAULT_RADIUS_KM', 25)
+
+
+def max_radius():
+    return getattr(settings, 'JOB_GEO_MAX_RADIUS_KM', 200)
+
+
+def _number(params, name, low, high):
+    try:
+        value = float(params[name])
+    except ValueError:
+        raise ValidationError({name: ['A valid number is required.']})
+    if not math.isfinite(value) or not low <= value <= high:
+        raise ValidationError({name: [f'Ensure this value is between {low} and {high}.']})
+    return value
+
+
+def parse_area(params):
+    """
+    The Area of the ``near`` (a place name) or ``lat`` / ``lon`` centre
+    with ``radius`` km, and/or ``bbox`` (west,south,east,north), in
+    ``params``; None when none is given
+    """
+    origin = radius = None
+    near = params.get('near', '').strip()
+    if near:
+        place = find_place(near)
+        if place is None:
+            raise ValidationError({'near': [f'Unknown location "{near}".']})
+        origin = place.latitude, place.longitude
+    elif params.get('lat') or params.get('lon'):
+        if not (params.get('lat') and params.get('lon')):
+            raise ValidationError({'lat': ['lat and lon must be given together.']})
+        origin = _number(params, 'lat', -90, 90), _number(params, 'lon', -180, 180)
+
+    south, west, north, east = -90.0, -180.0, 90.0, 180.0
+    if origin is not None:
+        radius = _number(params, 'radius', 0, max_radius()) if params.get('radius') else default_radius()
+        height = radius / KM_PER_DEGREE
+        width = min(180.0, height / max(math.cos(math.radians(origin[0])), 1e-6))
+        south, north = max(-90.0, origin[0] - height), min(90.0, origin[0] + height)
+        west, east = max(-180.0, origin[1] - width), min(180.0, origin[1] + width)
+
+    if params.get('bbox'):
+        try:
+            box = [float(value) for value in params['bbox'].split(',')]
+        except ValueError:
+            box = []
+        if len(box) != 4 or not (-180 <= box[0] <= box[2] <= 180 and -90 <= box[1] <= box[3] <= 90):
+            raise ValidationError({'bbox': ['Expected west,south,east,north in degrees.']})
+        south, west, north, east = max(south, box[1]), max(west, box[0]), min(north, box[3]), min(east, box[2])
+    elif origin is None:
+        return None
+    return Area(origin, radius, south, west, north, east)
+
+
+def within(queryset, area):
+    """
+    The rows of a JobListing ``queryset`` inside ``area``; with a centre,
+    annotated with ``geo_distance``, which sorts by distance from it
+    """
+    if area.south > area.north or area.west > area.east:
+        return queryset.none()
+    cells = cover(area.south, area.west, area.north, area.east)
+    if cells is not None:
+        queryset = queryset.filter(geohash__in=cells)
+    queryset = queryset.filter(
+        latitude__range=(area.south, area.north), longitude__range=(area.west, area.east)
+    )
+    if area.origin is None:
+        return queryset
+    latitude, longitude = area.origin
+    # squared equirectangular distance in degrees of latitude
+    scale = math.cos(math.radians(latitude))
+    distance = ExpressionWrapper(
+        (F('latitude') - Value(latitude)) * (F('latitude') - Value(latitude))
+        + (F('longitude') - Value(longitude)) * (F('longitude') - Value(longitude)) * Value(scale * scale),
+        output_field=FloatField(),
+    )
+    return queryset.annotate(geo_distance=distance).filter(
+        geo_distance__lte=(area.radius / KM_PER_DEGREE) ** 2
+    )
+
+
+class JobLocationFilter(BaseFilterBackend):
+    """
+    Radius (``near`` or ``lat`` / ``lon``, with ``radius``) and ``bbox``
+    filters. Radius results are ordered by distance unless an explicit
+    ordering or a search is given.
+    """
+    ordering_param = 'ordering'
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        area = parse_area(request.query_params)
+        if area is None:
+            return queryset
+        queryset = within(queryset, area)
+        if area.origin is None or any(
+            request.query_params.get(param) for param in (self.ordering_param, self.search_param)
+        ):
+            return queryset
+        return queryset.order_by('geo_distance', '-created_at', '-job_id')
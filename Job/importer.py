@@ -0,0 +1,171 @@
+"""
+Streaming bulk import of job postings from CSV or JSONL.
+
+Rows are parsed one at a time from a text stream, validated with the same
+rules as JobCreateView (JobCreateUpdateSerializer) and inserted with
+bulk_create in chunks, each in its own transaction. Because bulk_create
+skips model signals, the importer updates the category counters, job
+listings, search index, skill index and response cache itself.
+"""
+import csv
+import io
+import json
+import re
+import time
+from collections import Counter
+
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from . import counters, listings, recommendations, search
+from .models import Job, JobCategory
+from .serializers import JobCreateUpdateSerializer
+
+FORMATS = ('csv', 'jsonl')
+MAX_REPORTED_ERRORS = 1000
+INVALID_TEXT_ERROR = 'Invalid UTF-8 text'
+# bytes open_text() could not decode, kept as lone surrogates
+UNDECODABLE = re.compile('[\udc80-\udcff]')
+
+
+def detect_format(name, content_type=''):
+    if name and name.lower().endswith(('.jsonl', '.ndjson')) or 'json' in (content_type or ''):
+        return 'jsonl'
+    return 'csv'
+
+
+def iter_rows(stream, format):
+    """
+    Yield (row number, dict) pairs from a text stream without reading it
+    all into memory. Malformed JSON lines and rows that are not valid UTF-8
+    yield an error string instead.
+    """
+    if format == 'jsonl':
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            if UNDECODABLE.search(line):
+                yield number, INVALID_TEXT_ERROR
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield number, f'Invalid JSON: {exc}'
+                continue
+            yield number, row if isinstance(row, dict) else 'Expected a JSON object'
+    else:
+        # header is line 1, so data rows start at 2
+        for number, row in enumerate(csv.DictReader(stream), start=2):
+            if any(UNDECODABLE.search(str(text)) for item in row.items() for text in item if text):
+                yield number, INVALID_TEXT_ERROR
+                continue
+            yield number, {key: value for key, value in row.items() if key and value not in ('', None)}
+
+
+def open_text(binary_file):
+    # undecodable bytes don't abort the import; iter_rows() reports their rows
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', errors='surrogateescape', newline='')
+
+
+class CategoryLookupField(serializers.Field):
+    """
+    Category given by id or slug, resolved from a preloaded map instead of
+    one query per row
+    """
+    default_error_messages = {'does_not_exist': 'Unknown category "{value}".'}
+
+    def __init__(self, categories, **kwargs):
+        self.categories = categories
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        category = self.categories.get(str(data).strip())
+        if category is None:
+            self.fail('does_not_exist', value=data)
+        return category
+
+    def to_representation(self, value):
+        return value.pk
+
+
+class JobImportSerializer(JobCreateUpdateSerializer):
+
+    def __init__(self, *args, categories=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['category'] = CategoryLookupField(categories, required=False, allow_null=True)
+
+
+class JobImporter:
+
+    def __init__(self, employer, batch_size=500):
+        self.employer = employer
+        self.batch_size = batch_size
+        self.categories = {}
+        for category in JobCategory.objects.all():
+            self.categories[str(category.pk)] = category
+            self.categories[category.slug] = category
+        # One serializer validates every row via run_validation()
+        self.serializer = JobImportSerializer(categories=self.categories)
+
+    def run(self, rows):
+        """
+        Import (row number, row) pairs. Returns a summary with created and
+        failed counts, rows/sec and up to MAX_REPORTED_ERRORS row errors.
+        """
+        started = time.perf_counter()
+        self.created, self.failed, self.errors = 0, 0, []
+        batch = []
+        for number, row in rows:
+            job = self.validate(number, row)
+            if job is not None:
+                batch.append((number, job))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+
+        elapsed = time.perf_counter() - started
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'rows_per_second': round((self.created + self.failed) / elapsed, 1) if elapsed else None,
+            'errors': self.errors,
+        }
+
+    def report(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'errors': errors})
+
+    def validate(self, number, row):
+        if isinstance(row, str):
+            self.report(number, {'non_field_errors': [row]})
+            return None
+        try:
+            validated_data = self.serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            self.report(number, serializers.as_serializer_error(exc))
+            return None
+        job = Job(employer=self.employer, **validated_data)
+        job.locate()
+        return job
+
+    def flush(self, batch):
+        jobs = [job for _, job in batch]
+        try:
+            with transaction.atomic():
+                Job.objects.bulk_create(jobs)
+                deltas = Counter(
+                    (job.category_id, job.job_type) for job in jobs if job.category_id is not None
+                )
+                counters.apply_deltas(deltas)
+                listings.sync_jobs([job.pk for job in jobs])
+                search.index_jobs([job.pk for job in jobs])
+        except DatabaseError as exc:
+            for number, _ in batch:
+                self.report(number, {'non_field_errors': [f'Database error: {exc}']})
+            return
+        for job in jobs:
+            recommendations.job_changed(job)
+        self.created += len(jobs)
@@ -0,0 +1,116 @@
+"""
+The JobListing read model.
+
+List endpoints page through JobListing, one row per job holding exactly
+the columns of a list card: the job's own list fields plus the employer's
+name and card logo and the category name, copied in when they change, and
+the geohash of the job's coordinates for area searches (see Job.geo).
+Pages are then read from one narrow table by its partial indexes instead
+of joining jobs, employer_profile and job_category and reading the
+description and requirements text along.
+
+Rows are written from Job, Employer and JobCategory signals and
+applications_count follows Job.counters. Writes that bypass model signals
+(queryset.update, bulk_create) must call sync_jobs(), or rebuild with
+``manage.py rebuild_job_listings``.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from account.serializers import CARD_IMAGE_WIDTH
+from account.thumbnails import select_thumbnail
+from . import geo
+from .models import Job, JobListing
+
+# Job fields copied into JobListing
+LISTED_JOB_FIELDS = (
+    'employer', 'category', 'title', 'location', 'job_type', 'salary_min', 'salary_max',
+    'experience_required', 'is_active', 'deadline', 'created_at', 'applications_count',
+    'latitude', 'longitude',
+)
+SYNCED_FIELDS = [*LISTED_JOB_FIELDS, 'employer_name', 'employer_logo', 'category_name', 'geohash', 'updated_at']
+
+
+def card_logo(employer):
+    """
+    Storage name of the logo shown on list cards, or ''
+    """
+    return select_thumbnail(employer.logo, CARD_IMAGE_WIDTH) or ''
+
+
+def listing_for(job):
+    return JobListing(
+        job_id=job.pk,
+        employer_name=job.employer.company_name,
+        employer_logo=card_logo(job.employer),
+        category_name=job.category.name if job.category_id is not None else '',
+        geohash=geo.geohash_of(job.latitude, job.longitude),
+        **{field: getattr(job, field) for field in LISTED_JOB_FIELDS}
+    )
+
+
+def _jobs():
+    return Job.objects.select_related('employer', 'category').only(
+        *LISTED_JOB_FIELDS,
+        'employer__company_name', 'employer__logo', 'employer__logo_thumbnails', 'category__name',
+    ).order_by()
+
+
+def _write(jobs):
+    JobListing.objects.bulk_create(
+        [listing_for(job) for job in jobs],
+        update_conflicts=True, unique_fields=['job'], update_fields=SYNCED_FIELDS,
+    )
+
+
+def open_listings(today=None):
+    """
+    Active listings whose deadline, if any, has not passed
+    """
+    today = today or timezone.now().date()
+    return JobListing.objects.filter(Q(deadline__isnull=True) | Q(deadline__gte=today), is_active=True)
+
+
+def sync_jobs(job_ids):
+    """
+    Insert or refresh the listings of ``job_ids`` with one upsert
+    """
+    job_ids = list(job_ids)
+    if job_ids:
+        _write(_jobs().filter(pk__in=job_ids))
+
+
+def sync_employer(employer):
+    """
+    Copy an employer's name and card logo into the listings of its jobs
+    """
+    return JobListing.objects.filter(employer_id=employer.pk).update(
+        employer_name=employer.company_name, employer_logo=card_logo(employer), updated_at=timezone.now()
+    )
+
+
+def sync_category(category):
+    return JobListing.objects.filter(category_id=category.pk).update(
+        category_name=category.name, updated_at=timezone.now()
+    )
+
+
+def rebuild_listings(batch_size=1000):
+    """
+    Refresh every listing from the jobs table, upserting ``batch_size``
+    jobs at a time in pk order, each batch in its own short transaction so
+    lists keep being served from the old rows meanwhile. Listings whose job
+    is gone are deleted last. Returns the job count.
+    """
+    total, last_pk = 0, 0
+    while True:
+        with transaction.atomic():
+            jobs = list(_jobs().filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not jobs:
+                break
+            _write(jobs)
+        total += len(jobs)
+        last_pk = jobs[-1].pk
+    JobListing.objects.exclude(job_id__in=Job.objects.values('pk')).delete()
+    return total
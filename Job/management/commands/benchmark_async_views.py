@@ -0,0 +1,103 @@
+import asyncio
+import statistics
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import User
+from account.views import AsyncProfileView, ProfileView
+from Job.models import Job
+from Job.views import (
+    AsyncJobCategoryListView, AsyncJobDetailView, AsyncJobListView, AsyncSavedJobListView,
+    JobCategoryListView, JobDetailView, JobListView, SavedJobListView,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency of the sync and async read views, "
+        "driven the way Django's ASGI handler runs them on one event loop"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and stack')
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--user', help='Email of the job seeker to authenticate as')
+
+    def endpoints(self):
+        job = Job.objects.filter(is_active=True).order_by('-id').first()
+        if job is None:
+            raise CommandError("No active jobs to benchmark against")
+        yield 'job-list', JobListView, AsyncJobListView, reverse('jobs:job-list'), {}
+        yield 'job-detail', JobDetailView, AsyncJobDetailView, reverse('jobs:job-detail', args=[job.pk]), {'pk': job.pk}
+        yield 'category-list', JobCategoryListView, AsyncJobCategoryListView, reverse('jobs:category-list'), {}
+        yield 'saved-jobs', SavedJobListView, AsyncSavedJobListView, reverse('jobs:saved-jobs'), {}
+        yield 'profile', ProfileView, AsyncProfileView, reverse('account:profile'), {}
+
+    def get_user(self, email):
+        users = User.objects.filter(user_type='job_seeker', jobseeker_profile__isnull=False)
+        user = users.filter(email=email).first() if email else users.order_by('id').first()
+        if user is None:
+            raise CommandError("No job seeker with a profile to authenticate as")
+        return user
+
+    async def drive(self, view, path, kwargs, total, concurrency):
+        """
+        Send ``total`` requests with ``concurrency`` in flight and return
+        (requests/sec, latencies in ms)
+        """
+        remaining = iter(range(total))
+        latencies = []
+
+        async def client():
+            for _ in remaining:
+                request = self.factory.get(path, HTTP_AUTHORIZATION=self.authorization)
+                start = time.perf_counter()
+                response = await view(request, **kwargs)
+                # like Django's ASGI handler, render outside the event loop
+                await sync_to_async(response.render)()
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f"{path} returned {response.status_code}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(concurrency)])
+        return total / (time.perf_counter() - start), latencies
+
+    async def run(self, endpoints, total, concurrency):
+        results = []
+        for name, sync_class, async_class, path, kwargs in endpoints:
+            # sync views are pushed through the thread-sensitive executor,
+            # exactly as Django's ASGI handler does for a sync view
+            stacks = [
+                ('sync', sync_to_async(sync_class.as_view(), thread_sensitive=True)),
+                ('async', async_class.as_view()),
+            ]
+            for stack, view in stacks:
+                await self.drive(view, path, kwargs, min(total, 20), concurrency)  # warm up
+                rps, latencies = await self.drive(view, path, kwargs, total, concurrency)
+                latencies.sort()
+                results.append((
+                    name, stack, rps,
+                    statistics.median(latencies),
+                    latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+                ))
+        await sync_to_async(close_old_connections)()
+        return results
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user'])
+        self.authorization = f'Bearer {AccessToken.for_user(user)}'
+        self.factory = RequestFactory(SERVER_NAME='localhost')
+        endpoints = list(self.endpoints())
+
+        total, concurrency = options['requests'], options['concurrency']
+        self.stdout.write(f"{total} requests per stack, {concurrency} concurrent, one event loop, as {user.email}")
+        self.stdout.write(f"{'endpoint':<16}{'stack':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, stack, rps, p50, p99 in asyncio.run(self.run(endpoints, total, concurrency)):
+            self.stdout.write(f"{name:<16}{stack:<8}{rps:>10.1f}{p50:>10.2f}{p99:>10.2f}")
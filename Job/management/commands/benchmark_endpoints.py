@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.models import Employer, JobSeeker
+from JobPortal.benchmark import TRANSPORTS, compare_results, default_scenarios, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the read endpoints in-process through the WSGI or ASGI "
+        "handler: throughput, p50/p95/p99 latency and queries per request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per endpoint first')
+        parser.add_argument('--transport', choices=TRANSPORTS, default='wsgi')
+        parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight (asgi only)')
+        parser.add_argument('--only', action='append', help='Only run the named scenario (repeatable)')
+        parser.add_argument('--seeker', help='Email of the job seeker to authenticate as')
+        parser.add_argument('--employer', help='Email of the employer to authenticate as')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+
+    def profile(self, model, email):
+        if not email:
+            return None
+        profile = model.objects.select_related('user').filter(user__email=email).first()
+        if profile is None:
+            raise CommandError(f"No {model._meta.verbose_name} with email {email}")
+        return profile
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        scenarios = default_scenarios(
+            seeker=self.profile(JobSeeker, options['seeker']),
+            employer=self.profile(Employer, options['employer']),
+        )
+        if options['only']:
+            unknown = set(options['only']) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenario: {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['only']]
+
+        self.stdout.write(
+            f"{options['requests']} requests per endpoint over {options['transport']}"
+            + (f", {options['concurrency']} concurrent" if options['transport'] == 'asgi' else '')
+        )
+        self.stdout.write(
+            f"{'endpoint':<30}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}"
+        )
+
+        def progress(name, result):
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{name:<30}{result['throughput_rps']:>9.1f}{latency['p50']:>9.2f}{latency['p95']:>9.2f}"
+                f"{latency['p99']:>9.2f}{result['queries']['mean']:>9.1f}{result['errors']:>8}"
+            )
+
+        report = run_benchmarks(
+            scenarios, requests=options['requests'], warmup=options['warmup'],
+            transport=options['transport'], concurrency=options['concurrency'], progress=progress,
+        )
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+        if baseline is not None:
+            self.stdout.write(f"\nCompared with {baseline['environment'].get('commit') or options['compare']}")
+            self.stdout.write(f"{'endpoint':<30}{'metric':<9}{'before':>10}{'after':>10}{'change':>9}")
+            for name, metric, old, new, change, regressed in compare_results(baseline, report):
+                line = f"{name:<30}{metric:<9}{old:>10.2f}{new:>10.2f}{change:>+9.1%}"
+                self.stdout.write(self.style.ERROR(line) if regressed else line)
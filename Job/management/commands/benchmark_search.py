@@ -0,0 +1,51 @@
+import statistics
+import time
+from functools import reduce
+from operator import and_, or_
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from Job.models import Job
+from Job.search import search
+from Job.views import JobListView
+
+DEFAULT_QUERIES = ['python', 'senior developer', 'remote marketing', 'data engineer pune']
+
+
+class Command(BaseCommand):
+    help = "Compare the inverted search index against the icontains SearchFilter"
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', default=DEFAULT_QUERIES)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--limit', type=int, default=10)
+
+    def icontains(self, queryset, text):
+        conditions = [
+            reduce(or_, [Q(**{f'{field}__icontains': term}) for field in JobListView.search_fields])
+            for term in text.split()
+        ]
+        return list(queryset.filter(reduce(and_, conditions)).values_list('pk', flat=True)[:self.limit])
+
+    def indexed(self, queryset, text):
+        return [job_id for job_id, _ in search(text, queryset, limit=self.limit)]
+
+    def timed(self, func, queryset, text):
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            result = func(queryset, text)
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), len(result)
+
+    def handle(self, *args, **options):
+        self.repeat, self.limit = options['repeat'], options['limit']
+        queryset = Job.objects.filter(is_active=True)
+        self.stdout.write(f"{queryset.count()} active jobs, median of {self.repeat} runs")
+        self.stdout.write(f"{'query':<30}{'icontains ms':>14}{'index ms':>12}{'speedup':>10}")
+        for text in options['queries']:
+            scan_ms, _ = self.timed(self.icontains, queryset, text)
+            index_ms, _ = self.timed(self.indexed, queryset, text)
+            speedup = scan_ms / index_ms if index_ms else float('inf')
+            self.stdout.write(f"{text:<30}{scan_ms:>14.2f}{index_ms:>12.2f}{speedup:>9.1f}x")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Job.expiry import expire_jobs
+from Job.tasks import schedule_expiry
+
+
+class Command(BaseCommand):
+    help = "Deactivate active jobs whose application deadline has passed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Jobs per UPDATE (default JOB_EXPIRY_BATCH_SIZE)')
+        parser.add_argument('--pause', type=float, help='Seconds between batches (default JOB_EXPIRY_BATCH_PAUSE)')
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Queue the recurring background sweep instead of sweeping now'
+        )
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            queued = schedule_expiry()
+            self.stdout.write(self.style.SUCCESS(
+                "Queued the deadline sweep" if queued else "A deadline sweep is already queued"
+            ))
+            return
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive")
+        total = expire_jobs(size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Deactivated {total} expired jobs"))
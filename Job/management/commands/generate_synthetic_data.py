@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Job.synthetic import CATEGORIES, SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with reproducible, skewed synthetic users, jobs, "
+        "applications and saved jobs for load tests and benchmarks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiply every size below')
+        parser.add_argument('--employers', type=int, default=100)
+        parser.add_argument('--seekers', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=len(CATEGORIES))
+        parser.add_argument('--jobs', type=int, default=10000)
+        parser.add_argument('--applications', type=int, default=50000)
+        parser.add_argument('--saved-jobs', type=int, default=20000)
+        parser.add_argument('--days', type=int, default=365, help='Spread timestamps over this many days')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='synthetic', help='Prefix of the generated emails')
+        parser.add_argument('--password', default='password123', help='Password of every generated user')
+        parser.add_argument('--skip-index', action='store_true', help='Do not rebuild the search index')
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        sizes = {
+            name: max(0, round(options[name] * scale))
+            for name in ('employers', 'seekers', 'jobs', 'applications', 'saved_jobs')
+        }
+        sizes['categories'] = options['categories']
+        if sizes['jobs'] and not (sizes['employers'] and sizes['categories']):
+            raise CommandError("Jobs need at least one employer and one category")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        def progress(label, done, total):
+            if options['verbosity'] > 1 or done == total:
+                self.stdout.write(f"{label}: {done}/{total}")
+
+        generator = SyntheticDataGenerator(
+            seed=options['seed'], days=options['days'], batch_size=options['batch_size'],
+            prefix=options['prefix'], password=options['password'], index=not options['skip_index'],
+            progress=progress, **sizes
+        )
+        started = time.perf_counter()
+        written = generator.run()
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f"{count} {name.replace('_', ' ')}" for name, count in written.items())
+        self.stdout.write(self.style.SUCCESS(f"Generated {summary} in {elapsed:.1f}s"))
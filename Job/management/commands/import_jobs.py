@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account.models import Employer
+from Job.importer import FORMATS, JobImporter, detect_format, iter_rows, open_text
+
+
+class Command(BaseCommand):
+    help = "Bulk import jobs for an employer from a CSV or JSONL file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--employer', required=True, help='Employer profile id or user email')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        employer_ref = options['employer']
+        lookup = {'pk': employer_ref} if employer_ref.isdigit() else {'user__email': employer_ref}
+        try:
+            employer = Employer.objects.get(**lookup)
+        except Employer.DoesNotExist:
+            raise CommandError(f"Employer {employer_ref} not found")
+
+        file_format = options['format'] or detect_format(options['path'])
+        importer = JobImporter(employer, batch_size=options['batch_size'])
+        with open_text(open(options['path'], 'rb')) as stream:
+            result = importer.run(iter_rows(stream, file_format))
+
+        for error in result['errors']:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} jobs, {result['failed']} failed "
+            f"({result['rows_per_second']} rows/sec)"
+        ))
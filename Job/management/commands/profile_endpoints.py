@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from JobPortal.benchmark import default_scenarios, in_process_settings, measure
+from JobPortal.profiling import make_profile_token, profiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile the read endpoints in-process with the sampling profiler and "
+        "write collapsed stacks per URL name for flamegraph.pl or speedscope"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Profiled requests per endpoint')
+        parser.add_argument('--only', action='append', help='Only run the named scenario (repeatable)')
+        parser.add_argument('--interval', type=float, help='Seconds between samples')
+        parser.add_argument('--output', help='Directory for the <url name>.folded files')
+        parser.add_argument(
+            '--token', action='store_true',
+            help='Only print an X-Profile-Token header value for profiling live requests'
+        )
+
+    def handle(self, *args, **options):
+        if options['token']:
+            self.stdout.write(make_profile_token())
+            return
+
+        scenarios = default_scenarios()
+        if options['only']:
+            unknown = set(options['only']) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenario: {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['only']]
+
+        overrides = {'PROFILER_ENABLED': True, 'PROFILER_SAMPLE_RATE': 1.0}
+        if options['interval']:
+            overrides['PROFILER_INTERVAL'] = options['interval']
+        profiles.reset()
+        with in_process_settings(**overrides):
+            for scenario in scenarios:
+                measure(scenario, options['requests'])
+
+        summary = profiles.summary()
+        self.stdout.write(f"{'url name':<36}{'requests':>9}{'samples':>9}  breakdown")
+        for name, profile in summary.items():
+            breakdown = ', '.join(f'{key} {share:.0%}' for key, share in profile['breakdown'].items())
+            self.stdout.write(f"{name:<36}{profile['requests']:>9}{profile['samples']:>9}  {breakdown}")
+
+        if options['output']:
+            directory = Path(options['output'])
+            directory.mkdir(parents=True, exist_ok=True)
+            for name in summary:
+                (directory / f"{name.replace(':', '-')}.folded").write_text(profiles.collapsed(name))
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(summary)} profiles to {directory}"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from Job.counters import rebuild_application_counters, rebuild_category_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized job counters (category totals and application pipelines)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category', type=int, action='append', dest='categories',
+            help='Only rebuild the given category id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        repaired = rebuild_category_counters(options['categories'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt job counters ({repaired} categories repaired)"))
+        jobs = rebuild_application_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt application counters for {jobs} jobs"))
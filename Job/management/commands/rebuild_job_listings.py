@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from Job.cache import bump_generation
+from Job.listings import rebuild_listings
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized job listing table read by the list endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_listings(batch_size=options['batch_size'])
+        bump_generation()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt listings for {total} jobs"))
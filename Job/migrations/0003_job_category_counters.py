@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-18 14:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    Job = apps.get_model('Job', 'Job')
+    JobCategory = apps.get_model('Job', 'JobCategory')
+    JobCategoryTypeCount = apps.get_model('Job', 'JobCategoryTypeCount')
+
+    totals = {}
+    rows = Job.objects.filter(is_active=True, category__isnull=False).values(
+        'category_id', 'job_type'
+    ).annotate(total=Count('id')).order_by()
+    for row in rows:
+        JobCategoryTypeCount.objects.create(
+            category_id=row['category_id'], job_type=row['job_type'], active_jobs_count=row['total']
+        )
+        totals[row['category_id']] = totals.get(row['category_id'], 0) + row['total']
+    for category_id, total in totals.items():
+        JobCategory.objects.filter(pk=category_id).update(active_jobs_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Job', '0002_job_jobapplication_savedjob_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobcategory',
+            name='active_jobs_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='JobCategoryTypeCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(max_length=50)),
+                ('active_jobs_count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_type_counts', to='Job.jobcategory')),
+            ],
+            options={
+                'verbose_name': 'Job Category Type Count',
+                'verbose_name_plural': 'Job Category Type Counts',
+                'db_table': 'job_category_type_count',
+                'unique_together': {('category', 'job_type')},
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
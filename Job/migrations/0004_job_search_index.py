@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 14:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Job', '0003_job_category_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchDocument',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='Job.job')),
+                ('length', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Job Search Document',
+                'verbose_name_plural': 'Job Search Documents',
+                'db_table': 'job_search_document',
+            },
+        ),
+        migrations.CreateModel(
+            name='JobSearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField(default=1)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_postings', to='Job.job')),
+            ],
+            options={
+                'verbose_name': 'Job Search Posting',
+                'verbose_name_plural': 'Job Search Postings',
+                'db_table': 'job_search_posting',
+                'unique_together': {('term', 'job')},
+            },
+        ),
+    ]
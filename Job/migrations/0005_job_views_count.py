@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Job', '0004_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 6.0 on 2026-10-18 14:13
+
+from django.db import migrations, models
+from django.db.models import Count
+
+STATUS_FIELDS = {
+    'pending': 'pending_applications_count',
+    'reviewed': 'reviewed_applications_count',
+    'shortlisted': 'shortlisted_applications_count',
+    'rejected': 'rejected_applications_count',
+    'accepted': 'accepted_applications_count',
+}
+
+
+def populate_counters(apps, schema_editor):
+    Job = apps.get_model('Job', 'Job')
+    JobApplication = apps.get_model('Job', 'JobApplication')
+
+    counts = {}
+    rows = JobApplication.objects.values('job_id', 'status').annotate(total=Count('id')).order_by()
+    for row in rows:
+        job_counts = counts.setdefault(row['job_id'], {'applications_count': 0})
+        job_counts['applications_count'] += row['total']
+        job_counts[STATUS_FIELDS[row['status']]] = row['total']
+    for job_id, job_counts in counts.items():
+        Job.objects.filter(pk=job_id).update(**job_counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Job', '0005_job_views_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='accepted_applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='pending_applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='rejected_applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='reviewed_applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='shortlisted_applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+LISTED_FIELDS = (
+    'employer_id', 'category_id', 'title', 'location', 'job_type', 'salary_min', 'salary_max',
+    'experience_required', 'is_active', 'deadline', 'created_at', 'applications_count',
+)
+
+
+def populate_listings(apps, schema_editor):
+    # Logos are copied as uploaded; ``manage.py rebuild_job_listings``
+    # switches them to the card-sized derivatives
+    Job = apps.get_model('Job', 'Job')
+    JobListing = apps.get_model('Job', 'JobListing')
+
+    rows = Job.objects.order_by().values(
+        'id', *LISTED_FIELDS, 'employer__company_name', 'employer__logo', 'category__name'
+    )
+    JobListing.objects.bulk_create([
+        JobListing(
+            job_id=row['id'],
+            employer_name=row['employer__company_name'],
+            employer_logo=row['employer__logo'] or '',
+            category_name=row['category__name'] or '',
+            **{field: row[field] for field in LISTED_FIELDS}
+        )
+        for row in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Job', '0006_job_application_counters'),
+        ('account', '0004_image_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobListing',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='Job.job')),
+                ('title', models.CharField(max_length=255)),
+                ('employer_name', models.CharField(max_length=255)),
+                ('employer_logo', models.CharField(blank=True, max_length=255)),
+                ('category_name', models.CharField(blank=True, max_length=100)),
+                ('location', models.CharField(blank=True, max_length=255, null=True)),
+                ('job_type', models.CharField(choices=[('full_time', 'Full Time'), ('part_time', 'Part Time'), ('contract', 'Contract'), ('internship', 'Internship'), ('remote', 'Remote')], max_length=50)),
+                ('salary_min', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('salary_max', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('experience_required', models.PositiveIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('deadline', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('applications_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='Job.jobcategory')),
+                ('employer', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='account.employer')),
+            ],
+            options={
+                'verbose_name': 'Job Listing',
+                'verbose_name_plural': 'Job Listings',
+                'db_table': 'job_listing',
+            },
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='listing',
+            field=models.ForeignObject(from_fields=['job'], null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='Job.joblisting', to_fields=['job']),
+        ),
+        migrations.AddField(
+            model_name='savedjob',
+            name='listing',
+            field=models.ForeignObject(from_fields=['job'], null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='Job.joblisting', to_fields=['job']),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-job'], name='job_listing_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at'], name='job_listing_category'),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['job_type', '-created_at'], name='job_listing_job_type'),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['location', '-created_at'], name='job_listing_location'),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_min', 'salary_max'], name='job_listing_salary'),
+        ),
+        migrations.AddIndex(
+            model_name='savedjob',
+            index=models.Index(fields=['user', '-saved_at'], name='saved_jobs_user_id_e21ea0_idx'),
+        ),
+        migrations.RunPython(populate_listings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Job', '0007_job_listing'),
+        ('account', '0004_image_thumbnails'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_created_22f8fb_idx',
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='jobs_active_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['deadline'], name='jobs_active_deadline'),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['deadline'], name='job_listing_deadline'),
+        ),
+    ]
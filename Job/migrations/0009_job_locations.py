@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.db import migrations, models
+
+from Job import geo
+
+
+def locate_jobs(apps, schema_editor):
+    # one UPDATE per distinct location rather than per job
+    Job = apps.get_model('Job', 'Job')
+    JobListing = apps.get_model('Job', 'JobListing')
+
+    locations = Job.objects.order_by().exclude(location=None).values_list('location', flat=True).distinct()
+    for location in list(locations):
+        latitude, longitude = geo.coordinates(location)
+        if latitude is None:
+            continue
+        Job.objects.filter(location=location).update(latitude=latitude, longitude=longitude)
+        JobListing.objects.filter(location=location).update(
+            latitude=latitude, longitude=longitude, geohash=geo.geohash_of(latitude, longitude)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Job', '0008_job_expiry_indexes'),
+        ('account', '0004_image_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='joblisting',
+            name='geohash',
+            field=models.CharField(blank=True, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='joblisting',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='joblisting',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='joblisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['geohash', 'latitude', 'longitude'], name='job_listing_geohash'),
+        ),
+        migrations.RunPython(locate_jobs, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,10 @@
-from django.db import models
-from django.db.models.fields import PositiveIntegerField
+from django.db import models, transaction
 from django.utils import timezone
 
 from account.models import Employer,User,JobSeeker
 
+from . import geo
+
 
 class JobCategory(models.Model):
     """
@@ -12,6 +13,7 @@ class JobCategory(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField(blank=True, null=True)
+    active_jobs_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -23,6 +25,37 @@ class JobCategory(models.Model):
         return self.name
 
 
+class JobCategoryTypeCount(models.Model):
+    """
+    Active job count per category and job type, maintained by Job.counters
+    """
+    category = models.ForeignKey(
+        JobCategory,
+        on_delete=models.CASCADE,
+        related_name='job_type_counts'
+    )
+    job_type = models.CharField(max_length=50)
+    active_jobs_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'job_category_type_count'
+        verbose_name = "Job Category Type Count"
+        verbose_name_plural = "Job Category Type Counts"
+        unique_together = ['category', 'job_type']
+
+    def __str__(self):
+        return f"{self.category_id} / {self.job_type}: {self.active_jobs_count}"
+
+
+APPLICATION_STATUS_COUNT_FIELDS = {
+    'pending': 'pending_applications_count',
+    'reviewed': 'reviewed_applications_count',
+    'shortlisted': 'shortlisted_applications_count',
+    'rejected': 'rejected_applications_count',
+    'accepted': 'accepted_applications_count',
+}
+
+
 class Job(models.Model):
     JOB_TYPE_CHOICES = (
         ('full_time', 'Full Time'),
@@ -46,39 +79,190 @@ class Job(models.Model):
     description = models.TextField(null=True, blank=True)
     requirements = models.TextField(null=True, blank=True)
     location = models.CharField(max_length=255, null=True, blank=True)
+    # coordinates of the gazetteer place matching location (see Job.geo)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     job_type = models.CharField(max_length=50, choices=JOB_TYPE_CHOICES)
     salary_min = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     salary_max = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     experience_required = models.PositiveIntegerField(help_text='Years of experience', default=0)
     skills_required = models.TextField(help_text="Comma-separated skills", blank=True)
-    is_active = models.BooleanField(default=True, db_index=True)
+    is_active = models.BooleanField(default=True)
     deadline = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
-    views_count = models,PositiveIntegerField(default=0)
+    views_count = models.PositiveIntegerField(default=0)
+    # Application pipeline counters, maintained by Job.counters
+    applications_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_applications_count = models.PositiveIntegerField(default=0, editable=False)
+    reviewed_applications_count = models.PositiveIntegerField(default=0, editable=False)
+    shortlisted_applications_count = models.PositiveIntegerField(default=0, editable=False)
+    rejected_applications_count = models.PositiveIntegerField(default=0, editable=False)
+    accepted_applications_count = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         db_table = 'jobs'
         verbose_name='Job'
         verbose_name_plural = 'Jobs'
         ordering = ['-created_at']
+        # Expired postings are deactivated by Job.expiry, so the partial
+        # indexes only hold live rows however many expired ones pile up
         indexes = [
-            models.Index(fields=['-created_at', 'is_active']),
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True), name='jobs_active_recent'),
+            models.Index(fields=['deadline'], condition=models.Q(is_active=True), name='jobs_active_deadline'),
             models.Index(fields=['employer', 'is_active']),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.employer.company_name}"
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'location' in update_fields:
+            self.locate()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude'}
+        # the row, its counters (Job.signals) and read models change together
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+    
+    def locate(self):
+        """
+        Set the coordinates from location; bulk_create callers call this
+        themselves
+        """
+        self.latitude, self.longitude = geo.coordinates(self.location)
+    
     @property
-    def is_deadline_passes(self):
+    def is_deadline_passed(self):
         if self.deadline:
             return timezone.now().date() >  self.deadline
         return False
     
     @property
     def application_count(self):
-        return self.application_count()
+        return self.applications_count
+    
+    @property
+    def application_pipeline(self):
+        return {
+            status: getattr(self, field)
+            for status, field in APPLICATION_STATUS_COUNT_FIELDS.items()
+        }
+
+
+class JobListing(models.Model):
+    """
+    Read model of a job's list-card columns, with the employer and category
+    names copied in so list endpoints read one narrow table. Maintained by
+    Job.listings from Job, Employer and JobCategory writes.
+    """
+    job = models.OneToOneField(
+        Job,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='listing'
+    )
+    # derived table: rows go away with their job, so no constraints here
+    employer = models.ForeignKey(
+        Employer,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    category = models.ForeignKey(
+        JobCategory,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+',
+        null=True
+    )
+    title = models.CharField(max_length=255)
+    employer_name = models.CharField(max_length=255)
+    # storage name of the card-sized logo derivative (see account.thumbnails)
+    employer_logo = models.CharField(max_length=255, blank=True)
+    category_name = models.CharField(max_length=100, blank=True)
+    location = models.CharField(max_length=255, null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # geohash cell of the coordinates, '' when there are none (see Job.geo)
+    geohash = models.CharField(max_length=12, blank=True)
+    job_type = models.CharField(max_length=50, choices=Job.JOB_TYPE_CHOICES)
+    salary_min = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    salary_max = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    experience_required = models.PositiveIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+    deadline = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    applications_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'job_listing'
+        verbose_name = 'Job Listing'
+        verbose_name_plural = 'Job Listings'
+        # List queries only read active rows; inactive ones are kept for
+        # the saved job and application lists
+        indexes = [
+            models.Index(fields=['-created_at', '-job'], condition=models.Q(is_active=True),
+                         name='job_listing_recent'),
+            models.Index(fields=['category', '-created_at'], condition=models.Q(is_active=True),
+                         name='job_listing_category'),
+            models.Index(fields=['job_type', '-created_at'], condition=models.Q(is_active=True),
+                         name='job_listing_job_type'),
+            models.Index(fields=['location', '-created_at'], condition=models.Q(is_active=True),
+                         name='job_listing_location'),
+            models.Index(fields=['salary_min', 'salary_max'], condition=models.Q(is_active=True),
+                         name='job_listing_salary'),
+            models.Index(fields=['deadline'], condition=models.Q(is_active=True),
+                         name='job_listing_deadline'),
+            models.Index(fields=['geohash', 'latitude', 'longitude'], condition=models.Q(is_active=True),
+                         name='job_listing_geohash'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.employer_name}"
+
+
+class JobSearchDocument(models.Model):
+    """
+    Per-job statistics for the inverted search index (see Job.search)
+    """
+    job = models.OneToOneField(
+        Job,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document'
+    )
+    length = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'job_search_document'
+        verbose_name = 'Job Search Document'
+        verbose_name_plural = 'Job Search Documents'
+
+
+class JobSearchPosting(models.Model):
+    """
+    Inverted index entry: a stemmed term and its weighted frequency in a job
+    """
+    term = models.CharField(max_length=64)
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name='search_postings'
+    )
+    frequency = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        db_table = 'job_search_posting'
+        verbose_name = 'Job Search Posting'
+        verbose_name_plural = 'Job Search Postings'
+        unique_together = ['term', 'job']
+
+    def __str__(self):
+        return f"{self.term} -> {self.job_id}"
 
 
 class JobApplication(models.Model):
@@ -99,6 +283,15 @@ class JobApplication(models.Model):
         on_delete=models.CASCADE,
         related_name='applications'
     )
+    # the job's JobListing row, joined on job_id without going through jobs
+    listing = models.ForeignObject(
+        JobListing,
+        on_delete=models.DO_NOTHING,
+        from_fields=['job'],
+        to_fields=['job'],
+        related_name='+',
+        null=True
+    )
     applicant = models.ForeignKey(
         JobSeeker,
         on_delete=models.CASCADE,
@@ -118,6 +311,8 @@ class JobApplication(models.Model):
         indexes = [
             models.Index(fields=['job', 'status']),
             models.Index(fields=['applicant', '-applied_at']),
+            # keyset pages of a job's applications, newest first
+            models.Index(fields=['job', '-applied_at', '-id'], name='job_applications_recent'),
         ]
     
     def __str__(self):
@@ -139,6 +334,15 @@ class SavedJob(models.Model):
         on_delete=models.CASCADE,
         related_name='saved_by'
     )
+    # the job's JobListing row, joined on job_id without going through jobs
+    listing = models.ForeignObject(
+        JobListing,
+        on_delete=models.DO_NOTHING,
+        from_fields=['job'],
+        to_fields=['job'],
+        related_name='+',
+        null=True
+    )
     saved_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -147,6 +351,9 @@ class SavedJob(models.Model):
         verbose_name_plural = 'Saved Jobs'
         ordering = ['-saved_at']
         unique_together = ['user', 'job']  # User can save a job only once
+        indexes = [
+            models.Index(fields=['user', '-saved_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} saved {self.job.title}"
\ No newline at end of file
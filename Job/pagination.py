@@ -0,0 +1,225 @@
+"""
+Page-number pagination with an opt-in keyset (cursor) mode.
+
+Views declare ``keyset_ordering`` (a unique ordering such as
+``('-created_at', '-id')``) to allow clients to request
+``?paginate=cursor`` and then follow the ``next``/``previous`` links, which
+carry an opaque ``cursor``. Keyset pages are fetched with a range filter on
+the ordering columns instead of COUNT + OFFSET, and ``count`` comes from a
+short-lived cache of the total.
+
+Async views call apaginate_queryset(), which fetches the page rows and
+the count concurrently.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    cursor_query_param = 'cursor'
+    mode_query_param = 'paginate'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = False
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering and self.wants_keyset(request) and self.is_keyset_ordered(queryset, ordering):
+            return self.paginate_keyset(queryset, request, ordering)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': self.total,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self.cursor_link(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset_mode:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        return self.cursor_link(self.first, reverse=True)
+
+    def wants_keyset(self, request):
+        return (
+            self.cursor_query_param in request.query_params or
+            request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def is_keyset_ordered(self, queryset, ordering):
+        """
+        Only paginate by keyset when the requested ordering is a prefix of the
+        keyset ordering (e.g. not for relevance-ranked search results)
+        """
+        order_by = [str(field) for field in queryset.query.order_by]
+        return order_by == list(ordering[:len(order_by)])
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for async views. The page rows and the total
+        count are independent queries and are awaited together.
+        """
+        self.keyset_mode = False
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering and self.wants_keyset(request) and self.is_keyset_ordered(queryset, ordering):
+            page, fields, values, reverse = self.keyset_page(queryset, request, ordering)
+            page_size = self.get_page_size(request)
+            rows, self.total = await asyncio.gather(
+                self.afetch(page[:page_size + 1]), self.acached_count(queryset)
+            )
+            return self.keyset_rows(rows, page_size, fields, values, reverse)
+        return await self.apaginate_page_number(queryset, request)
+
+    async def apaginate_page_number(self, queryset, request):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = int(page_number)
+        except (TypeError, ValueError):
+            number = 0
+        if number > 0:
+            bottom = (number - 1) * page_size
+            paginator.count, rows = await asyncio.gather(
+                queryset.acount(), self.afetch(queryset[bottom:bottom + page_size])
+            )
+        else:
+            # "last" (or an invalid number): the offset depends on the count
+            paginator.count, rows = await queryset.acount(), None
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        if rows is None:
+            rows = await self.afetch(self.page.object_list)
+        self.page.object_list = rows
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return rows
+
+    async def afetch(self, queryset):
+        return [row async for row in queryset]
+
+    def paginate_keyset(self, queryset, request, ordering):
+        page, fields, values, reverse = self.keyset_page(queryset, request, ordering)
+        page_size = self.get_page_size(request)
+        rows = self.keyset_rows(list(page[:page_size + 1]), page_size, fields, values, reverse)
+        self.total = self.cached_count(queryset)
+        return rows
+
+    def keyset_page(self, queryset, request, ordering):
+        """
+        Return the queryset of rows after the request's cursor, together
+        with the keyset fields and the decoded cursor
+        """
+        self.request = request
+        fields = [
+            (queryset.model._meta.get_field(name.lstrip('-')), name.startswith('-'))
+            for name in ordering
+        ]
+        values, reverse = self.decode_cursor(request, fields)
+
+        page = queryset.order_by(*[
+            f"{'-' if descending != reverse else ''}{field.attname}" for field, descending in fields
+        ])
+        if values is not None:
+            page = page.filter(self.keyset_filter(fields, values, reverse))
+        return page, fields, values, reverse
+
+    def keyset_rows(self, rows, page_size, fields, values, reverse):
+        """
+        Trim the page_size + 1 fetched rows to the page and record the
+        navigation state
+        """
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        if not rows:
+            self.has_next = self.has_previous = False
+        else:
+            self.first, self.last = [
+                [field.value_to_string(row) for field, _ in fields] for row in (rows[0], rows[-1])
+            ]
+        self.keyset_mode = True
+        return rows
+
+    def keyset_filter(self, fields, values, reverse):
+        """
+        Lexicographic "row comes after the cursor" condition over the keyset
+        """
+        conditions = []
+        for index, (field, descending) in enumerate(fields):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition = Q(**{f'{field.attname}__{lookup}': values[index]})
+            for previous, value in zip(fields[:index], values):
+                condition &= Q(**{previous[0].attname: value})
+            conditions.append(condition)
+        return reduce(or_, conditions)
+
+    def cursor_link(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': reverse}).encode()
+        token = base64.urlsafe_b64encode(payload).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, fields):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            values = [field.to_python(value) for (field, _), value in zip(fields, payload['v'], strict=True)]
+            return values, bool(payload['r'])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def count_cache_key(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        return 'pagination-count:' + hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+
+    def cached_count(self, queryset):
+        timeout = getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 60)
+        return cache.get_or_set(self.count_cache_key(queryset), queryset.count, timeout)
+
+    async def acached_count(self, queryset):
+        key = self.count_cache_key(queryset)
+        count = await cache.aget(key)
+        if count is None:
+            count = await queryset.acount()
+            await cache.aset(key, count, getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 60))
+        return count
@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from account.identity import get_identity
+
 class IsEmployerOwner(permissions.BasePermission):
     """
     Permission to only allow employer owner to edit their jobs
@@ -14,5 +16,5 @@ class IsEmployerOwner(permissions.BasePermission):
         )
     
     def has_object_permission(self, request, view, obj):
-        return obj.employer.user == request.user
+        return get_identity(request).owns_job(obj)
     
\ No newline at end of file
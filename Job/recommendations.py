@@ -0,0 +1,249 @@
+"""
+Skill-matching job recommendations.
+
+Skills from Job.skills_required and JobSeeker.skills are normalised, and
+every active job is kept as a row listed in the posting array of each skill
+it requires. A seeker's skill overlap with every row is counted from the
+postings of their skills in one bincount and combined with the experience
+fit. The index is built lazily, updated from Job signals in this process and
+rebuilt in the background every JOB_RECOMMENDATION_REBUILD_INTERVAL seconds
+to pick up writes made elsewhere (other processes, queryset.update,
+bulk_create).
+"""
+import re
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import Job
+
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'ts': 'typescript',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'nodejs': 'node',
+    'node.js': 'node',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'golang': 'go',
+    'postgres': 'postgresql',
+    'k8s': 'kubernetes',
+    'py': 'python',
+    'drf': 'django rest framework',
+}
+SKILL_WEIGHT = 0.8
+EXPERIENCE_WEIGHT = 0.2
+
+
+def normalize_skills(text):
+    """
+    Split a comma-separated skills string into unique canonical skill names
+    """
+    skills = []
+    for raw in re.split(r'[,;\n]', text or ''):
+        skill = ' '.join(raw.lower().split())
+        skill = SKILL_ALIASES.get(skill, skill)
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+class SkillPostings:
+    """
+    Growable array of the index rows requiring one skill
+    """
+    __slots__ = ('rows', 'length')
+
+    def __init__(self):
+        self.rows = np.empty(4, dtype=np.int32)
+        self.length = 0
+
+    def add(self, row):
+        if self.length == len(self.rows):
+            self.rows = np.concatenate([self.rows, np.empty(len(self.rows), dtype=np.int32)])
+        self.rows[self.length] = row
+        self.length += 1
+
+    def discard(self, row):
+        found = np.flatnonzero(self.rows[:self.length] == row)
+        if len(found):
+            self.length -= 1
+            self.rows[found[0]] = self.rows[self.length]
+
+    def view(self):
+        return self.rows[:self.length]
+
+
+class JobSkillIndex:
+    """
+    Per-skill posting arrays of row indices over every active job, so memory
+    grows with the (job, skill) pairs rather than jobs x vocabulary. Skills
+    no active job requires are dropped with their last posting.
+    """
+
+    def __init__(self, capacity=1024):
+        self.postings = {}
+        self.row_skills = {}
+        self.rows = {}
+        self.free_rows = []
+        self.size = 0
+        self.job_ids = np.zeros(capacity, dtype=np.int64)
+        self.experience = np.zeros(capacity, dtype=np.int32)
+        self.skill_counts = np.zeros(capacity, dtype=np.int32)
+        # deadline as a date ordinal, 0 when the job has none
+        self.deadlines = np.zeros(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.built_at = None
+        self.lock = threading.RLock()
+
+    def _grow(self, rows):
+        extra = rows - len(self.job_ids)
+        self.job_ids = np.concatenate([self.job_ids, np.zeros(extra, dtype=np.int64)])
+        self.experience = np.concatenate([self.experience, np.zeros(extra, dtype=np.int32)])
+        self.skill_counts = np.concatenate([self.skill_counts, np.zeros(extra, dtype=np.int32)])
+        self.deadlines = np.concatenate([self.deadlines, np.zeros(extra, dtype=np.int32)])
+        self.active = np.concatenate([self.active, np.zeros(extra, dtype=bool)])
+
+    def _unpost(self, row):
+        for skill in self.row_skills.pop(row, ()):
+            postings = self.postings[skill]
+            postings.discard(row)
+            if not postings.length:
+                del self.postings[skill]
+
+    def upsert(self, job_id, skills_required, experience_required, is_active=True, deadline=None):
+        with self.lock:
+            if not is_active:
+                self.remove(job_id)
+                return
+            skills = normalize_skills(skills_required)
+            row = self.rows.get(job_id)
+            if row is None:
+                if self.free_rows:
+                    row = self.free_rows.pop()
+                else:
+                    if self.size == len(self.job_ids):
+                        self._grow(max(self.size * 2, 1))
+                    row, self.size = self.size, self.size + 1
+                self.rows[job_id] = row
+            self._unpost(row)
+            for skill in skills:
+                self.postings.setdefault(skill, SkillPostings()).add(row)
+            self.row_skills[row] = skills
+            self.job_ids[row] = job_id
+            self.experience[row] = experience_required or 0
+            self.skill_counts[row] = len(skills)
+            self.deadlines[row] = deadline.toordinal() if deadline else 0
+            self.active[row] = True
+
+    def remove(self, job_id):
+        with self.lock:
+            row = self.rows.pop(job_id, None)
+            if row is not None:
+                self._unpost(row)
+                self.active[row] = False
+                self.free_rows.append(row)
+
+    def score(self, skills, experience_years, limit, today=None):
+        """
+        Return the best ``limit`` (job_id, score) pairs for a seeker. Jobs
+        past their deadline are skipped even before the expiry sweep closes
+        them.
+        """
+        today = (today or timezone.now().date()).toordinal()
+        skills = normalize_skills(skills)
+        # under the lock so a concurrent upsert cannot reuse a row or swap
+        # the arrays between reading a row and its job id
+        with self.lock:
+            postings = [self.postings[skill].view() for skill in skills if skill in self.postings]
+            if not postings:
+                return []
+            size = self.size
+            overlap = np.bincount(np.concatenate(postings), minlength=size)
+
+            deadlines = self.deadlines[:size]
+            open_rows = self.active[:size] & ((deadlines == 0) | (deadlines >= today))
+            candidates = np.flatnonzero((overlap > 0) & open_rows)
+            if not len(candidates):
+                return []
+            skill_fit = overlap[candidates] / np.maximum(self.skill_counts[candidates], 1)
+            shortfall = np.maximum(self.experience[candidates] - (experience_years or 0), 0)
+            experience_fit = 1.0 / (1.0 + shortfall)
+            scores = SKILL_WEIGHT * skill_fit + EXPERIENCE_WEIGHT * experience_fit
+
+            if len(candidates) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+            else:
+                top = np.arange(len(candidates))
+            job_ids = self.job_ids[candidates[top]]
+        top_order = np.lexsort((-job_ids, -scores[top]))
+        return [(int(job_ids[i]), round(float(scores[top[i]]), 4)) for i in top_order]
+
+
+_index = None
+_index_lock = threading.Lock()
+_rebuilding = threading.Event()
+
+
+def rebuild_interval():
+    return getattr(settings, 'JOB_RECOMMENDATION_REBUILD_INTERVAL', 300)
+
+
+def build_index():
+    index = JobSkillIndex()
+    jobs = Job.objects.filter(is_active=True).order_by().values_list(
+        'id', 'skills_required', 'experience_required', 'deadline'
+    )
+    for job_id, skills, experience, deadline in jobs.iterator(chunk_size=5000):
+        index.upsert(job_id, skills, experience, deadline=deadline)
+    index.built_at = time.monotonic()
+    return index
+
+
+def _rebuild_in_background():
+    global _index
+    try:
+        _index = build_index()
+    finally:
+        connection.close()
+        _rebuilding.clear()
+
+
+def get_index():
+    """
+    Return the skill index, building it on first use. A stale index keeps
+    serving while a replacement is built in a background thread.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = build_index()
+    elif time.monotonic() - _index.built_at > rebuild_interval() and not _rebuilding.is_set():
+        _rebuilding.set()
+        threading.Thread(target=_rebuild_in_background, name='job-skill-index', daemon=True).start()
+    return _index
+
+
+def job_changed(job):
+    if _index is not None:
+        _index.upsert(job.pk, job.skills_required, job.experience_required, job.is_active, job.deadline)
+
+
+def job_removed(job_id):
+    if _index is not None:
+        _index.remove(job_id)
+
+
+def reset_index():
+    global _index
+    _index = None
+
+
+def recommend_jobs(seeker, limit=20):
+    return get_index().score(seeker.skills, seeker.experience_years, limit)
@@ -0,0 +1,224 @@
+"""
+Inverted-index full-text search over jobs.
+
+Jobs are tokenised and stemmed into JobSearchPosting rows (one per term per
+job, holding a field-weighted term frequency) and ranked with BM25. The
+index is kept up to date from Job/Employer signals; rebuild it with
+``manage.py rebuild_search_index`` after bulk writes.
+"""
+import math
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Avg, Count, ExpressionWrapper, FloatField, OuterRef, Subquery, Value
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Job, JobSearchDocument, JobSearchPosting
+
+# Field weights applied to term frequencies, mirroring JobListView.search_fields
+FIELD_WEIGHTS = {
+    'title': 3,
+    'employer__company_name': 2,
+    'location': 2,
+    'description': 1,
+}
+MAX_TERM_LENGTH = 64
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or that the
+    to was we will with you your our this
+""".split())
+SUFFIXES = (
+    ('ational', 'ate'), ('ization', 'ize'), ('fulness', 'ful'), ('iveness', 'ive'),
+    ('ments', ''), ('ment', ''), ('ness', ''), ('ings', ''), ('ing', ''),
+    ('ies', 'y'), ('ers', ''), ('er', ''), ('ed', ''), ('es', ''), ('ly', ''), ('s', ''),
+)
+
+
+def stem(token):
+    """
+    Light suffix-stripping stemmer; only needs to be consistent between
+    indexing and querying, not linguistically exact
+    """
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    for suffix, replacement in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def tokenize(text):
+    """
+    Split text into stemmed terms, dropping stop words
+    """
+    if not text:
+        return []
+    return [
+        stem(token)[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(text.lower())
+        if token not in STOP_WORDS
+    ]
+
+
+def document_terms(values):
+    """
+    Return the field-weighted term frequencies for one job's indexed values
+    """
+    frequencies = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for term in tokenize(values.get(field)):
+            frequencies[term] += weight
+    return frequencies
+
+
+def _write_documents(rows):
+    job_ids = [row['id'] for row in rows]
+    documents, postings = [], []
+    for row in rows:
+        frequencies = document_terms(row)
+        documents.append(JobSearchDocument(job_id=row['id'], length=sum(frequencies.values())))
+        postings.extend(
+            JobSearchPosting(job_id=row['id'], term=term, frequency=frequency)
+            for term, frequency in frequencies.items()
+        )
+    with transaction.atomic():
+        JobSearchPosting.objects.filter(job_id__in=job_ids).delete()
+        JobSearchDocument.objects.filter(job_id__in=job_ids).delete()
+        JobSearchDocument.objects.bulk_create(documents)
+        JobSearchPosting.objects.bulk_create(postings, batch_size=1000)
+
+
+def index_jobs(job_ids):
+    """
+    (Re)index the given jobs
+    """
+    rows = list(Job.objects.filter(pk__in=job_ids).values('id', *FIELD_WEIGHTS))
+    if rows:
+        _write_documents(rows)
+
+
+def remove_jobs(job_ids):
+    with transaction.atomic():
+        JobSearchPosting.objects.filter(job_id__in=job_ids).delete()
+        JobSearchDocument.objects.filter(job_id__in=job_ids).delete()
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Re-index every job in batches of ``batch_size``. Returns the job count.
+    """
+    JobSearchPosting.objects.all().delete()
+    JobSearchDocument.objects.all().delete()
+    total, batch = 0, []
+    for row in Job.objects.order_by().values('id', *FIELD_WEIGHTS).iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _write_documents(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        _write_documents(batch)
+        total += len(batch)
+    return total
+
+
+def query_terms(text):
+    """
+    The distinct terms of ``text``, or [] when some term is in no job (so
+    nothing can match)
+    """
+    terms = list(dict.fromkeys(tokenize(text)))
+    if not terms:
+        return []
+    indexed = set(JobSearchPosting.objects.filter(term__in=terms).values_list('term', flat=True).distinct())
+    return terms if len(indexed) == len(terms) else []
+
+
+def matching(queryset, terms):
+    """
+    The jobs of ``queryset`` containing every term, one indexed IN
+    subquery over the postings per term
+    """
+    for term in terms:
+        queryset = queryset.filter(pk__in=JobSearchPosting.objects.filter(term=term).values('job_id'))
+    return queryset
+
+
+def score_expression(terms):
+    """
+    BM25 score of a job for ``terms`` as a database expression, from one
+    correlated frequency lookup per term and the document length
+    """
+    doc_freq = dict(
+        JobSearchPosting.objects.filter(term__in=terms)
+        .values('term').annotate(total=Count('job_id')).order_by()
+        .values_list('term', 'total')
+    )
+    stats = JobSearchDocument.objects.aggregate(total=Count('job_id'), avg_length=Avg('length'))
+    total_docs, avg_length = stats['total'], stats['avg_length'] or 1
+
+    length = Subquery(JobSearchDocument.objects.filter(job_id=OuterRef('pk')).values('length')[:1])
+    norm = Value(BM25_K1 * (1 - BM25_B)) + Value(BM25_K1 * BM25_B / avg_length) * length
+    score = None
+    for term in terms:
+        idf = math.log(1 + (total_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+        frequency = Subquery(
+            JobSearchPosting.objects.filter(job_id=OuterRef('pk'), term=term).values('frequency')[:1]
+        )
+        part = Value(idf * (BM25_K1 + 1)) * frequency / (frequency + norm)
+        score = part if score is None else score + part
+    return ExpressionWrapper(score, output_field=FloatField())
+
+
+def ranked(queryset, terms):
+    """
+    The jobs of ``queryset`` matching ``terms``, annotated with
+    ``search_score`` and ordered by it, best first. Scores are computed by
+    the database, so only the rows of the page being read are returned.
+    """
+    return matching(queryset, terms).annotate(search_score=score_expression(terms)).order_by(
+        '-search_score', f'-{queryset.model._meta.pk.attname}'
+    )
+
+
+def search(text, queryset=None, limit=None):
+    """
+    Rank the jobs of ``queryset`` that contain every term of ``text`` with
+    BM25. Returns a list of (job_id, score), best first.
+    """
+    terms = query_terms(text)
+    if not terms:
+        return []
+    queryset = Job.objects.all() if queryset is None else queryset
+    return list(ranked(queryset, terms).values_list('pk', 'search_score')[:limit])
+
+
+class JobSearchFilter(BaseFilterBackend):
+    """
+    Drop-in replacement for SearchFilter backed by the inverted index.
+    Results are ordered by relevance unless an explicit ordering is given.
+    """
+    search_param = 'search'
+    ordering_param = 'ordering'
+
+    def filter_queryset(self, request, queryset, view, rank=True):
+        """
+        The matching jobs, ranked unless ``rank`` is false or an explicit
+        ordering is given
+        """
+        text = request.query_params.get(self.search_param, '').strip()
+        if not tokenize(text):
+            # Blank or only stop words: nothing to filter on
+            return queryset
+
+        terms = query_terms(text)
+        if not terms:
+            return queryset.none()
+        if not rank or request.query_params.get(self.ordering_param):
+            return matching(queryset, terms)
+        return ranked(queryset, terms)
@@ -1,35 +1,123 @@
+import asyncio
+
+from django.core.files.storage import default_storage
+from django.db.models import Manager
 from rest_framework import serializers
-from .models import Job, JobCategory, JobApplication, SavedJob
-from account.serializers import EmployerProfileSerializer, JobSeekerProfileSerializer
+from . import geo
+from .models import APPLICATION_STATUS_COUNT_FIELDS, Job, JobCategory, JobApplication, JobListing, SavedJob
+from account.serializers import (
+    CARD_IMAGE_WIDTH, EmployerProfileSerializer, JobSeekerProfileSerializer, ThumbnailImageField
+)
+from account.identity import get_identity
+from JobPortal.async_views import fetch
+
+
+def _job_flags(context):
+    return context.setdefault('job_flags', {
+        'resolved': set(), 'saved': set(), 'applied': set()
+    })
+
+
+def _flag_querysets(request, job_ids):
+    if not (job_ids and request and request.user.is_authenticated and request.user.user_type == 'job_seeker'):
+        return None
+    return (
+        SavedJob.objects.filter(user_id=request.user.pk, job_id__in=job_ids).values_list('job_id', flat=True),
+        JobApplication.objects.filter(
+            applicant__user_id=request.user.pk, job_id__in=job_ids
+        ).values_list('job_id', flat=True),
+    )
+
+
+def resolve_job_flags(context, job_ids):
+    """
+    Resolve is_saved / has_applied for a batch of jobs with one query each
+    and store the result in the serializer context. Jobs resolved earlier
+    are not queried again.
+    """
+    flags = _job_flags(context)
+    job_ids = set(job_ids) - flags['resolved']
+    querysets = _flag_querysets(context.get('request'), job_ids)
+    if querysets is not None:
+        saved, applied = querysets
+        flags['saved'] |= set(saved)
+        flags['applied'] |= set(applied)
+    flags['resolved'] |= job_ids
+    return flags
+
+
+async def aload_job_flags(context, job_ids):
+    """
+    resolve_job_flags() for async views, with both queries awaited together
+    """
+    flags = _job_flags(context)
+    job_ids = set(job_ids) - flags['resolved']
+    querysets = _flag_querysets(context.get('request'), job_ids)
+    if querysets is not None:
+        saved, applied = await asyncio.gather(*(fetch(queryset) for queryset in querysets))
+        flags['saved'] |= set(saved)
+        flags['applied'] |= set(applied)
+    flags['resolved'] |= job_ids
+    return flags
+
+
+class JobFlagsListSerializer(serializers.ListSerializer):
+    """
+    List serializer that resolves the per-job flags for the whole page
+    before the rows are serialized
+    """
+    
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, Manager) else data)
+        job_id_attr = getattr(self.child, 'job_id_attr', 'pk')
+        resolve_job_flags(self.context, (getattr(item, job_id_attr) for item in items))
+        return super().to_representation(items)
+
+
+class JobFlagsMixin:
+    """
+    Per-job flags read from the page resolved by JobFlagsListSerializer,
+    falling back to resolving the single job when used outside a list
+    """
+    
+    def get_job_flags(self, obj):
+        flags = self.context.get('job_flags')
+        if flags is None or obj.pk not in flags['resolved']:
+            flags = resolve_job_flags(self.context, [obj.pk])
+        return flags
+    
+    def get_is_saved(self, obj):
+        return obj.pk in self.get_job_flags(obj)['saved']
+    
+    def get_has_applied(self, obj):
+        return obj.pk in self.get_job_flags(obj)['applied']
 
 
 class JobCategorySerializer(serializers.ModelSerializer):
     """
     Serializer for Job Categories
     """
-    jobs_count = serializers.SerializerMethodField()
+    jobs_count = serializers.IntegerField(source='active_jobs_count', read_only=True)
     
     class Meta:
         model = JobCategory
         fields = ['id', 'name', 'slug', 'description', 'jobs_count', 'created_at']
         read_only_fields = ['id', 'created_at']
-    
-    def get_jobs_count(self, obj):
-        return obj.jobs.filter(is_active=True).count()
 
 
-class JobListSerializer(serializers.ModelSerializer):
+class JobListSerializer(JobFlagsMixin, serializers.ModelSerializer):
     """
     Serializer for Job List (lightweight, for listing pages)
     """
     employer_name = serializers.CharField(source='employer.company_name', read_only=True)
-    employer_logo = serializers.ImageField(source='employer.logo', read_only=True)
+    employer_logo = ThumbnailImageField(source='employer.logo', width=CARD_IMAGE_WIDTH)
     category_name = serializers.CharField(source='category.name', read_only=True)
     is_saved = serializers.SerializerMethodField()
     has_applied = serializers.SerializerMethodField()
     
     class Meta:
         model = Job
+        list_serializer_class = JobFlagsListSerializer
         fields = [
             'id', 'title', 'employer_name', 'employer_logo',
             'category_name', 'location', 'job_type',
@@ -37,25 +125,43 @@ class JobListSerializer(serializers.ModelSerializer):
             'is_active', 'deadline', 'created_at',
             'applications_count', 'is_saved', 'has_applied'
         ]
+
+
+class JobListingSerializer(JobFlagsMixin, serializers.ModelSerializer):
+    """
+    JobListSerializer's output read from a JobListing row
+    """
+    id = serializers.IntegerField(source='job_id', read_only=True)
+    employer_logo = serializers.SerializerMethodField()
+    is_saved = serializers.SerializerMethodField()
+    has_applied = serializers.SerializerMethodField()
     
-    def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated and request.user.user_type == 'job_seeker':
-            return SavedJob.objects.filter(user=request.user, job=obj).exists()
-        return False
+    class Meta:
+        model = JobListing
+        list_serializer_class = JobFlagsListSerializer
+        fields = JobListSerializer.Meta.fields
     
-    def get_has_applied(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated and request.user.user_type == 'job_seeker':
-            if hasattr(request.user, 'jobseeker_profile'):
-                return JobApplication.objects.filter(
-                    job=obj,
-                    applicant=request.user.jobseeker_profile
-                ).exists()
-        return False
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # set by views filtering by distance from a point
+        origin = self.context.get('geo_origin')
+        if origin is not None:
+            data['distance_km'] = None if instance.latitude is None else round(
+                geo.distance_km(*origin, instance.latitude, instance.longitude), 1
+            )
+        return data
+    
+    def get_employer_logo(self, obj):
+        if not obj.employer_logo:
+            return None
+        url = default_storage.url(obj.employer_logo)
+        request = self.context.get('request', None)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
 
 
-class JobDetailSerializer(serializers.ModelSerializer):
+class JobDetailSerializer(JobFlagsMixin, serializers.ModelSerializer):
     """
     Serializer for Job Detail (complete information)
     """
@@ -66,24 +172,19 @@ class JobDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Job
-        fields = '__all__'
+        exclude = list(APPLICATION_STATUS_COUNT_FIELDS.values())
         read_only_fields = ['id', 'employer', 'created_at', 'updated_at', 'views_count']
+        list_serializer_class = JobFlagsListSerializer
+
+
+class EmployerJobSerializer(JobDetailSerializer):
+    """
+    Serializer for an employer's own jobs, with application counts per status
+    """
+    application_pipeline = serializers.DictField(child=serializers.IntegerField(), read_only=True)
     
-    def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated and request.user.user_type == 'job_seeker':
-            return SavedJob.objects.filter(user=request.user, job=obj).exists()
-        return False
-    
-    def get_has_applied(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated and request.user.user_type == 'job_seeker':
-            if hasattr(request.user, 'jobseeker_profile'):
-                return JobApplication.objects.filter(
-                    job=obj,
-                    applicant=request.user.jobseeker_profile
-                ).exists()
-        return False
+    class Meta(JobDetailSerializer.Meta):
+        pass
 
 
 class JobCreateUpdateSerializer(serializers.ModelSerializer):
@@ -120,7 +221,7 @@ class JobApplicationSerializer(serializers.ModelSerializer):
     """
     Serializer for Job Applications
     """
-    job_title = serializers.CharField(source='job.title', read_only=True)
+    job_title = serializers.CharField(source='listing.title', read_only=True)
     applicant_name = serializers.CharField(source='applicant.full_name', read_only=True)
     applicant_email = serializers.EmailField(source='applicant.user.email', read_only=True)
     
@@ -145,10 +246,11 @@ class JobApplicationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Application deadline has passed")
         
         # Check if already applied
-        if request and hasattr(request.user, 'jobseeker_profile'):
+        jobseeker_id = get_identity(request).jobseeker_id if request else None
+        if jobseeker_id is not None:
             if JobApplication.objects.filter(
                     job=value,
-                    applicant=request.user.jobseeker_profile
+                    applicant_id=jobseeker_id
             ).exists():
                 raise serializers.ValidationError("You have already applied for this job")
         
@@ -159,21 +261,25 @@ class JobApplicationDetailSerializer(serializers.ModelSerializer):
     """
     Detailed serializer for job applications (for employers to view)
     """
-    job = JobListSerializer(read_only=True)
+    job = JobListingSerializer(source='listing', read_only=True)
     applicant = JobSeekerProfileSerializer(read_only=True)
+    job_id_attr = 'job_id'
     
     class Meta:
         model = JobApplication
-        fields = '__all__'
+        exclude = ['listing']
+        list_serializer_class = JobFlagsListSerializer
 
 
 class SavedJobSerializer(serializers.ModelSerializer):
     """
     Serializer for Saved Jobs
     """
-    job = JobListSerializer(read_only=True)
+    job = JobListingSerializer(source='listing', read_only=True)
+    job_id_attr = 'job_id'
     
     class Meta:
         model = SavedJob
         fields = ['id', 'job', 'saved_at']
-        read_only_fields = ['id', 'saved_at']
\ No newline at end of file
+        read_only_fields = ['id', 'saved_at']
+        list_serializer_class = JobFlagsListSerializer
\ No newline at end of file
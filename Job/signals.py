@@ -0,0 +1,185 @@
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from account.models import Employer
+from taskqueue.signals import housekeeping
+from . import cache, counters, listings, recommendations, search, tasks
+from .models import Job, JobApplication, JobCategory
+
+INDEXED_JOB_FIELDS = {'title', 'description', 'location'}
+SKILL_JOB_FIELDS = {'skills_required', 'experience_required', 'is_active'}
+
+
+def _load_counter_state(pk, lock=False):
+    jobs = Job.objects.filter(pk=pk)
+    if lock:
+        jobs = jobs.select_for_update()
+    return jobs.values(*counters.COUNTER_FIELDS).first()
+
+
+@receiver(post_init, sender=Job)
+def remember_job_state(sender, instance, **kwargs):
+    instance._counter_state = counters.snapshot(instance) if instance.pk else None
+
+
+@receiver(pre_save, sender=Job)
+def load_job_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Job.save() runs in a transaction: the previous state is read from the
+    # locked row rather than the instance's snapshot, so concurrent saves of
+    # one job each move the counters from the state the other left
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & {'category', 'job_type', 'is_active'}:
+        return
+    instance._counter_state = _load_counter_state(instance.pk, lock=True)
+
+
+@receiver(post_save, sender=Job)
+def update_job_counters(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & {'category', 'job_type', 'is_active'}:
+        return
+    old = None if created else instance._counter_state
+    new = counters.snapshot(instance) or _load_counter_state(instance.pk)
+    counters.apply_change(old, new)
+    instance._counter_state = new
+
+
+@receiver(pre_delete, sender=Job)
+def load_deleted_job_state(sender, instance, **kwargs):
+    if instance._counter_state is None:
+        instance._counter_state = _load_counter_state(instance.pk)
+
+
+@receiver(post_delete, sender=Job)
+def release_job_counters(sender, instance, **kwargs):
+    counters.apply_change(instance._counter_state, None)
+
+
+@receiver(post_init, sender=JobApplication)
+def remember_application_status(sender, instance, **kwargs):
+    instance._counted_status = instance.__dict__.get('status') if instance.pk else None
+
+
+def _load_application_status(pk):
+    return JobApplication.objects.filter(pk=pk).values_list('status', flat=True).first()
+
+
+@receiver(pre_save, sender=JobApplication)
+def load_application_status(sender, instance, raw=False, **kwargs):
+    if not raw and not instance._state.adding and instance._counted_status is None:
+        instance._counted_status = _load_application_status(instance.pk)
+
+
+@receiver(post_save, sender=JobApplication)
+def update_application_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else instance._counted_status
+    counters.apply_application_change(instance.job_id, old, instance.status)
+    instance._counted_status = instance.status
+
+
+@receiver(pre_delete, sender=JobApplication)
+def load_deleted_application_status(sender, instance, **kwargs):
+    if instance._counted_status is None:
+        instance._counted_status = _load_application_status(instance.pk)
+
+
+@receiver(post_delete, sender=JobApplication)
+def release_application_counters(sender, instance, **kwargs):
+    if instance._counted_status is not None:
+        counters.apply_application_change(instance.job_id, instance._counted_status, None)
+
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not set(update_fields) & INDEXED_JOB_FIELDS):
+        return
+    search.index_jobs([instance.pk])
+
+
+@receiver(post_save, sender=Job)
+def update_job_skills(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not set(update_fields) & SKILL_JOB_FIELDS):
+        return
+    recommendations.job_changed(instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_skills(sender, instance, **kwargs):
+    recommendations.job_removed(instance.pk)
+
+
+@receiver(post_init, sender=Employer)
+def remember_company_name(sender, instance, **kwargs):
+    instance._indexed_company_name = instance.__dict__.get('company_name')
+
+
+@receiver(post_save, sender=Employer)
+def reindex_employer_jobs(sender, instance, created, raw=False, **kwargs):
+    if raw or created or instance.company_name == instance._indexed_company_name:
+        return
+    # an employer can have many jobs; re-index them off the request path
+    tasks.reindex_employer_jobs.enqueue(instance.pk)
+    instance._indexed_company_name = instance.company_name
+
+
+@receiver(post_save, sender=Job)
+def sync_job_listing(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not set(update_fields) & set(listings.LISTED_JOB_FIELDS)):
+        return
+    listings.sync_jobs([instance.pk])
+
+
+def _listed_employer(instance):
+    # None when the listed fields were deferred, rather than loading them
+    if any(field not in instance.__dict__ for field in ('company_name', 'logo', 'logo_thumbnails')):
+        return None
+    return instance.company_name, listings.card_logo(instance)
+
+
+@receiver(post_init, sender=Employer)
+def remember_listed_employer(sender, instance, **kwargs):
+    instance._listed_employer = _listed_employer(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Employer)
+def sync_employer_listings(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    listed = _listed_employer(instance)
+    if listed is None or listed != instance._listed_employer:
+        listings.sync_employer(instance)
+        instance._listed_employer = listed
+
+
+@receiver(post_init, sender=JobCategory)
+def remember_category_name(sender, instance, **kwargs):
+    instance._listed_name = instance.__dict__.get('name')
+
+
+@receiver(post_save, sender=JobCategory)
+def sync_category_listings(sender, instance, created, raw=False, **kwargs):
+    if raw or created or instance.name == instance._listed_name:
+        return
+    listings.sync_category(instance)
+    instance._listed_name = instance.name
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_save, sender=JobCategory)
+@receiver(post_delete, sender=JobCategory)
+@receiver(post_save, sender=Employer)
+@receiver(post_delete, sender=Employer)
+def invalidate_response_cache(sender, raw=False, **kwargs):
+    if not raw:
+        cache.bump_generation_on_commit()
+
+
+@receiver(housekeeping)
+def keep_expiry_scheduled(sender, **kwargs):
+    # covers a fresh deploy and a sweep that used up its retries
+    tasks.ensure_expiry_scheduled()
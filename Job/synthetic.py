@@ -0,0 +1,355 @@
+"""
+Reproducible synthetic data for load tests and benchmarks.
+
+SyntheticDataGenerator fills the database with users, employer and job
+seeker profiles, categories, jobs, applications and saved jobs drawn from
+a seeded random generator: the same seed and sizes always produce the same
+rows, with timestamps spread over the ``days`` before the run. Rows are
+written with bulk_create in batches and only primary keys are kept in
+memory, so millions of jobs and applications fit.
+
+The data is skewed like real traffic: a few employers post most jobs, a few
+categories and cities hold most postings, a few jobs collect most
+applications and saves and a few seekers send most applications (Zipf
+distributions). Bulk inserts send no signals, so the category and
+application counters and the search index are rebuilt at the end.
+"""
+import random
+from bisect import bisect
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from django.utils.text import slugify
+
+from account.models import Employer, JobSeeker, User
+from . import counters, listings, recommendations, search
+from .cache import bump_generation
+from .models import Job, JobApplication, JobCategory, SavedJob
+
+# category: (role titles, skills)
+CATEGORIES = {
+    'Software Engineering': (
+        ['Python Developer', 'Backend Engineer', 'Frontend Developer', 'Full Stack Developer', 'Mobile Developer'],
+        ['python', 'django', 'javascript', 'react', 'node', 'java', 'go', 'sql', 'docker', 'aws', 'kotlin', 'swift'],
+    ),
+    'Data Science': (
+        ['Data Scientist', 'Data Engineer', 'Machine Learning Engineer', 'Data Analyst'],
+        ['python', 'sql', 'machine learning', 'pandas', 'spark', 'statistics', 'tableau', 'airflow'],
+    ),
+    'DevOps': (
+        ['DevOps Engineer', 'Site Reliability Engineer', 'Cloud Architect', 'Platform Engineer'],
+        ['kubernetes', 'docker', 'aws', 'terraform', 'linux', 'ci/cd', 'python', 'monitoring'],
+    ),
+    'Marketing': (
+        ['Digital Marketing Manager', 'SEO Specialist', 'Content Writer', 'Growth Marketer'],
+        ['seo', 'content', 'google analytics', 'social media', 'copywriting', 'email marketing'],
+    ),
+    'Sales': (
+        ['Account Executive', 'Sales Manager', 'Business Development Representative'],
+        ['negotiation', 'crm', 'salesforce', 'lead generation', 'communication'],
+    ),
+    'Design': (
+        ['Product Designer', 'UX Researcher', 'Graphic Designer', 'UI Designer'],
+        ['figma', 'user research', 'prototyping', 'illustrator', 'photoshop', 'design systems'],
+    ),
+    'Finance': (
+        ['Accountant', 'Financial Analyst', 'Auditor', 'Payroll Specialist'],
+        ['excel', 'accounting', 'tally', 'financial modelling', 'gst', 'auditing'],
+    ),
+    'Human Resources': (
+        ['HR Generalist', 'Recruiter', 'Talent Acquisition Specialist'],
+        ['recruitment', 'onboarding', 'payroll', 'employee relations', 'communication'],
+    ),
+    'Customer Support': (
+        ['Customer Support Executive', 'Technical Support Engineer', 'Customer Success Manager'],
+        ['communication', 'zendesk', 'troubleshooting', 'crm', 'english'],
+    ),
+    'Operations': (
+        ['Operations Manager', 'Supply Chain Analyst', 'Logistics Coordinator'],
+        ['excel', 'supply chain', 'planning', 'erp', 'vendor management'],
+    ),
+}
+LOCATIONS = [
+    'Bangalore', 'Remote', 'Pune', 'Hyderabad', 'Mumbai', 'Delhi', 'Chennai', 'Gurgaon', 'Noida', 'Kolkata',
+    'London', 'Berlin', 'Singapore', 'New York', 'San Francisco', 'Toronto', 'Dubai', 'Sydney',
+]
+SENIORITY = [('Junior', 0, 2), ('', 1, 4), ('Senior', 4, 8), ('Lead', 6, 10), ('Principal', 10, 15)]
+SENIORITY_WEIGHTS = [25, 40, 22, 9, 4]
+JOB_TYPES = ['full_time', 'remote', 'contract', 'part_time', 'internship']
+JOB_TYPE_WEIGHTS = [55, 15, 12, 10, 8]
+APPLICATION_STATUSES = ['pending', 'reviewed', 'rejected', 'shortlisted', 'accepted']
+APPLICATION_STATUS_WEIGHTS = [50, 20, 20, 7, 3]
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Meera', 'John', 'Emma',
+               'Liam', 'Olivia', 'Noah', 'Sofia', 'Wei', 'Yuki', 'Fatima', 'Omar', 'Lucas', 'Chloe']
+LAST_NAMES = ['Sharma', 'Patel', 'Iyer', 'Reddy', 'Singh', 'Gupta', 'Nair', 'Khan', 'Smith', 'Brown',
+              'Garcia', 'Müller', 'Chen', 'Tanaka', 'Silva', 'Martin', 'Kumar', 'Das', 'Rao', 'Joshi']
+COMPANY_WORDS = ['Tech', 'Labs', 'Systems', 'Solutions', 'Digital', 'Works', 'Analytics', 'Cloud', 'Global',
+                 'Networks', 'Software', 'Ventures']
+
+
+class ZipfSampler:
+    """
+    Draws indexes 0..n-1 with probability proportional to 1 / rank ** exponent.
+    Ranks are shuffled, so popularity does not follow the insertion order.
+    """
+
+    def __init__(self, n, exponent, rng):
+        self.rng = rng
+        self.cumulative = list(accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+        self.ranked = list(range(n))
+        rng.shuffle(self.ranked)
+
+    def __call__(self):
+        rank = bisect(self.cumulative, self.rng.random() * self.cumulative[-1])
+        return self.ranked[min(rank, len(self.ranked) - 1)]
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """
+    Let bulk_create store the given auto_now / auto_now_add fields as set
+    on the instances
+    """
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class SyntheticDataGenerator:
+
+    def __init__(self, seed=0, employers=100, seekers=1000, categories=len(CATEGORIES), jobs=10000,
+                 applications=50000, saved_jobs=20000, days=365, batch_size=5000, prefix='synthetic',
+                 password='password123', index=True, progress=None):
+        self.rng = random.Random(seed)
+        self.sizes = {
+            'employers': employers, 'seekers': seekers, 'categories': categories,
+            'jobs': jobs, 'applications': applications, 'saved_jobs': saved_jobs,
+        }
+        self.days = days
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.password = password
+        self.index = index
+        self.progress = progress or (lambda label, done, total: None)
+
+    def run(self):
+        """
+        Generate everything and return the number of rows written per table
+        """
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=self.days)
+        self.password_hash = make_password(self.password)
+
+        written = {}
+        written['categories'] = self.create_categories()
+        written['employers'] = self.create_employers()
+        written['seekers'] = self.create_seekers()
+        written['jobs'] = self.create_jobs()
+        written['applications'] = self.create_applications()
+        written['saved_jobs'] = self.create_saved_jobs()
+
+        counters.rebuild_category_counters()
+        counters.rebuild_application_counters()
+        listings.rebuild_listings(self.batch_size)
+        if self.index:
+            search.rebuild_index()
+        recommendations.reset_index()
+        bump_generation()
+        return written
+
+    # helpers
+
+    def batches(self, total):
+        for offset in range(0, total, self.batch_size):
+            yield offset, min(self.batch_size, total - offset)
+
+    def moment(self, fraction):
+        """
+        The time ``fraction`` (0..1) of the way from the start to now
+        """
+        return self.start + (self.now - self.start) * fraction
+
+    def email(self, role, number):
+        return f'{self.prefix}-{role}-{number}@example.com'
+
+    def create_users(self, role, user_type, total):
+        """
+        Insert ``total`` users of a type and return their ids in order
+        """
+        user_ids = []
+        with explicit_timestamps(User._meta.get_field('date_joined')):
+            for offset, size in self.batches(total):
+                users = User.objects.bulk_create([
+                    User(
+                        email=self.email(role, offset + number), user_type=user_type,
+                        password=self.password_hash, date_joined=self.moment(self.rng.random() * 0.5),
+                    )
+                    for number in range(size)
+                ])
+                user_ids.extend(user.pk for user in users)
+        return user_ids
+
+    # tables
+
+    def create_categories(self):
+        names = list(CATEGORIES)[:self.sizes['categories']]
+        names += [f'Specialist Roles {number}' for number in range(len(names) + 1, self.sizes['categories'] + 1)]
+        JobCategory.objects.bulk_create(
+            [JobCategory(name=name, slug=slugify(name)) for name in names], ignore_conflicts=True
+        )
+        by_slug = dict(JobCategory.objects.filter(slug__in=[slugify(name) for name in names]).values_list('slug', 'id'))
+        self.categories = [(by_slug[slugify(name)], name) for name in names]
+        self.progress('categories', len(names), len(names))
+        return len(names)
+
+    def create_employers(self):
+        total = self.sizes['employers']
+        user_ids = self.create_users('employer', 'employer', total)
+        self.employer_ids = []
+        for offset, size in self.batches(total):
+            employers = Employer.objects.bulk_create([
+                Employer(
+                    user_id=user_id,
+                    company_name=f'{self.rng.choice(LAST_NAMES)} {self.rng.choice(COMPANY_WORDS)} {offset + number}',
+                    location=self.rng.choice(LOCATIONS),
+                )
+                for number, user_id in enumerate(user_ids[offset:offset + size])
+            ])
+            self.employer_ids.extend(employer.pk for employer in employers)
+            self.progress('employers', offset + size, total)
+        return total
+
+    def create_seekers(self):
+        total = self.sizes['seekers']
+        user_ids = self.create_users('seeker', 'job_seeker', total)
+        self.seeker_user_ids = user_ids
+        self.seeker_ids = []
+        all_skills = sorted({skill for _, skills in CATEGORIES.values() for skill in skills})
+        for offset, size in self.batches(total):
+            seekers = []
+            for user_id in user_ids[offset:offset + size]:
+                _, skills = self.rng.choice(list(CATEGORIES.values()))
+                picked = self.rng.sample(skills, min(len(skills), self.rng.randint(2, 6)))
+                if self.rng.random() < 0.3:
+                    picked.append(self.rng.choice(all_skills))
+                seekers.append(JobSeeker(
+                    user_id=user_id,
+                    full_name=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                    phone=f'9{self.rng.randrange(10 ** 9):09d}',
+                    skills=', '.join(dict.fromkeys(picked)),
+                    experience_years=min(int(self.rng.expovariate(1 / 4)), 25),
+                ))
+            self.seeker_ids.extend(seeker.pk for seeker in JobSeeker.objects.bulk_create(seekers))
+            self.progress('seekers', offset + size, total)
+        return total
+
+    def make_job(self, number, total, employer, category, location):
+        category_id, category_name = self.categories[category]
+        titles, skills = CATEGORIES.get(category_name) or self.rng.choice(list(CATEGORIES.values()))
+        seniority, min_years, max_years = self.rng.choices(SENIORITY, SENIORITY_WEIGHTS)[0]
+        role = self.rng.choice(titles)
+        title = f'{seniority} {role}'.strip()
+        experience = self.rng.randint(min_years, max_years)
+        salary_min = None
+        salary_max = None
+        if self.rng.random() < 0.7:
+            salary_min = Decimal(self.rng.randrange(3, 30) * 10000 + experience * 5000)
+            salary_max = salary_min * Decimal(self.rng.choice(['1.2', '1.4', '1.6']))
+        # ids grow with creation time
+        created_at = self.moment((number + self.rng.random()) / total)
+        deadline = None
+        if self.rng.random() < 0.6:
+            deadline = (created_at + timedelta(days=self.rng.randint(14, 90))).date()
+        required = self.rng.sample(skills, min(len(skills), self.rng.randint(2, 5)))
+        job = Job(
+            employer_id=self.employer_ids[employer],
+            category_id=category_id,
+            title=title,
+            description=f'{title} at a growing team. You will work with {", ".join(required)}.',
+            requirements=f'{experience}+ years of experience with {required[0]}.',
+            location=LOCATIONS[location],
+            job_type=self.rng.choices(JOB_TYPES, JOB_TYPE_WEIGHTS)[0],
+            salary_min=salary_min,
+            salary_max=salary_max,
+            experience_required=experience,
+            skills_required=', '.join(required),
+            is_active=self.rng.random() < 0.9,
+            deadline=deadline,
+            created_at=created_at,
+            updated_at=created_at,
+            views_count=int(self.rng.paretovariate(1.2) * 10),
+        )
+        job.locate()
+        return job
+
+    def create_jobs(self):
+        total = self.sizes['jobs']
+        pick_employer = ZipfSampler(len(self.employer_ids), 1.1, self.rng)
+        pick_category = ZipfSampler(len(self.categories), 0.8, self.rng)
+        pick_location = ZipfSampler(len(LOCATIONS), 1.0, self.rng)
+        self.job_ids = []
+        fields = [Job._meta.get_field('created_at'), Job._meta.get_field('updated_at')]
+        with explicit_timestamps(*fields):
+            for offset, size in self.batches(total):
+                jobs = Job.objects.bulk_create([
+                    self.make_job(offset + number, total, pick_employer(), pick_category(), pick_location())
+                    for number in range(size)
+                ])
+                self.job_ids.extend(job.pk for job in jobs)
+                self.progress('jobs', offset + size, total)
+        return total
+
+    def job_moment(self, job):
+        """
+        A random time between the creation of the job at index ``job`` and now
+        """
+        # no later than the creation time make_job() drew
+        created = (job + 1) / len(self.job_ids)
+        return self.moment(created + (1 - created) * self.rng.random())
+
+    def create_links(self, label, model, total, make, timestamp_field):
+        """
+        Insert ``total`` (seeker, job) rows built by ``make``; pairs drawn
+        twice are dropped by the unique constraint. Returns rows written.
+        """
+        if not self.job_ids or not self.seeker_ids:
+            return 0
+        pick_job = ZipfSampler(len(self.job_ids), 1.0, self.rng)
+        pick_seeker = ZipfSampler(len(self.seeker_ids), 0.7, self.rng)
+        before = model.objects.count()
+        with explicit_timestamps(model._meta.get_field(timestamp_field)):
+            for offset, size in self.batches(total):
+                model.objects.bulk_create(
+                    [make(pick_seeker(), pick_job()) for _ in range(size)], ignore_conflicts=True
+                )
+                self.progress(label, offset + size, total)
+        return model.objects.count() - before
+
+    def create_applications(self):
+        def make(seeker, job):
+            applied_at = self.job_moment(job)
+            status = self.rng.choices(APPLICATION_STATUSES, APPLICATION_STATUS_WEIGHTS)[0]
+            reviewed_at = None
+            if status != 'pending':
+                reviewed_at = min(self.now, applied_at + timedelta(hours=self.rng.randint(1, 24 * 14)))
+            return JobApplication(
+                job_id=self.job_ids[job], applicant_id=self.seeker_ids[seeker], status=status,
+                applied_at=applied_at, reviewed_at=reviewed_at,
+            )
+        return self.create_links('applications', JobApplication, self.sizes['applications'], make, 'applied_at')
+
+    def create_saved_jobs(self):
+        def make(seeker, job):
+            return SavedJob(
+                job_id=self.job_ids[job], user_id=self.seeker_user_ids[seeker], saved_at=self.job_moment(job)
+            )
+        return self.create_links('saved jobs', SavedJob, self.sizes['saved_jobs'], make, 'saved_at')
@@ -0,0 +1,47 @@
+from django.conf import settings
+
+from taskqueue.models import Task
+from taskqueue.queue import task
+
+from . import cache, expiry, search
+from .models import Job
+
+
+@task
+def reindex_employer_jobs(employer_id):
+    """
+    Re-index every job of an employer, whose company name is indexed with them
+    """
+    search.index_jobs(Job.objects.filter(employer_id=employer_id).values_list('pk', flat=True))
+    # list responses cached since the rename searched the old index
+    cache.bump_generation_on_commit()
+
+
+def schedule_expiry(delay=0):
+    """
+    Queue the deadline sweep unless a run is already queued
+    """
+    if Task.objects.filter(name=expire_jobs.name, status=Task.QUEUED).exists():
+        return None
+    return expire_jobs.enqueue_with(delay=delay)
+
+
+def ensure_expiry_scheduled():
+    """
+    Queue a deadline sweep now unless one is queued or running
+    """
+    if Task.objects.filter(name=expire_jobs.name, status__in=[Task.QUEUED, Task.RUNNING]).exists():
+        return None
+    return expire_jobs.enqueue()
+
+
+@task
+def expire_jobs():
+    """
+    Deactivate the jobs past their deadline and schedule the next sweep.
+    A failed sweep schedules nothing: the queue retries it, and once its
+    retries are used up workers queue a new one (ensure_expiry_scheduled).
+    """
+    expired = expiry.expire_jobs()
+    schedule_expiry(getattr(settings, 'JOB_EXPIRY_INTERVAL', 60 * 60))
+    return expired
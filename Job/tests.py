@@ -1,3 +1,1316 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import threading
+import time
+from inspect import iscoroutinefunction
+from urllib.parse import urlencode
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Q
+from django.http import QueryDict
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.authentication import CachedUser, identity_cache
+from account.identity import get_identity
+from account.models import User, Employer, JobSeeker
+from account.views import AsyncProfileView, ProfileView
+from JobPortal.benchmark import compare_results, default_scenarios, run_benchmarks
+from JobPortal.profiling import (
+    SamplingProfilerMiddleware, StackSampler, category, make_profile_token, profiles,
+)
+from JobPortal.querybudget import QueryBudgetExceeded, fingerprint
+from JobPortal.testing import QueryBudgetTestMixin
+from taskqueue.models import Task
+from taskqueue.signals import housekeeping
+from taskqueue.worker import Worker, run_pending
+from . import expiry, geo, recommendations, urls as job_urls
+from .cache import cache_stats, canonical_query
+from .counters import rebuild_application_counters, rebuild_category_counters
+from .listings import rebuild_listings
+from .models import Job, JobCategory, JobApplication, JobListing, SavedJob
+from .permissions import IsEmployerOwner
+from .recommendations import normalize_skills
+from .search import rebuild_index, search, tokenize
+from .serializers import JobListSerializer
+from .tasks import expire_jobs, schedule_expiry
+from .synthetic import SyntheticDataGenerator
+from .view_counter import ViewCountBuffer, view_counts
+from .views import (
+    AsyncJobCategoryListView, AsyncJobDetailView, AsyncJobListView, AsyncSavedJobListView,
+    JobCategoryListView, JobDetailView, JobListView, SavedJobListView,
+)
+
+
+class JobTestMixin:
+    """
+    Shared fixtures for the Job API tests
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer_user = User.objects.create_user(
+            email='employer@example.com', password='password123', user_type='employer'
+        )
+        self.employer = Employer.objects.create(user=self.employer_user, company_name='Acme')
+        self.seeker_user = User.objects.create_user(
+            email='seeker@example.com', password='password123', user_type='job_seeker'
+        )
+        self.seeker = JobSeeker.objects.create(user=self.seeker_user, full_name='Jane Doe', phone='123')
+        self.category = JobCategory.objects.create(name='Engineering', slug='engineering')
+
+    def create_jobs(self, count, **kwargs):
+        return [
+            Job.objects.create(
+                employer=self.employer,
+                category=self.category,
+                title=f'Job {index}',
+                job_type=kwargs.get('job_type', 'full_time'),
+                **{key: value for key, value in kwargs.items() if key != 'job_type'}
+            )
+            for index in range(count)
+        ]
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries)
+
+
+class JobFlagsQueryTests(JobTestMixin, TestCase):
+
+    def test_job_list_flags_are_resolved_per_page(self):
+        self.client.force_authenticate(self.seeker_user)
+        jobs = self.create_jobs(1)
+        few = self.count_queries(reverse('jobs:job-list'))
+        jobs += self.create_jobs(9)
+        SavedJob.objects.create(user=self.seeker_user, job=jobs[0])
+        JobApplication.objects.create(job=jobs[1], applicant=self.seeker)
+        self.assertEqual(few, self.count_queries(reverse('jobs:job-list')))
+
+        response = self.client.get(reverse('jobs:job-list'))
+        results = {row['id']: row for row in response.data['results']}
+        self.assertTrue(results[jobs[0].id]['is_saved'])
+        self.assertFalse(results[jobs[0].id]['has_applied'])
+        self.assertTrue(results[jobs[1].id]['has_applied'])
+        self.assertEqual(results[jobs[1].id]['applications_count'], 1)
+
+    def test_nested_job_lists_use_fixed_queries(self):
+        jobs = self.create_jobs(10)
+        for job in jobs[:2]:
+            SavedJob.objects.create(user=self.seeker_user, job=job)
+        self.client.force_authenticate(self.seeker_user)
+        few = self.count_queries(reverse('jobs:saved-jobs'))
+        for job in jobs[2:]:
+            SavedJob.objects.create(user=self.seeker_user, job=job)
+        self.assertEqual(few, self.count_queries(reverse('jobs:saved-jobs')))
+
+        JobApplication.objects.create(job=jobs[0], applicant=self.seeker)
+        self.client.force_authenticate(self.employer_user)
+        few = self.count_queries(reverse('jobs:employer-applications'))
+        for index in range(5):
+            user = User.objects.create_user(email=f'seeker{index}@example.com', password='password123')
+            applicant = JobSeeker.objects.create(user=user, full_name=f'Seeker {index}', phone='1')
+            JobApplication.objects.create(job=jobs[index], applicant=applicant)
+        self.assertEqual(few, self.count_queries(reverse('jobs:employer-applications')))
+
+
+class CategoryCounterTests(JobTestMixin, TestCase):
+
+    def assertCounts(self, category, total, **by_type):
+        category.refresh_from_db()
+        self.assertEqual(category.active_jobs_count, total)
+        stored = dict(category.job_type_counts.values_list('job_type', 'active_jobs_count'))
+        for job_type, count in by_type.items():
+            self.assertEqual(stored.get(job_type, 0), count)
+
+    def test_counters_follow_job_lifecycle(self):
+        other = JobCategory.objects.create(name='Design', slug='design')
+        job, remote = self.create_jobs(1) + self.create_jobs(1, job_type='remote')
+        self.assertCounts(self.category, 2, full_time=1, remote=1)
+
+        job.is_active = False
+        job.save()
+        self.assertCounts(self.category, 1, full_time=0, remote=1)
+
+        job = Job.objects.get(pk=job.pk)
+        job.is_active = True
+        job.category = other
+        job.save()
+        self.assertCounts(self.category, 1, full_time=0)
+        self.assertCounts(other, 1, full_time=1)
+
+        remote.job_type = 'contract'
+        remote.save(update_fields=['job_type'])
+        self.assertCounts(self.category, 1, remote=0, contract=1)
+
+        Job.objects.only('id').get(pk=remote.pk).delete()
+        self.assertCounts(self.category, 0, contract=0)
+
+    def test_category_list_is_single_read(self):
+        self.create_jobs(3)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('jobs:category-list'))
+        self.assertEqual(response.data['results'][0]['jobs_count'], 3)
+
+    def test_stale_instances_count_a_change_once(self):
+        job, _ = self.create_jobs(2)
+        first, second = Job.objects.get(pk=job.pk), Job.objects.get(pk=job.pk)
+        for instance in (first, second):
+            instance.is_active = False
+            instance.save()
+        self.assertCounts(self.category, 1, full_time=1)
+
+    def test_rebuild_repairs_drift(self):
+        self.create_jobs(2)
+        Job.objects.update(is_active=False)
+        self.assertEqual(rebuild_category_counters(), 1)
+        self.assertCounts(self.category, 0, full_time=0)
+
+
+class JobSearchTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.python, self.java, self.manager = [
+            Job.objects.create(employer=self.employer, category=self.category, job_type=job_type,
+                               title=title, description=description, location='Pune')
+            for title, job_type, description in [
+                ('Senior Python Developer', 'full_time', 'Django and APIs'),
+                ('Java Developer', 'contract', 'Spring services, some python scripting'),
+                ('Engineering Manager', 'full_time', 'Lead developers'),
+            ]
+        ]
+
+    def search_ids(self, **params):
+        response = self.client.get(reverse('jobs:job-list'), params)
+        return [row['id'] for row in response.data['results']]
+
+    def test_tokenize_stems_consistently(self):
+        self.assertEqual(tokenize('Developers developing the APIs'), ['develop', 'develop', 'api'])
+
+    def test_search_ranks_and_combines_with_filters(self):
+        self.assertEqual(self.search_ids(search='python'), [self.python.id, self.java.id])
+        self.assertEqual(self.search_ids(search='python developer', job_type='contract'), [self.java.id])
+        self.assertEqual(self.search_ids(search='acme manager'), [self.manager.id])
+        self.assertEqual(self.search_ids(search='cobol'), [])
+
+    def test_stop_word_only_search_matches_everything(self):
+        self.assertEqual(len(self.search_ids(search='the it')), 3)
+
+    def test_counts_and_pages_cover_every_match(self):
+        jobs = self.create_jobs(12, description='python')
+        response = self.client.get(reverse('jobs:job-list'), {'search': 'python'})
+        self.assertEqual(response.data['count'], 14)
+        pages = self.search_ids(search='python') + self.search_ids(search='python', page=2)
+        self.assertEqual(pages, [job_id for job_id, _ in search('python')])
+        self.assertEqual(set(pages), {self.python.id, self.java.id, *(job.id for job in jobs)})
+        self.assertEqual(pages[0], self.python.id)
+
+    def test_index_follows_writes(self):
+        self.manager.title = 'Rust Engineer'
+        self.manager.save()
+        self.assertEqual(self.search_ids(search='rust'), [self.manager.id])
+        self.employer.company_name = 'Globex'
+        self.employer.save()
+        self.assertEqual(self.search_ids(search='globex'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(run_pending(), 1)
+        self.assertEqual(len(self.search_ids(search='globex')), 3)
+        self.assertEqual(rebuild_index(), 3)
+        self.assertEqual(len(self.search_ids(search='globex')), 3)
+
+
+class RequestIdentityTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        identity_cache.clear()
+        self.addCleanup(identity_cache.clear)
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def job_data(self):
+        return {'category': self.category.pk, 'title': 'Backend Engineer', 'description': 'APIs',
+                'requirements': 'Python', 'location': 'Remote', 'job_type': 'full_time'}
+
+    def test_ownership_compares_employer_ids(self):
+        other_user = User.objects.create_user(email='other@example.com', password='password123', user_type='employer')
+        other = Employer.objects.create(user=other_user, company_name='Globex')
+        mine, theirs = self.create_jobs(1)[0], Job.objects.create(employer=other, category=self.category, title='Other')
+        mine, theirs = Job.objects.get(pk=mine.pk), Job.objects.get(pk=theirs.pk)
+
+        request = APIRequestFactory().get('/')
+        request.user = CachedUser(identity_cache.get(self.employer_user.pk))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_identity(request).employer_id, self.employer.pk)
+            self.assertTrue(IsEmployerOwner().has_object_permission(request, None, mine))
+            self.assertFalse(IsEmployerOwner().has_object_permission(request, None, theirs))
+
+    def test_profile_is_loaded_once_with_its_user(self):
+        self.authenticate(self.employer_user)
+        self.client.get(reverse('jobs:employer-job-list'))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('jobs:job-create'), self.job_data())
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Job.objects.get(title='Backend Engineer').employer_id, self.employer.pk)
+        selects = [query['sql'] for query in context.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertFalse([sql for sql in selects if ' FROM "users"' in sql])
+        self.assertEqual(len([sql for sql in selects if ' FROM "employer_profile"' in sql]), 1)
+
+    def test_missing_profile(self):
+        user = User.objects.create_user(email='new@example.com', password='password123', user_type='employer')
+        self.authenticate(user)
+        response = self.client.post(reverse('jobs:job-create'), self.job_data())
+        self.assertEqual((response.status_code, str(response.data['detail'])), (404, 'Employer profile not found'))
+
+        self.authenticate(self.seeker_user)
+        self.assertEqual(
+            self.client.get(reverse('account:profile')).data['profile']['full_name'], 'Jane Doe'
+        )
+
+
+@override_settings(JOB_VIEW_COUNT_FLUSH_INTERVAL=0)
+class JobViewCounterTests(JobTestMixin, TestCase):
+
+    def test_views_are_buffered_and_flushed_in_bulk(self):
+        self.addCleanup(view_counts.flush)
+        job, other = self.create_jobs(2)
+        url = reverse('jobs:job-detail', args=[job.pk])
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['views_count'], 2)
+        view_counts.record(other.pk, 2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.views_count, 0)
+        with self.assertNumQueries(1):
+            self.assertEqual(view_counts.flush(), 4)
+        self.assertEqual(
+            dict(Job.objects.values_list('pk', 'views_count')),
+            {job.pk: 2, other.pk: 2}
+        )
+
+    def test_flush_writes_all_increments_together(self):
+        jobs = self.create_jobs(3)
+        for count, job in enumerate(jobs, 1):
+            view_counts.record(job.pk, count)
+        with self.assertNumQueries(5):
+            self.assertEqual(view_counts.flush(), 6)
+        self.assertEqual(sorted(Job.objects.values_list('views_count', flat=True)), [1, 2, 3])
+
+    @override_settings(JOB_VIEW_COUNT_MAX_PENDING=2)
+    def test_overflow_is_handed_to_the_flusher(self):
+        buffer = ViewCountBuffer()
+        # stands in for a running flusher thread
+        buffer._flusher = threading.Thread()
+        job, other = self.create_jobs(2)
+        with self.assertNumQueries(0):
+            buffer.record(job.pk)
+            buffer.record(other.pk)
+        self.assertTrue(buffer._wakeup.is_set())
+        self.assertEqual(buffer.flush(), 2)
+
+    def test_flusher_idles_while_flushes_are_off(self):
+        self.addCleanup(view_counts.flush)
+        with override_settings(JOB_VIEW_COUNT_FLUSH_INTERVAL=60):
+            view_counts._start_flusher()
+        job, = self.create_jobs(1)
+        view_counts.record(job.pk)
+        # wake the flusher for a round with flushes off
+        view_counts._wakeup.set()
+        time.sleep(0.05)
+        self.assertEqual(view_counts.pending(job.pk), 1)
+        self.assertTrue(view_counts._flusher.is_alive())
+
+
+class KeysetPaginationTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.jobs = self.create_jobs(25)
+        # Force ties on created_at so the id tiebreaker is exercised
+        Job.objects.filter(pk__in=[job.pk for job in self.jobs[5:15]]).update(
+            created_at=self.jobs[5].created_at
+        )
+        self.expected = list(Job.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        response = self.client.get(reverse('jobs:job-list'), {'paginate': 'cursor'})
+        self.assertIsNone(response.data['previous'])
+        self.assertEqual(response.data['count'], 25)
+        pages = [response.data]
+        while pages[-1]['next']:
+            with self.assertNumQueries(1):
+                pages.append(self.client.get(pages[-1]['next']).data)
+        self.assertEqual([row['id'] for page in pages for row in page['results']], self.expected)
+
+        previous = self.client.get(pages[2]['previous']).data
+        self.assertEqual(previous['results'], pages[1]['results'])
+        self.assertEqual(self.client.get(reverse('jobs:job-list'), {'cursor': 'bogus'}).status_code, 404)
+
+    def test_application_cursor_pages_use_an_index(self):
+        job = self.jobs[0]
+        JobApplication.objects.create(job=job, applicant=self.seeker)
+        queryset = JobApplication.objects.filter(job_id=job.pk).order_by('-applied_at', '-id')
+        now = timezone.now()
+        plan = queryset.filter(Q(applied_at__lt=now) | Q(applied_at=now, id__lt=10 ** 6))[:11].explain()
+        self.assertIn('job_applications_recent', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_page_numbers_remain_default(self):
+        response = self.client.get(reverse('jobs:job-list'), {'page': 2})
+        self.assertEqual([row['id'] for row in response.data['results']], self.expected[10:20])
+        response = self.client.get(reverse('jobs:job-list'), {'paginate': 'cursor', 'ordering': 'salary_min'})
+        self.assertIn('page=2', response.data['next'])
+
+
+class JobRecommendationTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        recommendations.reset_index()
+        self.addCleanup(recommendations.reset_index)
+        self.seeker.skills = 'Python, Django, ReactJS'
+        self.seeker.experience_years = 2
+        self.seeker.save()
+
+    def create_job(self, skills, experience=0, **kwargs):
+        return Job.objects.create(
+            employer=self.employer, title='Job', job_type='full_time',
+            skills_required=skills, experience_required=experience, **kwargs
+        )
+
+    def test_normalize_skills(self):
+        self.assertEqual(normalize_skills(' Python ,node.js,  Machine   Learning,python'),
+                         ['python', 'node', 'machine learning'])
+
+    def test_recommendations_rank_by_skill_and_experience(self):
+        exact = self.create_job('python, django')
+        senior = self.create_job('python, django', experience=6)
+        partial = self.create_job('python, go, rust, c++')
+        self.create_job('java, spring')
+        self.create_job('python', is_active=False)
+
+        self.client.force_authenticate(self.seeker_user)
+        response = self.client.get(reverse('jobs:job-recommendations'))
+        self.assertEqual([row['id'] for row in response.data['results']], [exact.id, senior.id, partial.id])
+
+        # The in-memory index follows job writes without a rebuild
+        partial.skills_required = 'react, python'
+        partial.save()
+        exact.delete()
+        response = self.client.get(reverse('jobs:job-recommendations'), {'limit': 1})
+        self.assertEqual([row['id'] for row in response.data['results']], [partial.id])
+        self.assertEqual(response.data['results'][0]['match_score'], 1.0)
+
+    def test_jobs_past_deadline_do_not_take_top_slots(self):
+        yesterday = timezone.now().date() - datetime.timedelta(days=1)
+        self.create_job('python, django, react', deadline=yesterday)
+        open_job = self.create_job('python', deadline=yesterday + datetime.timedelta(days=2))
+
+        self.client.force_authenticate(self.seeker_user)
+        response = self.client.get(reverse('jobs:job-recommendations'), {'limit': 1})
+        self.assertEqual([row['id'] for row in response.data['results']], [open_job.id])
+
+    def test_index_grows_rows_and_vocabulary(self):
+        index = recommendations.JobSkillIndex(capacity=2)
+        for job_id in range(1, 101):
+            index.upsert(job_id, f'skill{job_id}, common', 0)
+        self.assertEqual(index.score('skill99, skill7', 0, 2), [(99, 0.6), (7, 0.6)])
+        self.assertEqual(len(index.score('common', 0, 500)), 100)
+
+    def test_index_reuses_rows_and_prunes_skills(self):
+        index = recommendations.JobSkillIndex(capacity=2)
+        index.upsert(1, 'cobol, python', 0)
+        index.upsert(2, 'python', 0)
+        index.remove(1)
+        self.assertNotIn('cobol', index.postings)
+        index.upsert(3, 'rust', 0)
+        self.assertEqual(index.rows[3], 0)
+        self.assertEqual(index.score('cobol, rust', 0, 5), [(3, 1.0)])
+        index.upsert(2, 'go', 0)
+        self.assertEqual(index.score('python', 0, 5), [])
+
+
+class ResponseCacheTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache_stats.reset()
+        self.create_jobs(3)
+
+    def test_canonical_query(self):
+        self.assertEqual(
+            canonical_query(QueryDict('search=  Python  Dev&min_salary=1000.00&experience=03&page=')),
+            canonical_query(QueryDict('experience=3&min_salary=1e3&search=python dev')),
+        )
+
+    def test_anonymous_lists_are_cached_until_a_write(self):
+        url = reverse('jobs:job-list')
+        self.assertEqual(self.client.get(url, {'search': 'Job'})['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'search': ' job '})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['count'], 3)
+
+        # the generation moves when the write commits, not before
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_jobs(1)
+            self.assertEqual(self.client.get(url, {'search': 'job'})['X-Cache'], 'HIT')
+        for callback in callbacks:
+            callback()
+        response = self.client.get(url, {'search': 'job'})
+        self.assertEqual((response['X-Cache'], response.data['count']), ('MISS', 4))
+
+        self.client.get(reverse('jobs:category-list'))
+        self.employer.company_name = 'Globex'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employer.save()
+        self.assertEqual(self.client.get(reverse('jobs:category-list'))['X-Cache'], 'MISS')
+        self.assertEqual(cache_stats.snapshot()['job-list'], {'hits': 2, 'misses': 2, 'hit_rate': 0.5})
+
+    def test_application_writes_refresh_cached_counts(self):
+        url = reverse('jobs:job-list')
+        self.client.get(url)
+        job = Job.objects.order_by('-created_at').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            JobApplication.objects.create(job=job, applicant=self.seeker)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        row = next(row for row in response.data['results'] if row['id'] == job.pk)
+        self.assertEqual(row['applications_count'], 1)
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_authenticate(self.seeker_user)
+        self.assertNotIn('X-Cache', self.client.get(reverse('jobs:job-list')))
+        self.client.force_authenticate(self.employer_user)
+        self.assertEqual(self.client.get(reverse('jobs:cache-stats')).status_code, 403)
+
+
+@override_settings(JOB_VIEW_COUNT_FLUSH_INTERVAL=0)
+class ConditionalGetTests(JobTestMixin, TestCase):
+
+    def assertRevalidates(self, url, change):
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        self.assertFalse(response.has_header('Last-Modified'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_job_detail(self):
+        self.addCleanup(view_counts.flush)
+        job = self.create_jobs(1)[0]
+        self.client.force_authenticate(self.seeker_user)
+        url = reverse('jobs:job-detail', args=[job.pk])
+        self.assertRevalidates(url, lambda: SavedJob.objects.create(user=self.seeker_user, job=job))
+        self.assertRevalidates(url, lambda: Job.objects.get(pk=job.pk).save())
+
+    def test_employer_job_list(self):
+        job = self.create_jobs(1)[0]
+        self.client.force_authenticate(self.employer_user)
+        url = reverse('jobs:employer-job-list')
+        self.assertRevalidates(url, lambda: self.create_jobs(1))
+        self.assertRevalidates(url, lambda: JobCategory.objects.filter(pk=self.category.pk).update(name='Renamed'))
+        self.assertRevalidates(url, lambda: User.objects.filter(pk=self.employer_user.pk).update(email='new@example.com'))
+        self.assertRevalidates(url, job.delete)
+
+    def test_saved_job_list(self):
+        job, other = self.create_jobs(2)
+        SavedJob.objects.create(user=self.seeker_user, job=job)
+        self.client.force_authenticate(self.seeker_user)
+        url = reverse('jobs:saved-jobs')
+        self.assertRevalidates(url, lambda: JobApplication.objects.create(job=job, applicant=self.seeker))
+        self.assertRevalidates(url, lambda: SavedJob.objects.create(user=self.seeker_user, job=other))
+        self.assertRevalidates(url, lambda: SavedJob.objects.filter(job=other).delete())
+
+
+class ApplicationCounterTests(JobTestMixin, TestCase):
+
+    def apply(self, job, index):
+        user = User.objects.create_user(email=f'applicant{index}@example.com', password='password123')
+        applicant = JobSeeker.objects.create(user=user, full_name=f'Applicant {index}', phone='1')
+        return JobApplication.objects.create(job=job, applicant=applicant)
+
+    def test_counters_follow_applications(self):
+        job = self.create_jobs(1)[0]
+        applications = [self.apply(job, index) for index in range(3)]
+        self.client.force_authenticate(self.employer_user)
+        url = reverse('jobs:update-application-status', args=[applications[0].pk])
+        self.assertEqual(self.client.patch(url, {'status': 'shortlisted'}).status_code, 200)
+        self.assertEqual(self.client.patch(url, {'status': 'accepted'}).status_code, 200)
+        self.assertEqual(self.client.patch(url, {'status': 'bogus'}).status_code, 400)
+        missing = reverse('jobs:update-application-status', args=[applications[-1].pk + 1])
+        self.assertEqual(self.client.patch(missing, {'status': 'bogus'}).status_code, 404)
+        applications[1].delete()
+
+        job.refresh_from_db()
+        self.assertEqual(job.application_count, 2)
+        self.assertEqual(job.application_pipeline, {
+            'pending': 1, 'reviewed': 0, 'shortlisted': 0, 'rejected': 0, 'accepted': 1
+        })
+
+        Job.objects.update(applications_count=0, pending_applications_count=5)
+        rebuild_application_counters()
+        job.refresh_from_db()
+        self.assertEqual((job.applications_count, job.pending_applications_count), (2, 1))
+
+    def test_dashboard_reads_counters(self):
+        self.client.force_authenticate(self.employer_user)
+        jobs = self.create_jobs(1)
+        few = self.count_queries(reverse('jobs:employer-job-list'))
+        jobs += self.create_jobs(9)
+        for index, job in enumerate(jobs):
+            self.apply(job, index)
+        self.assertEqual(few, self.count_queries(reverse('jobs:employer-job-list')))
+
+        response = self.client.get(reverse('jobs:employer-job-list'))
+        self.assertEqual(response.data['results'][0]['application_pipeline']['pending'], 1)
+        response = self.client.get(reverse('jobs:employer-application-summary'))
+        self.assertEqual(response.data, {
+            'jobs': 10, 'active_jobs': 10, 'applications': 10,
+            'by_status': {'pending': 10, 'reviewed': 0, 'shortlisted': 0, 'rejected': 0, 'accepted': 0},
+        })
+
+    def test_bulk_status_update(self):
+        job, other = self.create_jobs(2)
+        applications = [self.apply(job, index) for index in range(3)] + [self.apply(other, 3)]
+        foreign_employer = User.objects.create_user(
+            email='other@example.com', password='password123', user_type='employer'
+        )
+        foreign_job = Job.objects.create(
+            employer=Employer.objects.create(user=foreign_employer, company_name='Other'),
+            title='Foreign', job_type='full_time'
+        )
+        foreign = self.apply(foreign_job, 4)
+
+        self.client.force_authenticate(self.employer_user)
+        # ownership check, one UPDATE per target status and per counter delta
+        with self.assertNumQueries(5 + 2):  # + savepoint and release
+            response = self.client.post(reverse('jobs:bulk-update-application-status'), {'updates': [
+                {'id': applications[0].pk, 'status': 'shortlisted'},
+                {'id': applications[1].pk, 'status': 'shortlisted'},
+                {'id': applications[2].pk, 'status': 'pending'},
+                {'id': applications[3].pk, 'status': 'rejected'},
+                {'id': foreign.pk, 'status': 'accepted'},
+                {'id': 999, 'status': 'bogus'},
+            ]}, format='json')
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual([row['result'] for row in response.data['results']],
+                         ['updated', 'updated', 'unchanged', 'updated', 'not_found', 'invalid_status'])
+
+        job.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((job.pending_applications_count, job.shortlisted_applications_count), (1, 2))
+        self.assertEqual((other.pending_applications_count, other.rejected_applications_count), (0, 1))
+        self.assertIsNotNone(JobApplication.objects.get(pk=applications[0].pk).reviewed_at)
+        self.assertEqual(JobApplication.objects.get(pk=foreign.pk).status, 'pending')
+
+
+class JobListingTests(JobTestMixin, TestCase):
+
+    def apply(self, job, index):
+        user = User.objects.create_user(email=f'applicant{index}@example.com', password='password123')
+        applicant = JobSeeker.objects.create(user=user, full_name=f'Applicant {index}', phone='1')
+        return JobApplication.objects.create(job=job, applicant=applicant)
+
+    def test_listing_follows_writes(self):
+        job = self.create_jobs(1, salary_min=1000, salary_max=2000)[0]
+        listing = JobListing.objects.get(pk=job.pk)
+        self.assertEqual((listing.title, listing.employer_name, listing.category_name), ('Job 0', 'Acme', 'Engineering'))
+        self.assertEqual((listing.salary_min, listing.salary_max), (1000, 2000))
+
+        job.title = 'Staff Engineer'
+        job.save(update_fields=['title'])
+        self.employer.company_name = 'Acme Corp'
+        self.employer.save()
+        self.category.name = 'Software'
+        self.category.save()
+        application = self.apply(job, 0)
+        listing.refresh_from_db()
+        self.assertEqual((listing.title, listing.employer_name, listing.category_name), ('Staff Engineer', 'Acme Corp', 'Software'))
+        self.assertEqual(listing.applications_count, 1)
+
+        application.delete()
+        Job.objects.filter(pk=job.pk).update(is_active=False)
+        rebuild_application_counters()
+        listing.refresh_from_db()
+        self.assertEqual((listing.applications_count, listing.is_active), (0, True))
+        call_command('rebuild_job_listings', stdout=io.StringIO())
+        self.assertFalse(JobListing.objects.get(pk=job.pk).is_active)
+
+        job.delete()
+        self.assertFalse(JobListing.objects.exists())
+
+    def test_rebuild_upserts_in_batches(self):
+        jobs = self.create_jobs(5)
+        JobListing.objects.filter(pk=jobs[0].pk).delete()
+        Job.objects.filter(pk=jobs[3].pk).update(title='Renamed')
+        self.assertEqual(rebuild_listings(batch_size=2), 5)
+        self.assertEqual(
+            sorted(JobListing.objects.values_list('job_id', flat=True)), sorted(job.pk for job in jobs)
+        )
+        self.assertEqual(JobListing.objects.get(pk=jobs[3].pk).title, 'Renamed')
+
+    def test_lists_match_job_serializer(self):
+        jobs = self.create_jobs(3, salary_min=500, deadline=datetime.date(2030, 1, 1))
+        SavedJob.objects.create(user=self.seeker_user, job=jobs[0])
+        self.apply(jobs[1], 0)
+        self.client.force_authenticate(self.seeker_user)
+        request = self.client.get(reverse('jobs:job-list')).wsgi_request
+        expected = JobListSerializer(
+            Job.objects.order_by('-created_at', '-id'), many=True, context={'request': request}
+        ).data
+
+        self.assertEqual(self.client.get(reverse('jobs:job-list')).data['results'], expected)
+        saved = self.client.get(reverse('jobs:saved-jobs')).data['results']
+        self.assertEqual(saved[0]['job'], expected[-1])
+
+    def test_lists_read_the_listing_table(self):
+        jobs = self.create_jobs(3)
+        SavedJob.objects.create(user=self.seeker_user, job=jobs[0])
+        JobApplication.objects.create(job=jobs[0], applicant=self.seeker)
+        self.client.force_authenticate(self.seeker_user)
+        for name in ('job-list', 'saved-jobs', 'my-applications'):
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.client.get(reverse(f'jobs:{name}')).status_code, 200)
+            for query in context.captured_queries:
+                self.assertNotIn('"jobs"', query['sql'], name)
+
+
+class JobExpiryTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        today = timezone.now().date()
+        self.expired = self.create_jobs(3, deadline=today - datetime.timedelta(days=1))
+        self.open = self.create_jobs(1, deadline=today) + self.create_jobs(1)
+
+    def list_ids(self):
+        cache.clear()
+        return {row['id'] for row in self.client.get(reverse('jobs:job-list')).data['results']}
+
+    def test_expired_jobs_are_hidden_and_swept(self):
+        open_ids = {job.pk for job in self.open}
+        self.assertEqual(self.list_ids(), open_ids)
+        self.client.force_authenticate(self.seeker_user)
+        response = self.client.post(reverse('jobs:apply-job'), {'job': self.expired[0].pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('deadline', str(response.data['job']))
+
+        self.assertEqual(expiry.expire_jobs(size=2, pause=0), 3)
+        self.assertEqual(expiry.expire_jobs(size=2, pause=0), 0)
+        self.assertFalse(Job.objects.filter(pk__in=[job.pk for job in self.expired], is_active=True).exists())
+        self.assertFalse(JobListing.objects.filter(pk__in=[job.pk for job in self.expired], is_active=True).exists())
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.active_jobs_count, 2)
+        self.assertEqual(self.list_ids(), open_ids)
+
+    def test_sweep_reschedules_itself(self):
+        self.assertIsNotNone(schedule_expiry())
+        self.assertIsNone(schedule_expiry())
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(Job.objects.filter(is_active=True).count(), 2)
+        queued = Task.objects.get(name=expire_jobs.name, status=Task.QUEUED)
+        self.assertGreater(queued.run_at, timezone.now())
+
+    @override_settings(JOB_EXPIRY_BATCH_SIZE=1, JOB_EXPIRY_BATCH_PAUSE='not a number')
+    def test_failed_sweep_is_only_retried(self):
+        schedule_expiry()
+        self.assertEqual(run_pending(), 1)
+        queued = Task.objects.get(name=expire_jobs.name, status=Task.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+
+    def test_workers_keep_a_sweep_queued(self):
+        housekeeping.send(sender=Worker, worker=None)
+        queued = Task.objects.get(name=expire_jobs.name, status=Task.QUEUED)
+        Task.objects.filter(pk=queued.pk).update(status=Task.RUNNING)
+        housekeeping.send(sender=Worker, worker=None)
+        self.assertEqual(Task.objects.filter(name=expire_jobs.name).count(), 1)
+
+        Task.objects.filter(pk=queued.pk).update(status=Task.FAILED)
+        housekeeping.send(sender=Worker, worker=None)
+        self.assertTrue(Task.objects.filter(name=expire_jobs.name, status=Task.QUEUED).exists())
+
+
+class JobFacetTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.design = JobCategory.objects.create(name='Design', slug='design')
+        self.create_jobs(3, location='Pune', salary_min=60000)
+        self.create_jobs(2, job_type='remote', location='Delhi')
+        Job.objects.create(employer=self.employer, category=self.design, title='Designer',
+                           job_type='remote', location='Pune', salary_min=250000)
+
+    def facets(self, **params):
+        response = self.client.get(reverse('jobs:job-facets'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response
+
+    def counts(self, data, facet):
+        return {row['value']: row['count'] for row in data['facets'][facet]}
+
+    def test_counts_exclude_their_own_filter(self):
+        data = self.facets().data
+        self.assertEqual(data['count'], 6)
+        self.assertEqual(self.counts(data, 'category'), {self.category.pk: 5, self.design.pk: 1})
+        self.assertEqual(self.counts(data, 'job_type'), {'full_time': 3, 'remote': 3})
+        self.assertEqual(self.counts(data, 'location'), {'Pune': 4, 'Delhi': 2})
+        self.assertEqual(self.counts(data, 'salary_band'), {-1: 2, 1: 3, 3: 1})
+
+        data = self.facets(job_type='remote', location='Pune').data
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(self.counts(data, 'job_type'), {'full_time': 3, 'remote': 1})
+        self.assertEqual(self.counts(data, 'location'), {'Pune': 1, 'Delhi': 2})
+        self.assertEqual(self.counts(data, 'category'), {self.design.pk: 1})
+        for row in self.facets(search='designer').data['facets']['category']:
+            listed = self.client.get(reverse('jobs:job-list'), {'search': 'designer', 'category': row['value']})
+            self.assertEqual(listed.data['count'], row['count'])
+
+    def test_facets_are_cached_per_generation(self):
+        self.assertEqual(self.facets()['X-Cache'], 'MISS')
+        self.client.force_authenticate(self.seeker_user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.facets()['X-Cache'], 'HIT')
+        # a different facet selection reuses the cached counts
+        with self.assertNumQueries(1):
+            self.facets(category=self.design.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_jobs(1)
+        self.assertEqual(self.facets().data['count'], 7)
+
+
+class JobGeoTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_jobs(2, location='Pune, Maharashtra')
+        self.create_jobs(1, location='Mumbai')
+        self.create_jobs(1, location='Bengaluru (Hybrid)')
+        self.create_jobs(1, location='Remote')
+
+    def listed(self, **params):
+        response = self.client.get(reverse('jobs:job-list'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_locations_are_matched_against_the_gazetteer(self):
+        self.assertEqual(geo.find_place('poona').name, 'Pune')
+        self.assertEqual(geo.coordinates('Atlantis'), (None, None))
+        self.assertAlmostEqual(geo.distance_km(18.5204, 73.8567, 19.0760, 72.8777), 120, delta=2)
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+        job = Job.objects.get(location='Bengaluru (Hybrid)')
+        self.assertEqual((job.latitude, job.longitude), (12.9716, 77.5946))
+        job.location = 'Chennai'
+        job.save(update_fields=['location'])
+        listing = JobListing.objects.get(pk=job.pk)
+        self.assertEqual(listing.latitude, 13.0827)
+        self.assertEqual(listing.geohash, geo.encode(13.0827, 80.2707))
+        self.assertEqual(JobListing.objects.get(location='Remote').geohash, '')
+
+    def test_radius_search_is_sorted_by_distance(self):
+        data = self.listed(near='Pune', radius=25)
+        self.assertEqual([row['location'] for row in data['results']], ['Pune, Maharashtra'] * 2)
+
+        data = self.listed(near='pune', radius=150)
+        self.assertEqual([row['location'] for row in data['results']][-1], 'Mumbai')
+        self.assertEqual([row['distance_km'] for row in data['results']], [0.0, 0.0, 120.2])
+        self.assertEqual(self.listed(lat=19.07, lon=72.87, radius=150)['results'][0]['location'], 'Mumbai')
+        # combined with the other filters and the facet counts
+        self.assertEqual(self.listed(near='Pune', radius=150, location='Mumbai')['count'], 1)
+        facets = self.client.get(reverse('jobs:job-facets'), {'near': 'Pune', 'radius': 150}).data
+        self.assertEqual(facets['count'], 3)
+        self.assertNotIn('distance_km', self.listed()['results'][0])
+
+    def test_bounding_box(self):
+        data = self.listed(bbox='72,12,78,19')
+        self.assertEqual(
+            sorted(row['location'] for row in data['results']),
+            ['Bengaluru (Hybrid)', 'Pune, Maharashtra', 'Pune, Maharashtra']
+        )
+
+    def test_rejects_bad_areas(self):
+        for params in ({'near': 'Atlantis'}, {'near': 'Pune', 'radius': 5000}, {'lat': 18}, {'bbox': '1,2,3'}):
+            response = self.client.get(reverse('jobs:job-list'), params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class JobImportTests(JobTestMixin, TestCase):
+
+    def upload(self, name, content, **params):
+        self.client.force_authenticate(self.employer_user)
+        url = reverse('jobs:job-import')
+        if params:
+            url += '?' + urlencode(params)
+        if isinstance(content, str):
+            content = content.encode()
+        return self.client.post(url, {'file': SimpleUploadedFile(name, content)}, format='multipart')
+
+    def test_csv_import_reports_row_errors(self):
+        response = self.upload('jobs.csv', (
+            'title,job_type,category,salary_min,salary_max,deadline,description\n'
+            'Python Developer,full_time,engineering,100,200,,Django work\n'
+            'Bad Salary,full_time,,300,200,,\n'
+            'Expired,contract,,,,2000-01-01,\n'
+            ',remote,,,,,\n'
+            f'Remote Tester,remote,{self.category.pk},,,,\n'
+        ))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 3))
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4, 5])
+        self.assertIn('salary_max', response.data['errors'][0]['errors'])
+        self.assertIn('deadline', response.data['errors'][1]['errors'])
+        self.assertIn('title', response.data['errors'][2]['errors'])
+
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.active_jobs_count, 2)
+        self.assertEqual(len(search('django')), 1)
+
+    def test_jsonl_import_in_batches(self):
+        lines = [json.dumps({'title': f'Job {index}', 'job_type': 'full_time'}) for index in range(7)]
+        response = self.upload('jobs.txt', '\n'.join(lines + ['not json', '[1]']), file_format='jsonl')
+        self.assertEqual((response.data['created'], response.data['failed']), (7, 2))
+        self.assertEqual(Job.objects.filter(employer=self.employer).count(), 7)
+
+    def test_jsonl_non_object_rows_are_reported(self):
+        response = self.upload('jobs.jsonl', '"hello"\n', file_format='jsonl')
+        self.assertEqual((response.data['created'], response.data['failed']), (0, 1))
+        self.assertEqual(response.data['errors'], [{'row': 1, 'errors': {'non_field_errors': ['Expected a JSON object']}}])
+
+    def test_non_utf8_rows_are_reported(self):
+        response = self.upload('jobs.csv', b'title,job_type\n\xff\xfe,full_time\nTester,remote\n')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['errors'], [{'row': 2, 'errors': {'non_field_errors': ['Invalid UTF-8 text']}}])
+
+        response = self.upload('jobs.jsonl', b'{"title": "\xe9", "job_type": "remote"}\n')
+        self.assertEqual((response.data['created'], response.data['failed']), (0, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 1)
+
+
+class ApplicationExportTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.job, self.other = self.create_jobs(2)
+        self.applications = [
+            JobApplication.objects.create(job=job, applicant=self.seeker_for(index), status=status)
+            for index, (job, status) in enumerate([
+                (self.job, 'pending'), (self.job, 'shortlisted'), (self.other, 'shortlisted'),
+            ])
+        ]
+        self.client.force_authenticate(self.employer_user)
+
+    def seeker_for(self, index):
+        user = User.objects.create_user(email=f'applicant{index}@example.com', password='password123')
+        return JobSeeker.objects.create(user=user, full_name=f'Applicant, {index}', phone='1')
+
+    def export(self, **params):
+        response = self.client.get(reverse('jobs:employer-application-export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        rows = list(csv.DictReader(io.StringIO(self.export(status='shortlisted'))))
+        self.assertEqual([row['application_id'] for row in rows],
+                         [str(self.applications[1].pk), str(self.applications[2].pk)])
+        self.assertEqual(rows[0]['full_name'], 'Applicant, 1')
+        self.assertEqual(rows[0]['email'], 'applicant1@example.com')
+        self.assertEqual(rows[0]['job_title'], self.job.title)
+
+    def test_csv_export_neutralises_formulas(self):
+        JobApplication.objects.filter(pk=self.applications[0].pk).update(cover_letter='=HYPERLINK("x")')
+        JobSeeker.objects.filter(pk=self.applications[0].applicant_id).update(phone='+1 555')
+        row = next(csv.DictReader(io.StringIO(self.export(status='pending'))))
+        self.assertEqual((row['cover_letter'], row['phone']), ('\'=HYPERLINK("x")', "'+1 555"))
+        line = json.loads(self.export(file_format='jsonl', status='pending'))
+        self.assertEqual(line['cover_letter'], '=HYPERLINK("x")')
+
+    def test_jsonl_export_filters(self):
+        lines = self.export(file_format='jsonl', job_id=self.job.pk).splitlines()
+        self.assertEqual([json.loads(line)['status'] for line in lines], ['pending', 'shortlisted'])
+        tomorrow = (timezone.now() + datetime.timedelta(days=1)).date().isoformat()
+        self.assertEqual(self.export(file_format='jsonl', applied_after=tomorrow), '')
+
+    def test_asgi_export_streams_asynchronously(self):
+        async def export():
+            response = await AsyncClient().get(
+                reverse('jobs:employer-application-export'), {'file_format': 'jsonl'},
+                headers={'Authorization': f'Bearer {AccessToken.for_user(self.employer_user)}'},
+            )
+            self.assertTrue(response.is_async)
+            return b''.join([part async for part in response.streaming_content]).decode()
+
+        lines = async_to_sync(export)().splitlines()
+        self.assertEqual([json.loads(line)['application_id'] for line in lines],
+                         [application.pk for application in self.applications])
+
+    def test_rejects_bad_filters(self):
+        url = reverse('jobs:employer-application-export')
+        self.assertEqual(self.client.get(url, {'status': 'bogus'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'applied_before': 'yesterday'}).status_code, 400)
+        self.client.force_authenticate(self.seeker_user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class AsyncViewTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.jobs = self.create_jobs(3)
+        SavedJob.objects.create(user=self.seeker_user, job=self.jobs[0])
+        JobApplication.objects.create(job=self.jobs[1], applicant=self.seeker)
+        self.addCleanup(view_counts.flush)
+
+    def call(self, view_class, user=None, params=None, **kwargs):
+        request = APIRequestFactory().get('/', params or {})
+        if user is not None:
+            force_authenticate(request, user)
+        view = view_class.as_view()
+        if iscoroutinefunction(view):
+            view = async_to_sync(view)
+        response = view(request, **kwargs)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_urls_route_to_async_views(self):
+        for url in [reverse('jobs:job-list'), reverse('jobs:job-detail', args=[self.jobs[0].pk]),
+                    reverse('jobs:category-list'), reverse('jobs:saved-jobs'), reverse('account:profile')]:
+            self.assertTrue(iscoroutinefunction(resolve(url).func), url)
+
+    def test_async_views_match_sync_views(self):
+        cases = [
+            (JobListView, AsyncJobListView, self.seeker_user, {}, {}),
+            (JobListView, AsyncJobListView, self.seeker_user, {'paginate': 'cursor'}, {}),
+            (JobListView, AsyncJobListView, None, {'page': 'last', 'ordering': 'salary_min'}, {}),
+            (JobCategoryListView, AsyncJobCategoryListView, None, {}, {}),
+            (SavedJobListView, AsyncSavedJobListView, self.seeker_user, {}, {}),
+            (ProfileView, AsyncProfileView, self.seeker_user, {}, {}),
+            (JobDetailView, AsyncJobDetailView, self.seeker_user, {}, {'pk': self.jobs[1].pk}),
+        ]
+        for sync_view, async_view, user, params, kwargs in cases:
+            with self.subTest(view=sync_view.__name__, params=params):
+                expected = self.call(sync_view, user, params, **kwargs)
+                actual = self.call(async_view, user, params, **kwargs)
+                if 'views_count' in expected:
+                    expected.pop('views_count'), actual.pop('views_count')
+                self.assertEqual(actual, expected)
+
+        results = self.call(AsyncJobListView, self.seeker_user)['results']
+        flags = {row['id']: (row['is_saved'], row['has_applied']) for row in results}
+        self.assertEqual(flags[self.jobs[0].pk], (True, False))
+        self.assertEqual(flags[self.jobs[1].pk], (False, True))
+
+    def test_async_views_enforce_permissions(self):
+        response = self.client.get(reverse('jobs:saved-jobs'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.client.get(reverse('jobs:job-detail', args=[999])).status_code, 404)
+        self.client.force_authenticate(self.employer_user)
+        self.assertEqual(self.client.get(reverse('jobs:saved-jobs')).status_code, 403)
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, JobTestMixin, TestCase):
+    """
+    Every Job endpoint stays within its query budget with a hundred rows
+    behind it, and list endpoints run the same queries for any page size
+    """
+    rows = 100
+
+    def setUp(self):
+        super().setUp()
+        identity_cache.clear()
+        self.addCleanup(identity_cache.clear)
+        recommendations.reset_index()
+        self.addCleanup(recommendations.reset_index)
+        self.addCleanup(view_counts.flush)
+        self.seeker.skills = 'Python, Django'
+        self.seeker.save()
+        self.staff_user = User.objects.create_user(email='staff@example.com', password='password123', is_staff=True)
+
+        categories = JobCategory.objects.bulk_create(
+            JobCategory(name=f'Category {index}', slug=f'category-{index}') for index in range(self.rows)
+        )
+        self.jobs = Job.objects.bulk_create(
+            Job(employer=self.employer, category=category, title=f'Python job {index}', job_type='full_time',
+                skills_required='python, django', location='Remote')
+            for index, category in enumerate(categories)
+        )
+        users = User.objects.bulk_create(
+            User(email=f'applicant{index}@example.com', user_type='job_seeker') for index in range(self.rows)
+        )
+        applicants = JobSeeker.objects.bulk_create(
+            JobSeeker(user=user, full_name=f'Applicant {index}', phone='1') for index, user in enumerate(users)
+        )
+        JobApplication.objects.bulk_create(
+            [JobApplication(job=job, applicant=applicant) for job, applicant in zip(self.jobs, applicants)]
+            + [JobApplication(job=job, applicant=self.seeker) for job in self.jobs[1:]]
+        )
+        SavedJob.objects.bulk_create(SavedJob(user=self.seeker_user, job=job) for job in self.jobs[1:])
+        rebuild_category_counters()
+        rebuild_application_counters()
+        rebuild_index()
+        self.application = JobApplication.objects.filter(job=self.jobs[0]).first()
+
+    def login(self, user):
+        self.client.force_authenticate(None)
+        if user is None:
+            self.client.credentials()
+        else:
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def endpoints(self):
+        """
+        (url name, kwargs, user, method, request options, expected status)
+        """
+        job = self.jobs[0]
+        job_data = {'title': 'New job', 'description': 'Work', 'job_type': 'full_time', 'category': self.category.pk}
+        import_file = SimpleUploadedFile('jobs.jsonl', '\n'.join(
+            json.dumps({'title': f'Imported {index}', 'job_type': 'remote', 'category': 'engineering'})
+            for index in range(self.rows)
+        ).encode())
+        updates = [{'id': pk, 'status': 'reviewed'}
+                   for pk in JobApplication.objects.filter(job__employer=self.employer).values_list('pk', flat=True)]
+        return [
+            ('category-list', {}, None, 'get', {}, 200),
+            ('job-list', {}, None, 'get', {}, 200),
+            ('job-list', {}, self.seeker_user, 'get', {'data': {'search': 'python'}}, 200),
+            ('job-facets', {}, None, 'get', {'data': {'search': 'python', 'category': self.category.pk}}, 200),
+            ('job-detail', {'pk': job.pk}, self.seeker_user, 'get', {}, 200),
+            ('job-recommendations', {}, self.seeker_user, 'get', {}, 200),
+            ('employer-job-list', {}, self.employer_user, 'get', {}, 200),
+            ('job-create', {}, self.employer_user, 'post', {'data': job_data}, 201),
+            ('job-import', {}, self.employer_user, 'post', {'data': {'file': import_file}, 'format': 'multipart'}, 201),
+            ('job-update', {'pk': job.pk}, self.employer_user, 'patch', {'data': {'title': 'Renamed'}}, 200),
+            ('apply-job', {}, self.seeker_user, 'post', {'data': {'job': job.pk}}, 201),
+            ('my-applications', {}, self.seeker_user, 'get', {}, 200),
+            ('employer-applications', {}, self.employer_user, 'get', {}, 200),
+            ('employer-application-summary', {}, self.employer_user, 'get', {}, 200),
+            ('employer-application-export', {}, self.employer_user, 'get', {}, 200),
+            ('update-application-status', {'pk': self.application.pk}, self.employer_user, 'patch',
+             {'data': {'status': 'shortlisted'}}, 200),
+            ('bulk-update-application-status', {}, self.employer_user, 'post',
+             {'data': {'updates': updates}, 'format': 'json'}, 200),
+            ('saved-jobs', {}, self.seeker_user, 'get', {}, 200),
+            ('save-job', {'job_id': job.pk}, self.seeker_user, 'post', {}, 201),
+            ('save-job', {'job_id': job.pk}, self.seeker_user, 'delete', {}, 200),
+            ('cache-stats', {}, self.staff_user, 'get', {}, 200),
+            ('job-delete', {'pk': job.pk}, self.employer_user, 'delete', {}, 204),
+        ]
+
+    def test_every_endpoint_is_budgeted(self):
+        names = {pattern.name for pattern in job_urls.urlpatterns}
+        self.assertEqual(names, {name for name, *_ in self.endpoints()})
+
+    def test_endpoints_within_budget(self):
+        for name, kwargs, user, method, options, status_code in self.endpoints():
+            with self.subTest(name, method=method):
+                self.login(user)
+                self.assertWithinQueryBudget(
+                    method, reverse(f'jobs:{name}', kwargs=kwargs), status_code=status_code, **options
+                )
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        lists = [
+            ('category-list', None, {}),
+            ('job-list', None, {}),
+            ('job-list', self.seeker_user, {'paginate': 'cursor'}),
+            ('employer-job-list', self.employer_user, {}),
+            ('my-applications', self.seeker_user, {}),
+            ('my-applications', self.seeker_user, {'paginate': 'cursor'}),
+            ('employer-applications', self.employer_user, {}),
+            ('saved-jobs', self.seeker_user, {}),
+        ]
+        for name, user, params in lists:
+            with self.subTest(name, params=params):
+                self.login(user)
+                self.assertQueriesIndependentOfPageSize(reverse(f'jobs:{name}'), params=params)
+
+    def test_middleware_reports_and_enforces_budgets(self):
+        self.login(self.staff_user)
+        url = reverse('jobs:cache-stats')
+        response = self.client.get(url)
+        self.assertEqual(response['X-DB-Queries'], '1')
+        self.assertIn('X-DB-Time-Ms', response)
+
+        with override_settings(QUERY_BUDGET_DEFAULT=0):
+            identity_cache.clear()
+            with self.assertLogs('JobPortal.querybudget', 'WARNING') as logs:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertIn('over its budget of 0', logs.output[0])
+            identity_cache.clear()
+            with override_settings(QUERY_BUDGET_RAISE=True), self.assertRaises(QueryBudgetExceeded):
+                self.client.get(url)
+
+    def test_middleware_counts_async_view_queries(self):
+        url = reverse('jobs:saved-jobs')
+        self.assertTrue(iscoroutinefunction(resolve(url).func))
+        authorization = f'Bearer {AccessToken.for_user(self.seeker_user)}'
+
+        async def get():
+            return await AsyncClient().get(url, headers={'Authorization': authorization})
+
+        async_to_sync(get)()
+        response = async_to_sync(get)()
+        self.assertGreater(int(response['X-DB-Queries']), 0)
+        self.client.force_authenticate(None)
+        sync_response = self.client.get(url, HTTP_AUTHORIZATION=authorization)
+        self.assertEqual(response['X-DB-Queries'], sync_response['X-DB-Queries'])
+
+    def test_fingerprint_ignores_parameters(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM jobs WHERE id = 12 AND title = 'it''s'"),
+            fingerprint('SELECT *  FROM jobs WHERE id = 7 AND title = \'x\''),
+        )
+        self.assertEqual(fingerprint('SELECT * FROM jobs WHERE id IN (%s, %s, %s)'),
+                         'SELECT * FROM jobs WHERE id IN (...)')
+
+
+class SyntheticDataTests(TestCase):
+
+    sizes = dict(employers=3, seekers=12, categories=4, jobs=60, applications=80, saved_jobs=30, batch_size=25)
+
+    def setUp(self):
+        cache.clear()
+        identity_cache.clear()
+        self.addCleanup(identity_cache.clear)
+        self.addCleanup(recommendations.reset_index)
+        self.addCleanup(view_counts.flush)
+
+    def snapshot(self):
+        return (
+            list(Job.objects.order_by('created_at').values_list('title', 'employer__user__email', 'location', 'is_active')),
+            sorted(JobApplication.objects.values_list('job__title', 'applicant__user__email', 'status')),
+        )
+
+    def test_same_seed_same_data(self):
+        with transaction.atomic():
+            SyntheticDataGenerator(seed=7, **self.sizes).run()
+            first = self.snapshot()
+            transaction.set_rollback(True)
+        written = SyntheticDataGenerator(seed=7, **self.sizes).run()
+        self.assertEqual(self.snapshot(), first)
+        self.assertEqual(written['jobs'], 60)
+        self.assertEqual(written['applications'], JobApplication.objects.count())
+
+        category = JobCategory.objects.order_by('-active_jobs_count').first()
+        self.assertEqual(category.active_jobs_count, category.jobs.filter(is_active=True).count())
+        job = Job.objects.order_by('-applications_count').first()
+        self.assertEqual(job.applications_count, job.applications.count())
+        self.assertTrue(all(a.applied_at >= a.job.created_at for a in JobApplication.objects.select_related('job')))
+
+    def test_benchmark_runner(self):
+        SyntheticDataGenerator(seed=1, **self.sizes).run()
+        scenarios = default_scenarios()
+        report = run_benchmarks(scenarios, requests=3, warmup=1)
+        self.assertEqual(set(report['results']), {scenario.name for scenario in scenarios})
+        for name, result in report['results'].items():
+            with self.subTest(name):
+                self.assertEqual((result['requests'], result['errors']), (3, 0))
+                self.assertGreater(result['throughput_rps'], 0)
+                self.assertLessEqual(result['latency_ms']['p50'], result['latency_ms']['p99'])
+        self.assertEqual(report['environment']['rows']['jobs'], 60)
+        self.assertGreater(report['results']['job-list-seeker']['queries']['mean'], 0)
+
+        rows = compare_results(report, report)
+        self.assertTrue(rows)
+        self.assertFalse(any(regressed for *_, regressed in rows))
+
+
+class SamplingProfilerTests(JobTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        profiles.reset()
+        self.addCleanup(profiles.reset)
+        self.create_jobs(3)
+
+    def busy(self, seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            SamplingProfilerMiddleware(lambda request: None)
+
+    def test_sampler_records_the_calling_thread(self):
+        sampler = StackSampler()
+        with override_settings(PROFILER_INTERVAL=0.001):
+            sampler.start()
+            self.busy(0.05)
+            stacks = sampler.stop()
+        self.assertTrue(any(stack.endswith('SamplingProfilerTests.busy') for stack in stacks), stacks)
+        self.assertEqual(sampler.stop(), {})
+
+    def test_category_of_innermost_frame(self):
+        self.assertEqual(category('Job.views:JobListView.list;rest_framework.serializers:Serializer.data;'
+                                  'django.db.models.query:QuerySet.__iter__'), 'orm')
+        self.assertEqual(category('rest_framework.renderers:JSONRenderer.render;json.encoder:encode'), 'rendering')
+        self.assertEqual(category('Job.views:JobListView.list'), 'other')
+
+    @override_settings(PROFILER_ENABLED=True, PROFILER_SAMPLE_RATE=0)
+    def test_profiles_requests_with_signed_token(self):
+        client = APIClient()
+        url = reverse('jobs:job-list')
+        client.get(url, HTTP_X_PROFILE_TOKEN='profile:forged:token')
+        client.get(url)
+        self.assertEqual(profiles.names(), [])
+
+        client.get(url, HTTP_X_PROFILE_TOKEN=make_profile_token())
+        self.assertEqual(profiles.summary()['jobs:job-list']['requests'], 1)
+
+    @override_settings(PROFILER_ENABLED=True, PROFILER_SAMPLE_RATE=0)
+    def test_profiles_async_requests(self):
+        url = reverse('jobs:job-list')
+        self.assertTrue(iscoroutinefunction(resolve(url).func))
+
+        async def get():
+            return await AsyncClient().get(url, headers={'X-Profile-Token': make_profile_token()})
+
+        self.assertEqual(async_to_sync(get)().status_code, 200)
+        self.assertEqual(profiles.summary()['jobs:job-list']['requests'], 1)
+
+    def test_staff_endpoints(self):
+        profiles.add('jobs:job-list', {'a;b': 3, 'a;django.db.models.query:QuerySet.count': 1}, 0.02)
+        url = reverse('profiler-sample-detail', args=['jobs:job-list'])
+        self.client.force_authenticate(self.seeker_user)
+        self.assertEqual(self.client.get(reverse('profiler-sample-list')).status_code, 403)
+
+        self.client.force_authenticate(User.objects.create_user(
+            email='staff@example.com', password='password123', is_staff=True
+        ))
+        summary = self.client.get(reverse('profiler-sample-list')).data['jobs:job-list']
+        self.assertEqual((summary['requests'], summary['samples']), (1, 4))
+        self.assertEqual(summary['breakdown'], {'other': 0.75, 'orm': 0.25})
+
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+        self.assertEqual(response.content.decode().splitlines()[0], 'a;b 3')
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -5,15 +5,18 @@ app_name = 'jobs'
 
 urlpatterns = [
     # Job Category
-    path('categories/', JobCategoryListView.as_view(), name='category-list'),
+    path('categories/', AsyncJobCategoryListView.as_view(), name='category-list'),
     
     # Job Listing
-    path('', JobListView.as_view(), name='job-list'),
-    path('<int:pk>/', JobDetailView.as_view(), name='job-detail'),
+    path('', AsyncJobListView.as_view(), name='job-list'),
+    path('facets/', JobFacetView.as_view(), name='job-facets'),
+    path('<int:pk>/', AsyncJobDetailView.as_view(), name='job-detail'),
+    path('recommendations/', JobRecommendationView.as_view(), name='job-recommendations'),
     
     #Employer Job Management
     path('employer/jobs/', EmployerJobListView.as_view(), name='employer-job-list'),
     path('employer/jobs/create/', JobCreateView.as_view(), name='job-create'),
+    path('employer/jobs/import/', JobImportView.as_view(), name='job-import'),
     path('employer/jobs/<int:pk>/update/', JobUpdateView.as_view(), name='job-update'),
     path('employer/jobs/<int:pk>/delete/', JobDeleteView.as_view(), name='job-delete'),
     
@@ -21,9 +24,15 @@ urlpatterns = [
     path('applications/apply/', JobApplicationCreateView.as_view(), name='apply-job'),
     path('applications/my-application/', JobSeekerApplicationListView.as_view(), name='my-applications'),
     path('employer/applications/', EmployerApplicationListView.as_view(), name='employer-applications'),
+    path('employer/applications/summary/', EmployerApplicationSummaryView.as_view(), name='employer-application-summary'),
+    path('employer/applications/export/', EmployerApplicationExportView.as_view(), name='employer-application-export'),
     path('employer/application/<int:pk>/status/', ApplicationStatusUpdateView.as_view(), name='update-application-status'),
+    path('employer/applications/status/', BulkApplicationStatusUpdateView.as_view(), name='bulk-update-application-status'),
     
     # Saved Jobs
-    path('saved//', SavedJobListView.as_view(), name='saved-jobs'),
-    path('saved/<int:job_id>/', SaveJobView.as_view(), name='save-job')
+    path('saved//', AsyncSavedJobListView.as_view(), name='saved-jobs'),
+    path('saved/<int:job_id>/', SaveJobView.as_view(), name='save-job'),
+    
+    # Monitoring
+    path('cache/stats/', ResponseCacheStatsView.as_view(), name='cache-stats'),
 ]
\ No newline at end of file
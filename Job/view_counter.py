@@ -0,0 +1,116 @@
+"""
+In-process write buffer for Job.views_count.
+
+JobDetailView records views here instead of issuing an UPDATE per request.
+Pending counts are flushed in bulk with F() increments (one UPDATE per
+distinct increment) by a background thread every
+JOB_VIEW_COUNT_FLUSH_INTERVAL seconds, as soon as JOB_VIEW_COUNT_MAX_PENDING
+jobs are pending, and at interpreter shutdown. At most one interval of views is
+lost if the process dies without a clean exit.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# seconds between checks of JOB_VIEW_COUNT_FLUSH_INTERVAL while it is 0
+# (timed flushes off)
+IDLE_POLL_INTERVAL = 1.0
+
+
+class ViewCountBuffer:
+
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._overflowed = False
+        self._flusher = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'JOB_VIEW_COUNT_FLUSH_INTERVAL', 5)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, 'JOB_VIEW_COUNT_MAX_PENDING', 1000)
+
+    def record(self, job_id, count=1):
+        """
+        Buffer ``count`` views of a job and return its unflushed total
+        """
+        with self._lock:
+            self._pending[job_id] += count
+            pending = self._pending[job_id]
+            overflow = len(self._pending) >= self.max_pending
+            if overflow:
+                self._overflowed = True
+        # the flusher thread writes an overflowing buffer, never the caller:
+        # async views call this on the event loop, where the ORM can't run
+        self._start_flusher(overflow)
+        if overflow:
+            self._wakeup.set()
+        return pending
+
+    def pending(self, job_id):
+        with self._lock:
+            return self._pending.get(job_id, 0)
+
+    def flush(self):
+        """
+        Write all pending views to the database. Returns the number of
+        views written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+
+        by_increment = defaultdict(list)
+        for job_id, count in pending.items():
+            by_increment[count].append(job_id)
+        try:
+            # all or nothing, so a failed flush re-buffers no committed views
+            with transaction.atomic() if len(by_increment) > 1 else nullcontext():
+                for increment, job_ids in by_increment.items():
+                    Job.objects.filter(pk__in=job_ids).update(views_count=F('views_count') + increment)
+        except Exception:
+            logger.exception("Failed to flush job view counts, keeping them buffered")
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return sum(pending.values())
+
+    def _start_flusher(self, overflow=False):
+        if self._flusher is not None or not (overflow or self.flush_interval > 0):
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name='job-view-counter', daemon=True)
+                self._flusher.start()
+
+    def _run(self):
+        # the interval is re-read every round, so a thread started before
+        # flushes were turned off sleeps rather than spins
+        while True:
+            interval = self.flush_interval
+            self._wakeup.wait(interval if interval > 0 else IDLE_POLL_INTERVAL)
+            self._wakeup.clear()
+            with self._lock:
+                overflowed, self._overflowed = self._overflowed, False
+            if overflowed or self.flush_interval > 0:
+                self.flush()
+                connection.close()
+
+
+view_counts = ViewCountBuffer()
+atexit.register(view_counts.flush)
@@ -1,48 +1,82 @@
 from django.shortcuts import render
+from django.core.handlers.asgi import ASGIRequest
+from django.http import QueryDict, StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework import generics, status, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django_filters.utils import translate_validation
+from django.db import transaction
+from django.db.models import Q, Count, Max, Sum
+from django.utils import timezone
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 
 from JobPortal.asgi import application
+from JobPortal.async_views import AsyncListAPIView, AsyncRetrieveAPIView
+from JobPortal.conditional import (
+    AsyncConditionalListMixin, ConditionalListMixin, make_etag, not_modified_response, set_validators
+)
+from . import facets, geo
 from .models import *
 from .serializers import *
+from .cache import AsyncCachedListMixin, CachedListMixin, cache_stats, get_generation
+from .counters import apply_application_transitions
+from .exporter import (
+    CONTENT_TYPES as EXPORT_CONTENT_TYPES, aexport_lines, export_lines, filter_applications, parse_boundary
+)
+from .importer import FORMATS as IMPORT_FORMATS, JobImporter, detect_format, iter_rows, open_text
+from .listings import open_listings
 from .permissions import *
+from .recommendations import recommend_jobs
+from .search import JobSearchFilter
+from .view_counter import view_counts
 from account.permissions import *
+from account.identity import get_identity
 
 
-class JobCategoryListView(generics.ListAPIView):
+class JobCategoryListView(CachedListMixin, generics.ListAPIView):
     """
     API endpoint to list all job categories
-    GET: List all categories with count
+    GET: List all categories with count (cached for anonymous users)
     """
+    cache_name = 'category-list'
     queryset = JobCategory.objects.all()
     serializer_class = JobCategorySerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 3
     
 
-class JobListView(generics.ListAPIView):
+class AsyncJobCategoryListView(AsyncCachedListMixin, AsyncListAPIView, JobCategoryListView):
+    """
+    JobCategoryListView served natively under ASGI
+    """
+
+
+class AsyncJobFlagsMixin:
+    """
+    Loads which of the page's jobs the caller saved / applied to, with the
+    two queries awaited together
     """
-    API endpoint to list all active jobs with filtering and search
-    GET: List jobs with pagination, filters, and search
     
-    Filters: category, job_type, location
-    Search: title, description, company name
-    Ordering: -created_at
+    async def aprepare_context(self, context, objects):
+        job_id_attr = getattr(self.get_serializer_class(), 'job_id_attr', 'pk')
+        return await aload_job_flags(context, [getattr(item, job_id_attr) for item in objects])
+
+
+class JobListFilterMixin:
+    """
+    The open job listings with the job list's filters and search, shared by
+    JobListView and JobFacetView
     """
-    serializer_class = JobListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, geo.JobLocationFilter, JobSearchFilter]
     filterset_fields = ['category', 'job_type', "location"]
+    # Job fields indexed with the weights in Job.search.FIELD_WEIGHTS
     search_fields = ['title', 'description', 'employer__company_name','location']
     ordering_fields =['created_at', 'salary_min', 'deadline']
-    ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset =Job.objects.filter(is_active=True).select_related(
-            'employer', 'category'
-        )
+        queryset = open_listings()
         
         # Additional filters
         min_salary = self.request.query_params.get('min_salary')
@@ -58,40 +92,220 @@ class JobListView(generics.ListAPIView):
             
         return queryset
     
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        area = geo.parse_area(self.request.query_params)
+        context['geo_origin'] = area.origin if area else None
+        return context
+
+
+class JobListView(JobListFilterMixin, CachedListMixin, generics.ListAPIView):
+    """
+    API endpoint to list all active jobs with filtering and search
+    GET: List jobs with pagination, filters, and search (cached for anonymous users)
+    
+    Filters: category, job_type, location
+    Area: near (a place) or lat/lon, with radius (km); bbox (west,south,east,north)
+    Search: title, description, company name (ranked by relevance)
+    Ordering: -created_at, or distance for radius searches
+    
+    Pages are read from the JobListing read model (see Job.listings)
+    """
+    serializer_class = JobListingSerializer
+    query_budget = 10
+    cache_name = 'job-list'
+    # job_id rather than job, which would sort by the related Job
+    ordering = ['-created_at', '-job_id']
+    keyset_ordering = ('-created_at', '-job_id')
+
+
+class FacetCountsMixin:
+    """
+    Responds to list() with the facet counts of the filtered listings
+    (see Job.facets)
+    """
+    location_limit = 20
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        filterset = DjangoFilterBackend().get_filterset(request, queryset, self)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        selected = {
+            name: getattr(value, 'pk', value) or None
+            for name, value in filterset.form.cleaned_data.items()
+        }
+        
+        params = QueryDict(mutable=True)
+        for name in facets.RANGE_PARAMS:
+            params.setlist(name, request.query_params.getlist(name))
+        cube = facets.cached_cube(
+            params, timezone.now().date(),
+            lambda: facets.build_cube(JobSearchFilter().filter_queryset(
+                request, geo.JobLocationFilter().filter_queryset(request, queryset, self), self, rank=False
+            )),
+        )
+        return Response(facets.facet_counts(cube, selected, self.location_limit))
+
+
+class JobFacetView(JobListFilterMixin, CachedListMixin, FacetCountsMixin, generics.GenericAPIView):
+    """
+    API endpoint for the job browser's facet counts
+    GET: Job counts per category, job type, location and salary band for
+    the JobListView filters and search (cached)
+    """
+    query_budget = 6
+    cache_name = 'job-facets'
+    cache_anonymous_only = False
+    
+    def get(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+
+class AsyncJobListView(AsyncJobFlagsMixin, AsyncCachedListMixin, AsyncListAPIView, JobListView):
+    """
+    JobListView served natively under ASGI
+    """
+    
     
 class JobDetailView(generics.RetrieveAPIView):
     """
         API endpoint to retrieve a single job detail
         GET: Retrieve job details and increment view count
     """
-    queryset = Job.objects.filter(is_active=True)
+    queryset = Job.objects.filter(is_active=True).select_related('employer__user', 'category')
     serializer_class = JobDetailSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 5
     
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        # increment view count
-        instance.views_count += 1
-        instance.save(update_fields=['views_count'])
+        return self.respond(self.get_object(), self.get_serializer_context())
+    
+    def respond(self, instance, context):
+        # increment view count, flushed to the database in bulk
+        instance.views_count += view_counts.record(instance.pk)
         
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        serializer = self.get_serializer(instance, context=context)
+        etag = self.get_etag(instance, context)
+        response = not_modified_response(self.request, etag)
+        if response is not None:
+            return response
+        return set_validators(Response(serializer.data), etag)
+    
+    def get_etag(self, instance, context):
+        # views_count is left out so repeat views can still be answered with
+        # 304, which is why the ETag is weak
+        flags = resolve_job_flags(context, [instance.pk])
+        employer, category = instance.employer, instance.category
+        return make_etag(
+            instance.pk, instance.updated_at,
+            employer.pk, employer.update_at, employer.user.email,
+            category and (category.pk, category.name, category.slug,
+                          category.description, category.active_jobs_count),
+            instance.applications_count,
+            instance.pk in flags['saved'], instance.pk in flags['applied'],
+        )
+
+
+class AsyncJobDetailView(AsyncJobFlagsMixin, AsyncRetrieveAPIView, JobDetailView):
+    """
+    JobDetailView served natively under ASGI
+    """
+    
+    async def retrieve(self, request, *args, **kwargs):
+        context = self.get_serializer_context()
+        instance = await self.aget_object()
+        await self.aprepare_context(context, [instance])
+        return self.respond(instance, context)
+        
+        
+class JobRecommendationView(APIView):
+    """
+    API endpoint for job seeker to get jobs matching their skills
+    GET: List the best matching active jobs with their match score
+    """
+    permission_classes = [permissions.IsAuthenticated, IsJobSeeker]
+    query_budget = 6
+    default_limit = 20
+    max_limit = 100
+    
+    def get(self, request):
+        seeker = get_identity(request).profile
+        if seeker is None:
+            return Response(
+                {'error': 'Job seeker profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        
+        scores = dict(recommend_jobs(seeker, max(limit, 1)))
+        jobs = open_listings().filter(pk__in=scores)
+        jobs = sorted(jobs, key=lambda job: (-scores[job.pk], -job.pk))
         
+        results = JobListingSerializer(jobs, many=True, context={'request': request}).data
+        for row in results:
+            row['match_score'] = scores[row['id']]
+        return Response({'results': results})
         
-class EmployerJobListView(generics.ListAPIView):
+        
+class EmployerJobListView(ConditionalListMixin, generics.ListAPIView):
     """
     API endpoint for employer to view their posted jobs
-    GET: List all jobs posted by the authenticated employer
+    GET: List all jobs posted by the authenticated employer with application counts
     """
-    serializer_class = JobDetailSerializer
+    serializer_class = EmployerJobSerializer
     permission_classes = [permissions.IsAuthenticated, IsEmployer]
+    query_budget = 6
     
     def get_queryset(self):
         return Job.objects.filter(
-            employer__user=self.request.user
-        ).select_related('category').order_by('-created_at')
+            employer__user_id=self.request.user.pk
+        ).select_related('employer__user', 'category').order_by('-created_at')
+    
+    def get_list_version(self, queryset):
+        version = queryset.aggregate(
+            count=Count('id'),
+            updated=Max('updated_at'),
+            employer_updated=Max('employer__update_at'),
+            email=Max('employer__user__email'),
+            views=Sum('views_count'),
+            category_jobs=Sum('category__active_jobs_count'),
+            applications=Sum('applications_count'),
+            **{field: Sum(field) for field in APPLICATION_STATUS_COUNT_FIELDS.values()}
+        )
+        # category edits touch neither the jobs nor the employer
+        categories = queryset.exclude(category=None).order_by('category_id').values_list(
+            'category_id', 'category__name', 'category__slug', 'category__description'
+        ).distinct()
+        return sorted(version.items()) + [('categories', list(categories))]
     
 
+class EmployerApplicationSummaryView(APIView):
+    """
+    API endpoint for employer dashboard totals
+    GET: Job and application counts per status across the employer's jobs
+    """
+    permission_classes = [permissions.IsAuthenticated, IsEmployer]
+    
+    def get(self, request):
+        totals = Job.objects.filter(employer__user_id=request.user.pk).aggregate(
+            jobs=Count('id'),
+            active_jobs=Count('id', filter=Q(is_active=True)),
+            applications=Sum('applications_count'),
+            **{choice: Sum(field) for choice, field in APPLICATION_STATUS_COUNT_FIELDS.items()}
+        )
+        return Response({
+            'jobs': totals.pop('jobs'),
+            'active_jobs': totals.pop('active_jobs'),
+            'applications': totals.pop('applications') or 0,
+            'by_status': {choice: total or 0 for choice, total in totals.items()},
+        })
+
+
 class JobCreateView(generics.CreateAPIView):
     """
     API endpoint for employer to create a new job
@@ -99,12 +313,43 @@ class JobCreateView(generics.CreateAPIView):
     """
     serializer_class = JobCreateUpdateSerializer
     permission_classes = [permissions.IsAuthenticated, IsEmployer]
+    # the job, its counters, listing, search postings and skills
+    query_budget = 24
     
     def perform_create(self, serializer):
-        employer_profile = self.request.user.employer_profile
-        serializer.save(employer=employer_profile)
+        serializer.save(employer=get_identity(self.request).require_profile())
+        
         
+class JobImportView(APIView):
+    """
+    API endpoint for employer to import many jobs from a file
+    POST: Upload a CSV or JSONL file as "file" (format inferred from the
+    name or given as ?file_format=csv|jsonl); returns a per-row error report
+    """
+    permission_classes = [permissions.IsAuthenticated, IsEmployer]
+    # a fixed number of statements per batch of imported rows
+    query_budget = 30
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'error': 'No file uploaded'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        file_format = request.query_params.get('file_format') or detect_format(upload.name, upload.content_type)
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {'error': f'Unsupported format, expected one of {", ".join(IMPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        importer = JobImporter(get_identity(request).require_profile())
+        result = importer.run(iter_rows(open_text(upload.file), file_format))
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK)
+
+
 class JobUpdateView(generics.UpdateAPIView):
     """
     API endpoint for employer to update their job
@@ -114,7 +359,7 @@ class JobUpdateView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsEmployerOwner]
     
     def get_queryset(self):
-        return Job.objects.filter(employer__user=self.request.user)
+        return Job.objects.filter(employer__user_id=self.request.user.pk)
     
     
 class JobDeleteView(generics.DestroyAPIView):
@@ -125,7 +370,7 @@ class JobDeleteView(generics.DestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsEmployerOwner]
     
     def get_queryset(self):
-        return Job.objects.filter(employer__user=self.request.user)
+        return Job.objects.filter(employer__user_id=self.request.user.pk)
 
 
 class JobApplicationCreateView(generics.CreateAPIView):
@@ -137,8 +382,10 @@ class JobApplicationCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsJobSeeker]
     
     def perform_create(self, serializer):
-        applicant_profile = self.request.user.jobseeker_profile
-        serializer.save(applicant=applicant_profile)
+        applicant_profile = get_identity(self.request).require_profile()
+        # the application and the job's pipeline counters commit together
+        with transaction.atomic():
+            serializer.save(applicant=applicant_profile)
         
 
 class JobSeekerApplicationListView(generics.ListAPIView):
@@ -148,11 +395,13 @@ class JobSeekerApplicationListView(generics.ListAPIView):
     """
     serializer_class = JobApplicationSerializer
     permission_classes = [permissions.IsAuthenticated, IsJobSeeker]
+    query_budget = 4
+    keyset_ordering = ('-applied_at', '-id')
     
     def get_queryset(self):
         return JobApplication.objects.filter(
-            applcant__user=self.request.user
-        ).select_related('job', 'job__employer').order_by('-applied_at')
+            applicant_id=get_identity(self.request).jobseeker_id
+        ).select_related('listing', 'applicant__user').order_by('-applied_at', '-id')
 
 
 class EmployerApplicationListView(generics.ListAPIView):
@@ -162,67 +411,216 @@ class EmployerApplicationListView(generics.ListAPIView):
     """
     serializer_class = JobApplicationDetailSerializer
     permission_classes = [permissions.IsAuthenticated, IsEmployer]
+    query_budget = 4
+    keyset_ordering = ('-applied_at', '-id')
     
     def get_queryset(self):
+        # job_id IN (...) rather than a join filter, so each job's rows are
+        # read in order from job_applications_recent
+        job_ids = JobListing.objects.filter(
+            employer_id=get_identity(self.request).employer_id
+        ).values('job_id')
         queryset = JobApplication.objects.filter(
-            job__employer__user = self.request.user
-        ).select_related('job', 'applicant', 'application__user')
+            job_id__in=job_ids
+        ).select_related('listing', 'applicant__user')
         
         # Filter by specific job if provided
         job_id = self.request.query_params.get('job_id')
         if job_id:
             queryset = queryset.filter(job_id=job_id)
-        return queryset.order_by('-applied')
+        return queryset.order_by('-applied_at', '-id')
     
 
-class ApplicationStatusUpdateView(generics.UpdateAPIView):
+class EmployerApplicationExportView(APIView):
     """
-    API endpoint for employer to update application status
-    PATCH: Update application status
+    API endpoint for employer to export applications for their jobs
+    GET: Stream every matching application as CSV (default) or JSONL
+    (?file_format=jsonl). Filters: job_id, status (comma separated),
+    applied_after, applied_before (date or datetime)
     """
     permission_classes = [permissions.IsAuthenticated, IsEmployer]
     
-    def get_queryset(self):
-        return JobApplication.objects.filter(job__employer__user = self.request.user)
-    
-    def patch(self, request, pk):
-        try:
-            application = self.get_queryset().get(pk=pk)
-        except JobApplication.DoesNotExist:
+    def get(self, request):
+        params = request.query_params
+        file_format = params.get('file_format', 'csv')
+        if file_format not in EXPORT_CONTENT_TYPES:
             return Response(
-                {'error': 'Application not found'},
-                status=status.HTTP_404_NOT_FOUND
+                {'error': f'Unsupported format, expected one of {", ".join(EXPORT_CONTENT_TYPES)}'},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
-        new_status = request.data.get('status')
-        if new_status not in dict(JobApplication.STATUS_CHOICES):
+        statuses = [value for value in params.get('status', '').split(',') if value]
+        if any(value not in dict(JobApplication.STATUS_CHOICES) for value in statuses):
             return Response(
                 {'error': 'Invalid status'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        try:
+            job_ids = [int(value) for value in params.getlist('job_id')]
+            applied_after = params.get('applied_after') and parse_boundary(params['applied_after'])
+            applied_before = params.get('applied_before') and parse_boundary(params['applied_before'], end=True)
+        except ValueError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        application.status = new_status
-        if new_status != 'pending':
-            from django.utils import timezone
-            application.reviewed_at = timezone.now()
-        application.save()
+        queryset = filter_applications(
+            JobApplication.objects.filter(job__employer__user_id=request.user.pk),
+            job_ids=job_ids, statuses=statuses,
+            applied_after=applied_after, applied_before=applied_before
+        )
+        # ASGI streams an async iterator as it goes; a sync one is read whole first
+        lines = aexport_lines if isinstance(request._request, ASGIRequest) else export_lines
+        response = StreamingHttpResponse(
+            lines(queryset, file_format),
+            content_type=EXPORT_CONTENT_TYPES[file_format]
+        )
+        filename = f'applications-{timezone.now():%Y%m%d-%H%M%S}.{file_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+
+class ApplicationStatusUpdateView(generics.UpdateAPIView):
+    """
+    API endpoint for employer to update application status
+    PATCH: Update application status
+    """
+    permission_classes = [permissions.IsAuthenticated, IsEmployer]
+    
+    def get_queryset(self):
+        return JobApplication.objects.filter(job__employer__user_id=self.request.user.pk)
+    
+    def patch(self, request, pk):
+        # lock the row so concurrent updates move the job's counters consistently
+        with transaction.atomic():
+            try:
+                application = self.get_queryset().select_for_update(of=('self',)).get(pk=pk)
+            except JobApplication.DoesNotExist:
+                return Response(
+                    {'error': 'Application not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            new_status = request.data.get('status')
+            if new_status not in dict(JobApplication.STATUS_CHOICES):
+                return Response(
+                    {'error': 'Invalid status'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            application.status = new_status
+            if new_status != 'pending':
+                from django.utils import timezone
+                application.reviewed_at = timezone.now()
+            application.save()
         
         serializer = JobApplicationDetailSerializer(application)
         return Response(serializer.data)
     
     
-class SavedJobListView(generics.ListAPIView):
+class BulkApplicationStatusUpdateView(APIView):
+    """
+    API endpoint for employer to update many application statuses at once
+    POST: {"updates": [{"id": 1, "status": "reviewed"}, ...]}
+    """
+    permission_classes = [permissions.IsAuthenticated, IsEmployer]
+    max_updates = 500
+    
+    def post(self, request):
+        updates = request.data.get('updates')
+        if not isinstance(updates, list) or not updates:
+            return Response(
+                {'error': 'updates must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(updates) > self.max_updates:
+            return Response(
+                {'error': f'At most {self.max_updates} updates per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        requested = {}
+        for item in updates:
+            try:
+                requested[int(item['id'])] = item['status']
+            except (KeyError, TypeError, ValueError):
+                return Response(
+                    {'error': 'Each update needs an integer id and a status'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        valid_statuses = dict(JobApplication.STATUS_CHOICES)
+        results, by_status, changes = {}, {}, []
+        with transaction.atomic():
+            # One ownership check; only the application rows are locked, in pk
+            # order so overlapping bulk updates cannot deadlock
+            current = {
+                application_id: (job_id, old_status)
+                for application_id, job_id, old_status in JobApplication.objects.filter(
+                    pk__in=requested, job__employer__user_id=request.user.pk
+                ).select_for_update(of=('self',)).order_by('pk').values_list('id', 'job_id', 'status')
+            }
+            for application_id, new_status in requested.items():
+                if not isinstance(new_status, str) or new_status not in valid_statuses:
+                    results[application_id] = 'invalid_status'
+                elif application_id not in current:
+                    results[application_id] = 'not_found'
+                elif current[application_id][1] == new_status:
+                    results[application_id] = 'unchanged'
+                else:
+                    job_id, old_status = current[application_id]
+                    by_status.setdefault(new_status, []).append(application_id)
+                    changes.append((application_id, job_id, old_status, new_status))
+                    results[application_id] = 'updated'
+            
+            now = timezone.now()
+            for new_status, application_ids in by_status.items():
+                fields = {'status': new_status}
+                if new_status != 'pending':
+                    fields['reviewed_at'] = now
+                JobApplication.objects.filter(pk__in=application_ids).update(**fields)
+            apply_application_transitions((job_id, old, new) for _, job_id, old, new in changes)
+        
+        return Response({
+            'updated': len(changes),
+            'results': [
+                {'id': application_id, 'status': requested[application_id], 'result': result}
+                for application_id, result in results.items()
+            ],
+        })
+
+
+class SavedJobListView(ConditionalListMixin, generics.ListAPIView):
     """
         API endpoint for job seeker to view saved jobs
         GET: List all saved jobs
     """
     serializer_class = SavedJobSerializer
     permission_classes = [permissions.IsAuthenticated, IsJobSeeker]
+    query_budget = 6
+    keyset_ordering = ('-saved_at', '-id')
     
     def get_queryset(self):
         return SavedJob.objects.filter(
-            user=self.request.user
-        ).select_related('job', 'job__employer', 'job__category')
+            user_id=self.request.user.pk
+        ).select_related('listing')
+    
+    def get_list_version(self, queryset):
+        # listings are touched by job, employer and category changes
+        version = queryset.aggregate(
+            count=Count('id'),
+            saved=Max('saved_at'),
+            listing_updated=Max('listing__updated_at'),
+            applications=Sum('listing__applications_count'),
+        )
+        return sorted(version.items())
+
+
+class AsyncSavedJobListView(AsyncJobFlagsMixin, AsyncConditionalListMixin, AsyncListAPIView, SavedJobListView):
+    """
+    SavedJobListView served natively under ASGI
+    """
     
 
 class SaveJobView(APIView):
@@ -243,7 +641,7 @@ class SaveJobView(APIView):
             )
         
         saved_job, created = SavedJob.objects.get_or_create(
-            user=request.user,
+            user_id=request.user.pk,
             job=job
         )
         
@@ -260,7 +658,7 @@ class SaveJobView(APIView):
         
     def delete(self,request, job_id):
         try:
-            saved_job = SavedJob.objects.get(user=request.user, job_id=job_id)
+            saved_job = SavedJob.objects.get(user_id=request.user.pk, job_id=job_id)
             saved_job.delete()
             return Response(
                 {'message': 'Job unsaved successfully'}
@@ -269,4 +667,18 @@ class SaveJobView(APIView):
             return Response(
                 {'error': 'Saved job not found'},
                 status=status.HTTP_404_NOT_FOUND
-            )
\ No newline at end of file
+            )
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    API endpoint for staff to size the anonymous response cache
+    GET: Hit/miss counters of this process and the current generation
+    """
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        return Response({
+            'generation': get_generation(),
+            'views': cache_stats.snapshot(),
+        })
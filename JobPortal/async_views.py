@@ -0,0 +1,125 @@
+"""
+Async DRF views for serving read endpoints natively under ASGI.
+
+DRF's APIView.dispatch is synchronous, so Django's ASGI handler runs every
+request in a worker thread. AsyncAPIView dispatches to ``async def``
+handlers on the event loop instead. Authentication, permissions and filter
+backends are still synchronous DRF code and run through sync_to_async;
+handlers use the async ORM and await independent queries together with
+asyncio.gather.
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import generics
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+async def fetch(queryset):
+    """
+    Evaluate a queryset with the async ORM
+    """
+    return [obj async for obj in queryset]
+
+
+class AsyncAPIView(APIView):
+    # Django checks this in as_view() to return a coroutine view function
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncGenericAPIView(AsyncAPIView, generics.GenericAPIView):
+
+    async def afilter_queryset(self, queryset):
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        paginate = getattr(self.paginator, 'apaginate_queryset', None)
+        if paginate is None:
+            return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+        return await paginate(queryset, self.request, view=self)
+
+    async def aprepare_context(self, context, objects):
+        """
+        Hook for loading serializer context for the objects about to be
+        serialised (e.g. the caller's saved job ids among them)
+        """
+        return context
+
+
+class AsyncListModelMixin:
+
+    async def list(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            await self.aprepare_context(context, page)
+            serializer = self.get_serializer(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+
+        objects = await fetch(queryset)
+        await self.aprepare_context(context, objects)
+        serializer = self.get_serializer(objects, many=True, context=context)
+        return Response(serializer.data)
+
+
+class AsyncRetrieveModelMixin:
+
+    async def retrieve(self, request, *args, **kwargs):
+        context = self.get_serializer_context()
+        instance = await self.aget_object()
+        await self.aprepare_context(context, [instance])
+        serializer = self.get_serializer(instance, context=context)
+        return Response(serializer.data)
+
+
+class AsyncListAPIView(AsyncListModelMixin, AsyncGenericAPIView):
+
+    async def get(self, request, *args, **kwargs):
+        return await self.list(request, *args, **kwargs)
+
+
+class AsyncRetrieveAPIView(AsyncRetrieveModelMixin, AsyncGenericAPIView):
+
+    async def get(self, request, *args, **kwargs):
+        return await self.retrieve(request, *args, **kwargs)
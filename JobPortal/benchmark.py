@@ -0,0 +1,328 @@
+"""
+In-process endpoint benchmarks.
+
+run_benchmarks() sends each scenario's requests through Django's test
+client, so they pass the full middleware stack, URL routing and
+authentication: with the WSGI Client one request at a time, or with the
+ASGI handler (AsyncClient) and ``concurrency`` requests in flight on one
+event loop. A scenario derives the URL of its n-th request from n, so
+pages, job ids and search terms vary as in real traffic. For every
+scenario the result holds throughput, p50/p95/p99 latency and the SQL
+queries and DB time per request, read from the X-DB-Queries/X-DB-Time-Ms
+headers of JobPortal.querybudget.QueryBudgetMiddleware. Results are plain
+dicts meant to be stored as JSON and compared between commits with
+compare_results().
+"""
+import asyncio
+import platform
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+TRANSPORTS = ('wsgi', 'asgi')
+# metrics shown by compare_results(): (label, path in a result, higher is better)
+COMPARED_METRICS = [
+    ('req/s', ('throughput_rps',), True),
+    ('p50 ms', ('latency_ms', 'p50'), False),
+    ('p95 ms', ('latency_ms', 'p95'), False),
+    ('p99 ms', ('latency_ms', 'p99'), False),
+    ('queries', ('queries', 'mean'), False),
+]
+
+
+class Scenario:
+    """
+    A named endpoint benchmark. ``url`` returns (path, query params) of the
+    n-th request; ``user`` is sent as a JWT bearer token.
+    """
+
+    def __init__(self, name, url, user=None):
+        self.name = name
+        self.url = url
+        self.user = user
+
+    def headers(self):
+        if self.user is None:
+            return {}
+        return {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+
+class Measurement:
+
+    def __init__(self):
+        self.latencies = []
+        self.queries = []
+        self.db_times = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def add(self, response, latency):
+        self.latencies.append(latency * 1000)
+        self.queries.append(int(response.get('X-DB-Queries', 0)))
+        self.db_times.append(float(response.get('X-DB-Time-Ms', 0)))
+        if response.status_code >= 400:
+            self.errors += 1
+
+    def result(self):
+        latencies = self.latencies
+        total = len(latencies)
+        return {
+            'requests': total,
+            'errors': self.errors,
+            'throughput_rps': round(total / self.elapsed, 2) if self.elapsed else None,
+            'latency_ms': {
+                'mean': round(sum(latencies) / total, 3) if total else None,
+                'p50': _rounded(_percentile(latencies, 0.5)),
+                'p95': _rounded(_percentile(latencies, 0.95)),
+                'p99': _rounded(_percentile(latencies, 0.99)),
+                'max': _rounded(max(latencies, default=None)),
+            },
+            'queries': {
+                'mean': round(sum(self.queries) / total, 2) if total else None,
+                'max': max(self.queries, default=None),
+            },
+            'db_time_ms': {
+                'mean': round(sum(self.db_times) / total, 3) if total else None,
+            },
+        }
+
+
+def _percentile(values, fraction):
+    # nearest-rank, as the task queue metrics report theirs
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _rounded(value):
+    return None if value is None else round(value, 3)
+
+
+def _consume(response):
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+
+
+def in_process_settings(**overrides):
+    """
+    Settings for sending requests with the test clients: their host is
+    allowed and the query counting middleware is on
+    """
+    return override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], QUERY_BUDGET_ENABLED=True, **overrides
+    )
+
+
+def measure(scenario, requests, warmup=0):
+    """
+    Send ``warmup`` and then ``requests`` requests one after another
+    through the WSGI handler
+    """
+    client, headers = Client(), scenario.headers()
+    for number in range(warmup):
+        _consume(client.get(*scenario.url(number), headers=headers))
+
+    measurement = Measurement()
+    started = time.perf_counter()
+    for number in range(warmup, warmup + requests):
+        start = time.perf_counter()
+        response = client.get(*scenario.url(number), headers=headers)
+        _consume(response)
+        measurement.add(response, time.perf_counter() - start)
+    measurement.elapsed = time.perf_counter() - started
+    return measurement
+
+
+async def ameasure(scenario, requests, warmup=0, concurrency=10):
+    """
+    Send ``warmup`` and then ``requests`` requests through the ASGI handler
+    with up to ``concurrency`` of them in flight
+    """
+    client, headers = AsyncClient(), scenario.headers()
+    for number in range(warmup):
+        await client.get(*scenario.url(number), headers=headers)
+
+    measurement = Measurement()
+    numbers = iter(range(warmup, warmup + requests))
+
+    async def worker():
+        for number in numbers:
+            start = time.perf_counter()
+            response = await client.get(*scenario.url(number), headers=headers)
+            measurement.add(response, time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    measurement.elapsed = time.perf_counter() - started
+    return measurement
+
+
+def environment(**extra):
+    """
+    What a result was measured on: commit, versions, database and row counts
+    """
+    from account.models import User
+    from Job.models import Job, JobApplication, SavedJob
+
+    def git(*args):
+        try:
+            return subprocess.run(
+                ['git', *args], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=10
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    return {
+        'created_at': timezone.now().isoformat(),
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'rows': {
+            'users': User.objects.count(),
+            'jobs': Job.objects.count(),
+            'applications': JobApplication.objects.count(),
+            'saved_jobs': SavedJob.objects.count(),
+        },
+        **extra,
+    }
+
+
+def run_benchmarks(scenarios, requests=200, warmup=20, transport='wsgi', concurrency=10, progress=None):
+    """
+    Benchmark every scenario and return {'environment': ..., 'results':
+    {scenario name: result}}
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f'Unknown transport "{transport}"')
+    results = {}
+    with in_process_settings():
+        for scenario in scenarios:
+            if transport == 'asgi':
+                measurement = asyncio.run(ameasure(scenario, requests, warmup, concurrency))
+            else:
+                measurement = measure(scenario, requests, warmup)
+            results[scenario.name] = measurement.result()
+            if progress is not None:
+                progress(scenario.name, results[scenario.name])
+    return {
+        'environment': environment(
+            transport=transport, requests=requests, warmup=warmup,
+            concurrency=concurrency if transport == 'asgi' else 1,
+        ),
+        'results': results,
+    }
+
+
+def _metric(result, path):
+    for key in path:
+        result = (result or {}).get(key)
+    return result
+
+
+def compare_results(baseline, current):
+    """
+    (scenario, metric, baseline value, current value, relative change,
+    regressed) for every scenario in both runs. A change counts as a
+    regression when the metric moved the wrong way by more than 10%.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        for label, path, higher_is_better in COMPARED_METRICS:
+            old, new = _metric(before, path), _metric(result, path)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            regressed = change < -0.1 if higher_is_better else change > 0.1
+            rows.append((name, label, old, new, change, regressed))
+    return rows
+
+
+def default_scenarios(seeker=None, employer=None, search_terms=None, jobs=200):
+    """
+    The read endpoints of the API, authenticated as ``seeker`` / ``employer``
+    (default: the job seeker with the most applications and the employer
+    with the most jobs)
+    """
+    from django.db.models import Count
+    from django.urls import reverse
+
+    from rest_framework.settings import api_settings
+
+    from account.models import Employer, JobSeeker
+    from Job.listings import open_listings
+    from Job.models import Job, JobApplication, JobCategory
+
+    if seeker is None:
+        seeker = JobSeeker.objects.annotate(total=Count('applications')).order_by('-total', 'pk').first()
+    if employer is None:
+        employer = Employer.objects.annotate(total=Count('jobs')).order_by('-total', 'pk').first()
+    search_terms = search_terms or ['python', 'senior developer', 'data engineer', 'remote marketing', 'pune']
+    places = ['Pune', 'Delhi', 'Bangalore', 'Mumbai', 'London']
+    job_ids = list(open_listings().order_by('-created_at').values_list('pk', flat=True)[:jobs])
+    category_ids = list(JobCategory.objects.order_by('pk').values_list('pk', flat=True))
+    job_types = [value for value, _ in Job.JOB_TYPE_CHOICES]
+
+    def cycle(values):
+        return lambda number: values[number % len(values)]
+
+    def pages(total, limit=20):
+        """
+        Page numbers 1..n cycling over at most ``limit`` existing pages
+        """
+        last = max(1, min(limit, -(-total // (api_settings.PAGE_SIZE or 1))))
+        return lambda number: number % last + 1
+
+    active_pages = pages(open_listings().count())
+
+    def fixed(path, params=None):
+        return lambda number: (path, params or {})
+
+    job_list = reverse('jobs:job-list')
+    scenarios = [
+        Scenario('category-list', fixed(reverse('jobs:category-list'))),
+        Scenario('job-list', lambda number: (job_list, {'page': active_pages(number)})),
+        Scenario('job-list-search', lambda number: (job_list, {'search': cycle(search_terms)(number)})),
+        Scenario('job-facets', lambda number: (reverse('jobs:job-facets'), {'search': cycle(search_terms)(number)})),
+        Scenario('job-list-radius', lambda number: (job_list, {'near': cycle(places)(number), 'radius': 50})),
+    ]
+    if category_ids:
+        scenarios.append(Scenario('job-list-filtered', lambda number: (job_list, {
+            'category': cycle(category_ids)(number), 'job_type': cycle(job_types)(number // len(category_ids)),
+        })))
+    if job_ids:
+        scenarios.append(Scenario(
+            'job-detail', lambda number: (reverse('jobs:job-detail', args=[cycle(job_ids)(number)]), {})
+        ))
+    if seeker is not None:
+        user = seeker.user
+        scenarios += [
+            Scenario('job-list-seeker', lambda number: (job_list, {'page': active_pages(number)}), user),
+            Scenario('job-list-cursor', fixed(job_list, {'paginate': 'cursor'}), user),
+            Scenario('job-recommendations', fixed(reverse('jobs:job-recommendations')), user),
+            Scenario('my-applications', fixed(reverse('jobs:my-applications')), user),
+            Scenario('saved-jobs', fixed(reverse('jobs:saved-jobs')), user),
+            Scenario('profile', fixed(reverse('account:profile')), user),
+        ]
+    if employer is not None:
+        user = employer.user
+        applications = reverse('jobs:employer-applications')
+        application_pages = pages(JobApplication.objects.filter(job__employer=employer).count())
+        scenarios += [
+            Scenario('employer-job-list', fixed(reverse('jobs:employer-job-list')), user),
+            Scenario('employer-applications', lambda number: (applications, {'page': application_pages(number)}), user),
+            Scenario('employer-application-summary', fixed(reverse('jobs:employer-application-summary')), user),
+        ]
+    return scenarios
@@ -0,0 +1,83 @@
+"""
+Conditional GET support (ETag) shared by the API views.
+
+Views compute a weak ETag from cheap version data (updated_at columns,
+counters, aggregates) before serialising, so a matching If-None-Match is
+answered with 304 without building the payload. The ETags are weak because
+some volatile fields (a job's views_count) are deliberately left out of the
+version: equal ETags promise equivalent bodies, not identical bytes.
+
+No Last-Modified is sent: the versions also cover flags, counters and
+deletions that no timestamp follows, so If-Modified-Since could be answered
+with a stale 304.
+"""
+import hashlib
+from abc import ABC, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def make_etag(*parts):
+    """
+    Build a weak ETag from the values the representation depends on
+    """
+    return 'W/' + quote_etag(hashlib.sha1(repr(parts).encode()).hexdigest())
+
+
+def not_modified_response(request, etag):
+    """
+    Return a 304 response if the client's ETag still matches, else None
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_validators(response, etag)
+    return response
+
+
+def set_validators(response, etag):
+    response['ETag'] = etag
+    return response
+
+
+class ConditionalListMixin(ABC):
+    """
+    Adds an ETag to list() using get_list_version()
+    """
+
+    @abstractmethod
+    def get_list_version(self, queryset):
+        """
+        Version parts of the filtered ``queryset``, aggregated in a single
+        query
+        """
+
+    def get_list_etag(self, request, parts):
+        return make_etag(request.user.pk, sorted(request.query_params.lists()), *parts)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = self.get_list_etag(request, self.get_list_version(queryset))
+
+        response = not_modified_response(request, etag)
+        if response is not None:
+            return response
+        return set_validators(super().list(request, *args, **kwargs), etag)
+
+
+class AsyncConditionalListMixin(ConditionalListMixin):
+    """
+    ConditionalListMixin for async views. The version query runs before
+    the page queries so a 304 skips them.
+    """
+
+    async def list(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        parts = await sync_to_async(self.get_list_version)(queryset)
+        etag = self.get_list_etag(request, parts)
+
+        response = not_modified_response(request, etag)
+        if response is not None:
+            return response
+        return set_validators(await super().list(request, *args, **kwargs), etag)
@@ -0,0 +1,282 @@
+"""
+Opt-in sampling profiler for requests.
+
+SamplingProfilerMiddleware picks a fraction of requests
+(PROFILER_SAMPLE_RATE), plus every request carrying a valid signed
+X-Profile-Token header (see make_profile_token()). While a picked request
+runs, a background thread reads its stack from sys._current_frames() every
+PROFILER_INTERVAL seconds. No tracing hooks are installed, so the request
+itself runs at full speed. The stacks are wall-clock samples: time spent
+waiting on the database shows up under the ORM call that waited.
+
+Samples are aggregated per resolved URL name (e.g. ``jobs:job-list``) in
+this process's ``profiles`` store. From there they are served as collapsed
+stacks (``frame;frame;frame count`` lines, the input of flamegraph.pl and
+speedscope) and as a breakdown of where the time went: ORM,
+serialization, JSON rendering and the rest. The middleware removes itself
+from the chain unless PROFILER_ENABLED is set, so it costs nothing when
+disabled.
+
+The middleware is async capable. Under ASGI it samples the event loop
+thread, which interleaves requests, and keeps only the samples taken while
+the loop was running this request's coroutines; the ORM work async views
+hand to sync_to_async threads is not sampled.
+"""
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'JobPortal.profiling'
+OVERFLOW_STACK = '[other stacks]'
+# (category, module prefixes); a sample counts for the innermost match
+CATEGORIES = [
+    ('orm', ('django.db',)),
+    ('rendering', ('rest_framework.renderers', 'json')),
+    ('serialization', ('rest_framework.serializers', 'rest_framework.fields', 'rest_framework.relations',
+                       'account.serializers', 'Job.serializers')),
+    ('cache', ('django.core.cache',)),
+]
+
+
+def sample_interval():
+    return getattr(settings, 'PROFILER_INTERVAL', 0.005)
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse(frame, stop_code=None, within=False):
+    """
+    The stack of ``frame`` as ``root;...;leaf``, starting below the frame
+    running ``stop_code`` when there is one. With ``within``, None when no
+    frame is running ``stop_code``.
+    """
+    labels = []
+    while frame is not None and frame.f_code is not stop_code:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    if within and frame is None:
+        return None
+    return ';'.join(reversed(labels))
+
+
+def category(stack):
+    for label in reversed(stack.split(';')):
+        module = label.split(':', 1)[0]
+        for name, prefixes in CATEGORIES:
+            if any(module == prefix or module.startswith(prefix + '.') for prefix in prefixes):
+                return name
+    return 'other'
+
+
+class StackSampler:
+    """
+    A daemon thread sampling the stacks of registered targets while there
+    are any, and sleeping otherwise. A target is keyed by its thread unless
+    given a key, so several can sample one thread.
+    """
+
+    def __init__(self):
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self, stop_code=None, key=None, within=False):
+        """
+        Sample the calling thread until stop(); ``stop_code`` cuts the
+        stacks off above the frame running it, and with ``within`` samples
+        taken outside that frame are dropped
+        """
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._targets[thread_id if key is None else key] = (thread_id, Counter(), stop_code, within)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+            self._wakeup.set()
+
+    def stop(self, key=None):
+        """
+        Stop sampling the calling thread (or ``key``) and return its Counter
+        of stacks
+        """
+        with self._lock:
+            target = self._targets.pop(threading.get_ident() if key is None else key, None)
+        return target[1] if target else Counter()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                if not self._targets:
+                    self._wakeup.clear()
+                    continue
+                frames = sys._current_frames()
+                for thread_id, stacks, stop_code, within in self._targets.values():
+                    frame = frames.get(thread_id)
+                    stack = None if frame is None else collapse(frame, stop_code, within)
+                    if stack is not None:
+                        stacks[stack] += 1
+                del frames
+            time.sleep(sample_interval())
+
+
+class ProfileStore:
+    """
+    Sampled stacks, request counts and wall time per URL name
+    """
+
+    def __init__(self):
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_stacks(self):
+        return getattr(settings, 'PROFILER_MAX_STACKS', 2000)
+
+    def add(self, name, stacks, duration):
+        with self._lock:
+            profile = self._profiles.setdefault(name, {'requests': 0, 'seconds': 0.0, 'stacks': Counter()})
+            profile['requests'] += 1
+            profile['seconds'] += duration
+            known = profile['stacks']
+            for stack, samples in stacks.items():
+                if stack not in known and len(known) >= self.max_stacks:
+                    stack = OVERFLOW_STACK
+                known[stack] += samples
+
+    def names(self):
+        with self._lock:
+            return sorted(self._profiles)
+
+    def summary(self):
+        """
+        {URL name: requests, samples, sampled seconds and the share of
+        samples per category}
+        """
+        with self._lock:
+            profiles = {name: (profile['requests'], profile['seconds'], Counter(profile['stacks']))
+                        for name, profile in self._profiles.items()}
+        summary = {}
+        for name, (requests, seconds, stacks) in sorted(profiles.items()):
+            total = sum(stacks.values())
+            breakdown = Counter()
+            for stack, samples in stacks.items():
+                breakdown[category(stack)] += samples
+            summary[name] = {
+                'requests': requests,
+                'samples': total,
+                'seconds': round(seconds, 3),
+                'breakdown': {key: round(value / total, 3) for key, value in breakdown.most_common()} if total else {},
+            }
+        return summary
+
+    def collapsed(self, name):
+        """
+        The stacks of a URL name as collapsed-stack lines, or None
+        """
+        with self._lock:
+            profile = self._profiles.get(name)
+            if profile is None:
+                return None
+            stacks = profile['stacks'].most_common()
+        return ''.join(f'{stack} {samples}\n' for stack, samples in stacks)
+
+    def reset(self, name=None):
+        with self._lock:
+            if name is None:
+                self._profiles.clear()
+            else:
+                self._profiles.pop(name, None)
+
+
+sampler = StackSampler()
+profiles = ProfileStore()
+
+
+def make_profile_token():
+    """
+    A value for the X-Profile-Token header that gets requests profiled
+    for PROFILER_TOKEN_MAX_AGE seconds
+    """
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def valid_profile_token(value):
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            value, max_age=getattr(settings, 'PROFILER_TOKEN_MAX_AGE', 3600)
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class SamplingProfilerMiddleware:
+    """
+    Sample the stacks of a fraction of requests, and of requests with a
+    signed X-Profile-Token header, into ``profiles``. Enabled by
+    PROFILER_ENABLED.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def should_profile(self, request):
+        token = request.headers.get(TOKEN_HEADER)
+        if token:
+            return valid_profile_token(token)
+        return random.random() < getattr(settings, 'PROFILER_SAMPLE_RATE', 0.01)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        sampler.start(stop_code=self.__call__.__code__)
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = sampler.stop()
+        self.record(request, stacks, started)
+        return response
+
+    async def __acall__(self, request):
+        if not self.should_profile(request):
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        # the loop thread also runs other requests; keep only this one's stacks
+        key = object()
+        sampler.start(stop_code=self.__acall__.__code__, key=key, within=True)
+        try:
+            response = await self.get_response(request)
+        finally:
+            stacks = sampler.stop(key)
+        self.record(request, stacks, started)
+        return response
+
+    def record(self, request, stacks, started):
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.view_name:
+            profiles.add(match.view_name, stacks, time.perf_counter() - started)
@@ -0,0 +1,197 @@
+"""
+Per-request SQL accounting and query budgets.
+
+record_queries() counts the statements run for the current context, with
+their total time and a fingerprint of each statement (literals and IN lists collapsed), so repeated fingerprints point
+at N+1 loops. QueryBudgetMiddleware records every request and compares the
+count with the view's ``query_budget`` attribute (QUERY_BUDGET_DEFAULT when
+it has none). An overrun, or a statement repeated QUERY_BUDGET_DUPLICATES
+times, is logged, or raised as QueryBudgetExceeded when QUERY_BUDGET_RAISE
+is set. Budgets are per request and must not depend on the page size; see
+JobPortal.testing for the assertions the test suites use.
+
+Active recorders live in a context variable read by a wrapper installed on
+every connection, rather than in per-connection execute_wrapper()s:
+connections are thread-local, and under ASGI an async view's queries run on
+sync_to_async threads that inherit the request's context but not the
+wrappers of the thread that started recording. The middleware is async
+capable so it does not push native async views into a worker thread.
+
+Queries run while a streaming response is consumed are not counted.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'\bIN \((?:%s|\?)(?:, ?(?:%s|\?))*\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACE = re.compile(r'\s+')
+
+_recorders = ContextVar('query_recorders', default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(sql):
+    """
+    The statement with literal values and IN lists collapsed, so queries
+    differing only in their parameters compare equal
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper counting statements, their time and fingerprints
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold=2):
+        """
+        {fingerprint: count} of statements run at least ``threshold`` times
+        """
+        return {sql: count for sql, count in self.fingerprints.most_common() if count >= threshold}
+
+    def summary(self):
+        return {
+            'queries': self.count,
+            'time_ms': round(self.duration * 1000, 3),
+            'duplicates': self.duplicates(),
+        }
+
+
+def _record(execute, sql, params, many, context):
+    for recorder in _recorders.get():
+        execute = partial(recorder, execute)
+    return execute(sql, params, many, context)
+
+
+def install_recording(connection, **kwargs):
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+connection_created.connect(install_recording)
+
+
+@contextmanager
+def record_queries():
+    """
+    Record the queries of this context, including those its sync_to_async
+    calls run on other threads
+    """
+    for connection in connections.all():
+        install_recording(connection)
+    recorder = QueryRecorder()
+    token = _recorders.set(_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _recorders.reset(token)
+
+
+def default_budget():
+    return getattr(settings, 'QUERY_BUDGET_DEFAULT', 20)
+
+
+def duplicate_threshold():
+    return getattr(settings, 'QUERY_BUDGET_DUPLICATES', 5)
+
+
+def view_budget(view_class):
+    budget = getattr(view_class, 'query_budget', None)
+    return default_budget() if budget is None else budget
+
+
+def resolve_view_class(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return getattr(match.func, 'view_class', None) or getattr(match.func, 'cls', None)
+
+
+def budget_problems(recorder, budget, label):
+    """
+    Descriptions of what a recorded request did wrong: running more
+    queries than ``budget``, and statements repeated often enough to be an
+    N+1 loop
+    """
+    problems = []
+    if recorder.count > budget:
+        problems.append(f'{label} ran {recorder.count} queries, over its budget of {budget}')
+    for sql, count in recorder.duplicates(duplicate_threshold()).items():
+        problems.append(f'{label} ran the same statement {count} times (possible N+1): {sql[:300]}')
+    return problems
+
+
+class QueryBudgetMiddleware:
+    """
+    Record the queries of each request, report them in X-DB-Queries and
+    X-DB-Time-Ms response headers and enforce the view's query budget.
+    Enabled by QUERY_BUDGET_ENABLED (default: DEBUG).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        with record_queries() as recorder:
+            response = await self.get_response(request)
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        view_class = resolve_view_class(request)
+        if view_class is not None:
+            problems = budget_problems(recorder, view_budget(view_class), f'{request.method} {request.path}')
+            if problems and getattr(settings, 'QUERY_BUDGET_RAISE', False):
+                raise QueryBudgetExceeded('\n'.join(problems))
+            for problem in problems:
+                logger.warning(problem)
+        response['X-DB-Queries'] = str(recorder.count)
+        response['X-DB-Time-Ms'] = f'{recorder.duration * 1000:.3f}'
+        return response
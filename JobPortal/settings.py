@@ -39,12 +39,15 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'account',
     'Job',
+    'taskqueue',
     
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'JobPortal.profiling.SamplingProfilerMiddleware',
+    'JobPortal.querybudget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -115,6 +118,22 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'job-portal',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+# Anonymous job list / category list responses (see Job.cache)
+JOB_RESPONSE_CACHE_ALIAS = 'default'
+JOB_RESPONSE_CACHE_TIMEOUT = 300
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
@@ -124,6 +143,28 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Chunked profile uploads (account.uploads). Partial files must be on the
+# same filesystem as MEDIA_ROOT so completion is an atomic rename.
+PROFILE_UPLOAD_TEMP_DIR = MEDIA_ROOT / 'partial'
+PROFILE_UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+PROFILE_UPLOAD_EXPIRY = 24 * 60 * 60
+
+# Logo / profile picture derivatives (account.thumbnails), rendered in a
+# process pool of THUMBNAIL_WORKERS (0 renders inline)
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_WIDTHS = (64, 128, 256)
+THUMBNAIL_FORMATS = ('webp', 'jpeg')
+
+# Background tasks (taskqueue): seconds a claimed task is leased to a worker
+# before another may requeue it, base and cap of the retry backoff, and how
+# long succeeded tasks are kept. TASKQUEUE_EAGER runs tasks on commit instead.
+TASKQUEUE_LEASE = 300
+TASKQUEUE_POLL_INTERVAL = 1.0
+TASKQUEUE_RETRY_BACKOFF = 10
+TASKQUEUE_RETRY_BACKOFF_MAX = 3600
+TASKQUEUE_RETENTION = 7 * 24 * 60 * 60
+TASKQUEUE_EAGER = False
+
 # Custom User Model
 AUTH_USER_MODEL = 'account.User'
 
@@ -142,20 +183,74 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'account.tokens.IdentityTokenObtainPairSerializer',
 }
 
+# Seconds a user's role, flags and profile id are cached per process by
+# account.authentication.CachedJWTAuthentication
+AUTH_IDENTITY_CACHE_TIMEOUT = 60
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'account.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'Job.pagination.KeysetPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-}
\ No newline at end of file
+}
+
+# Job view counter: buffered views are flushed at this interval (seconds) or
+# once this many jobs have pending views
+JOB_VIEW_COUNT_FLUSH_INTERVAL = 5
+JOB_VIEW_COUNT_MAX_PENDING = 1000
+
+# Per-request SQL accounting (JobPortal.querybudget), on by default under
+# DEBUG: views over their query_budget (QUERY_BUDGET_DEFAULT when they
+# declare none) or repeating a statement QUERY_BUDGET_DUPLICATES times are
+# logged, or raise with QUERY_BUDGET_RAISE
+QUERY_BUDGET_ENABLED = DEBUG
+QUERY_BUDGET_DEFAULT = 20
+QUERY_BUDGET_DUPLICATES = 5
+QUERY_BUDGET_RAISE = False
+
+# Sampling profiler (JobPortal.profiling): when enabled, profile this
+# fraction of requests, and requests with a signed X-Profile-Token header
+# (valid for PROFILER_TOKEN_MAX_AGE seconds), sampling the stack every
+# PROFILER_INTERVAL seconds; at most PROFILER_MAX_STACKS distinct stacks are
+# kept per URL name
+PROFILER_ENABLED = False
+PROFILER_SAMPLE_RATE = 0.01
+PROFILER_INTERVAL = 0.005
+PROFILER_TOKEN_MAX_AGE = 3600
+PROFILER_MAX_STACKS = 2000
+
+# Lower bounds of the salary bands counted by the job facets endpoint
+# (Job.facets), after an implicit first band starting at 0
+JOB_FACET_SALARY_BANDS = [50000, 100000, 200000, 300000]
+
+# Seconds the total of a keyset-paginated (?paginate=cursor) list is cached
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
+# Seconds before the in-memory skill matrix used for job recommendations is
+# rebuilt from the database
+JOB_RECOMMENDATION_REBUILD_INTERVAL = 300
+
+# Deadline sweep (Job.expiry): seconds between runs of the recurring
+# background task, jobs deactivated per UPDATE, and seconds to sleep
+# between batches
+JOB_EXPIRY_INTERVAL = 60 * 60
+JOB_EXPIRY_BATCH_SIZE = 500
+JOB_EXPIRY_BATCH_PAUSE = 0.05
+
+# Area searches on the job list (Job.geo): radius in km when none is given
+# and the largest allowed. Locations are matched against the bundled
+# gazetteer unless JOB_GAZETTEER_PATH points at another file.
+JOB_GEO_DEFAULT_RADIUS_KM = 25
+JOB_GEO_MAX_RADIUS_KM = 200
@@ -0,0 +1,61 @@
+"""
+Test assertions for the query budgets of JobPortal.querybudget
+"""
+from unittest import mock
+from urllib.parse import urlsplit
+
+from django.urls import resolve
+
+from .querybudget import budget_problems, record_queries, view_budget
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin recording the queries of test client requests
+    """
+
+    def request_queries(self, method, url, **kwargs):
+        """
+        Send a request with self.client and return (response, recorder).
+        Streaming responses are consumed while recording.
+        """
+        with record_queries() as recorder:
+            response = getattr(self.client, method.lower())(url, **kwargs)
+            if response.streaming:
+                response.streaming_content = [b''.join(response.streaming_content)]
+        return response, recorder
+
+    def assertWithinQueryBudget(self, method, url, budget=None, status_code=None, **kwargs):
+        """
+        Assert a request stays within ``budget`` queries (default: the
+        view's query_budget) and repeats no statement often enough to look
+        like an N+1 loop. Returns the response and its recorder.
+        """
+        response, recorder = self.request_queries(method, url, **kwargs)
+        if status_code is not None:
+            self.assertEqual(response.status_code, status_code, getattr(response, 'data', response))
+        if budget is None:
+            budget = view_budget(resolve(urlsplit(url).path).func.view_class)
+        problems = budget_problems(recorder, budget, f'{method.upper()} {url}')
+        self.assertFalse(problems, '\n'.join(problems))
+        return response, recorder
+
+    def assertQueriesIndependentOfPageSize(self, url, sizes=(1, 10, 100), params=None, **kwargs):
+        """
+        Assert a list endpoint runs the same number of queries, within its
+        budget, for each page size in ``sizes`` (patched onto the view's
+        pagination class). Returns the counts. A first request at the
+        default size fills the per-process caches (identities, page
+        counts), so every size is measured warm.
+        """
+        pagination_class = resolve(urlsplit(url).path).func.view_class.pagination_class
+        self.request_queries('get', url, data=params or {}, **kwargs)
+        counts = {}
+        for size in sizes:
+            with mock.patch.object(pagination_class, 'page_size', size):
+                response, recorder = self.assertWithinQueryBudget(
+                    'get', url, status_code=200, data=params or {}, **kwargs
+                )
+            counts[size] = recorder.count
+        self.assertEqual(len(set(counts.values())), 1, f'{url} queries by page size: {counts}')
+        return counts
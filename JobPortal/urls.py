@@ -19,10 +19,15 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .views import ProfilerSampleDetailView, ProfilerSampleListView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/',include('account.urls')),
     path('api/job',include('Job.urls')),
+    path('api/tasks/',include('taskqueue.urls')),
+    path('api/profiling/', ProfilerSampleListView.as_view(), name='profiler-sample-list'),
+    path('api/profiling/<str:name>/', ProfilerSampleDetailView.as_view(), name='profiler-sample-detail'),
 ]
 
 if settings.DEBUG:
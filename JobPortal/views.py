@@ -0,0 +1,48 @@
+from django.http import HttpResponse
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .profiling import profiles
+
+
+class ProfilerSampleListView(APIView):
+    """
+    API endpoint for staff to see the sampled endpoints of this process
+    GET: Requests, samples, sampled seconds and the share of samples spent
+    in the ORM, serialization, rendering and elsewhere per URL name
+    DELETE: Discard every profile
+    """
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        return Response(profiles.summary())
+    
+    def delete(self, request):
+        profiles.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProfilerSampleDetailView(APIView):
+    """
+    API endpoint for staff to download the profile of one URL name
+    GET: Collapsed stacks ("frame;frame;frame count" per line) for
+    flamegraph.pl or speedscope
+    DELETE: Discard the profile
+    """
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request, name):
+        collapsed = profiles.collapsed(name)
+        if collapsed is None:
+            return Response(
+                {'error': 'No samples for this URL name'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        response = HttpResponse(collapsed, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{name.replace(":", "-")}.folded"'
+        return response
+    
+    def delete(self, request, name):
+        profiles.reset(name)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,133 @@
+"""
+JWT authentication backed by a per-process cache of user identities.
+
+simplejwt's JWTAuthentication loads the User row on every request, and the
+views then load the employer or job seeker profile separately. Here the
+token's user id is resolved to a small identity (role, flags and profile
+id) held in memory for AUTH_IDENTITY_CACHE_TIMEOUT seconds, so permission
+checks and id-based filters run without a query. The full User row, with
+its profile, is loaded lazily in one query the first time a view reads any
+other attribute. Saving or deleting a user or profile drops its entry in
+this process (see account.signals); other processes see the change once
+their entry expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+IDENTITY_FIELDS = ('id', 'user_type', 'is_active', 'is_staff', 'is_superuser')
+
+
+class IdentityCache:
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'AUTH_IDENTITY_CACHE_TIMEOUT', 60)
+
+    @property
+    def max_entries(self):
+        return getattr(settings, 'AUTH_IDENTITY_CACHE_MAX_ENTRIES', 10000)
+
+    def get(self, user_id):
+        """
+        Identity of a user, loading it on a miss. None if the user is gone.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        identity = load_identity(user_id)
+        if identity is not None:
+            with self._lock:
+                self._entries[user_id] = (now + self.timeout, identity)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return identity
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
+def load_identity(user_id):
+    row = User.objects.filter(pk=user_id).values(
+        *IDENTITY_FIELDS,
+        employer_id=F('employer_profile__id'),
+        jobseeker_id=F('jobseeker_profile__id'),
+    ).first()
+    if row is None:
+        return None
+    employer_id, jobseeker_id = row.pop('employer_id'), row.pop('jobseeker_id')
+    row['profile_id'] = {'employer': employer_id, 'job_seeker': jobseeker_id}.get(row['user_type'])
+    return row
+
+
+def load_user(user_id):
+    """
+    The user with its profile in the relation cache
+    """
+    return User.objects.select_related(*User.PROFILE_RELATED_NAMES.values()).get(pk=user_id)
+
+
+class CachedUser(SimpleLazyObject):
+    """
+    A request's user: the identity attributes (pk, user_type, profile_id,
+    is_active, is_staff, is_superuser) are answered from the cache and any
+    other attribute loads the User
+    """
+
+    def __init__(self, identity):
+        super().__init__(partial(load_user, identity['id']))
+        # set on the proxy itself, so reading them does not load the user
+        self.__dict__.update(identity, pk=identity['id'], is_authenticated=True, is_anonymous=False)
+
+    def __bool__(self):
+        # ``request.user and ...`` in permission checks
+        return True
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving the token's user through identity_cache
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # needs the password hash of the current row
+            return super().get_user(validated_token)
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValueError):
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        identity = identity_cache.get(user_id)
+        if identity is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not identity['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return CachedUser(identity)
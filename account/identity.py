@@ -0,0 +1,108 @@
+"""
+The caller of a request, shared by permissions, views and serializers.
+
+get_identity(request) returns one RequestIdentity per request. Its ids
+(user, role, employer / job seeker profile) come from the cached identity
+of account.authentication.CachedUser without a query, so ownership checks
+compare integers such as ``job.employer_id == identity.employer_id``. The
+profile itself is loaded at most once, together with its user, and that
+user then also backs ``request.user``.
+"""
+from django.utils.functional import cached_property, empty
+from rest_framework.exceptions import NotFound
+
+from .authentication import CachedUser
+from .models import Employer, JobSeeker
+
+PROFILE_MODELS = {
+    'employer': Employer,
+    'job_seeker': JobSeeker,
+}
+
+PROFILE_NOT_FOUND = {
+    'employer': 'Employer profile not found',
+    'job_seeker': 'Job seeker profile not found',
+}
+
+
+class RequestIdentity:
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def user_id(self):
+        return self.user.pk
+
+    @property
+    def user_type(self):
+        return getattr(self.user, 'user_type', None)
+
+    @cached_property
+    def profile_id(self):
+        if self._is_lazy:
+            return self.user.__dict__['profile_id']
+        profile = self.profile
+        return profile.pk if profile is not None else None
+
+    @property
+    def employer_id(self):
+        return self.profile_id if self.user_type == 'employer' else None
+
+    @property
+    def jobseeker_id(self):
+        return self.profile_id if self.user_type == 'job_seeker' else None
+
+    @property
+    def _is_lazy(self):
+        return isinstance(self.user, CachedUser)
+
+    @cached_property
+    def profile(self):
+        """
+        The employer or job seeker profile, or None
+        """
+        if not self.user.is_authenticated:
+            return None
+        if not self._is_lazy or self.user._wrapped is not empty:
+            return self.user.get_profile()
+
+        profile_id = self.user.__dict__['profile_id']
+        if profile_id is None:
+            return None
+        profile = PROFILE_MODELS[self.user_type].objects.select_related('user').filter(pk=profile_id).first()
+        if profile is not None:
+            # the same user, with the profile in its relation cache
+            self.user._wrapped = profile.user
+        return profile
+
+    def load(self):
+        """
+        Load the profile and the full user, e.g. off the event loop before an
+        async view reads them
+        """
+        profile = self.profile
+        if self._is_lazy and self.user._wrapped is empty:
+            self.user._setup()
+        return profile
+
+    def require_profile(self):
+        profile = self.profile
+        if profile is None:
+            raise NotFound(PROFILE_NOT_FOUND.get(self.user_type, 'Profile not found'))
+        return profile
+
+    def owns_job(self, job):
+        return self.employer_id is not None and job.employer_id == self.employer_id
+
+
+def get_identity(request):
+    """
+    The RequestIdentity of a request (DRF or Django), created on first use
+    """
+    http_request = getattr(request, '_request', request)
+    identity = getattr(http_request, '_identity', None)
+    if identity is None or identity.user is not request.user:
+        identity = RequestIdentity(request.user)
+        http_request._identity = identity
+    return identity
@@ -0,0 +1,56 @@
+"""
+Pillow rendering of image derivatives.
+
+Kept free of Django imports so it can run in ``spawn`` process pool workers
+(see account.thumbnails), which only import this module.
+"""
+import io
+
+from PIL import Image, ImageOps
+
+SAVE_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+
+def _flatten(image, background=(255, 255, 255)):
+    """
+    Composite transparent images onto a solid background for JPEG
+    """
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        flat = Image.new('RGB', image.size, background)
+        flat.paste(image, mask=image.getchannel('A'))
+        return flat
+    return image.convert('RGB')
+
+
+def render_derivatives(data, widths, formats):
+    """
+    Resize the encoded image ``data`` to each width (never upscaling) and
+    encode it in each format. Returns {(width, format): bytes}.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        source.load()
+
+    original_width, original_height = source.size
+    derivatives = {}
+    for width in sorted(widths, reverse=True):
+        target = min(width, original_width)
+        height = max(1, round(original_height * target / original_width))
+        resized = source.resize((target, height), Image.LANCZOS) if (target, height) != source.size else source
+        for fmt in formats:
+            if fmt == 'jpeg':
+                image = _flatten(resized)
+            elif resized.mode not in ('RGB', 'RGBA'):
+                image = resized.convert('RGBA' if 'A' in resized.getbands() or 'transparency' in resized.info else 'RGB')
+            else:
+                image = resized
+            buffer = io.BytesIO()
+            image.save(buffer, **SAVE_OPTIONS[fmt])
+            derivatives[(width, fmt)] = buffer.getvalue()
+        # resize the next (smaller) width from this one, which is cheaper
+        source = resized
+    return derivatives
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from account.models import Employer, JobSeeker
+from account.thumbnails import backfill_thumbnails
+
+MODELS = {'employer': Employer, 'jobseeker': JobSeeker}
+
+
+class Command(BaseCommand):
+    help = "Generate missing logo and profile picture thumbnails for existing media"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=MODELS, action='append', help='Limit to employer or jobseeker images')
+        parser.add_argument('--force', action='store_true', help='Regenerate even when thumbnails are current')
+
+    def handle(self, *args, **options):
+        models = [MODELS[name] for name in options['model'] or []]
+        start = time.perf_counter()
+        generated, failed = backfill_thumbnails(models, force=options['force'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated thumbnails for {generated} images, {failed} failed "
+            f"({time.perf_counter() - start:.1f}s)"
+        ))
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from account.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked profile uploads that stopped receiving chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, help='Age in hours (default PROFILE_UPLOAD_EXPIRY)')
+
+    def handle(self, *args, **options):
+        max_age = timedelta(hours=options['hours']) if options['hours'] is not None else None
+        removed = purge_stale_uploads(max_age)
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} stale uploads"))
@@ -1,3 +1,6 @@
+import uuid
+
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
@@ -51,6 +54,11 @@ class User(AbstractBaseUser,PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(auto_now_add=True)
     
+    PROFILE_RELATED_NAMES = {
+        'employer': 'employer_profile',
+        'job_seeker': 'jobseeker_profile',
+    }
+    
     objects = UserManager()
 
     USERNAME_FIELD = "email"
@@ -65,6 +73,18 @@ class User(AbstractBaseUser,PermissionsMixin):
     def __str__(self):
         return f"{self.email} ({self.get_user_type_display()})"
 
+    def get_profile(self):
+        """
+        Return the employer or job seeker profile matching user_type, if any
+        """
+        related_name = self.PROFILE_RELATED_NAMES.get(self.user_type)
+        if related_name is None:
+            return None
+        try:
+            return getattr(self, related_name)
+        except ObjectDoesNotExist:
+            return None
+
     
 
 class Employer(models.Model):
@@ -79,6 +99,8 @@ class Employer(models.Model):
     company_name = models.CharField(max_length=100)
     company_website = models.URLField(blank=True, null=True)
     logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)
+    # derivatives of logo, maintained by account.thumbnails
+    logo_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField(blank=True, null=True)
     location = models.CharField(max_length=100, blank=True, null=True)
     contact_phone = models.CharField(max_length=20, blank=True, null=True)
@@ -107,6 +129,8 @@ class JobSeeker(models.Model):
     phone = models.CharField(max_length=20)
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    # derivatives of profile_picture, maintained by account.thumbnails
+    profile_picture_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
     skills = models.TextField(help_text="Comma separated list of skills", blank=True, null=True)
     experience_years = models.PositiveIntegerField(blank=True, null=True)
     education = models.TextField(blank=True, null=True)   
@@ -123,3 +147,39 @@ class JobSeeker(models.Model):
     
     def __str__(self):
         return f"{self.full_name}"
+
+
+class ProfileUpload(models.Model):
+    """
+    A chunked, resumable upload of a job seeker's resume or profile picture
+    """
+    
+    FIELD_CHOICES = (
+        ('resume', 'Resume'),
+        ('profile_picture', 'Profile Picture'),
+    )
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User,
+        on_delete=models.CASCADE,
+        related_name='profile_uploads'
+    )
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True, help_text="Expected SHA-256 of the whole file")
+    create_at = models.DateTimeField(auto_now_add=True)
+    update_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'profile_upload'
+        verbose_name = "Profile Upload"
+        verbose_name_plural = "Profile Uploads"
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+    
+    @property
+    def is_complete(self):
+        return self.offset >= self.size
@@ -1,6 +1,15 @@
+import re
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import *
+from .identity import get_identity
+from .thumbnails import select_thumbnail
+from .uploads import validate_upload
+
+# Widths requested from the thumbnail pipeline for cards and profile headers
+CARD_IMAGE_WIDTH = 128
+PROFILE_IMAGE_WIDTH = 256
 
 User = get_user_model()
 
@@ -27,17 +36,43 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
+class ThumbnailImageField(serializers.ImageField):
+    """
+    Read-only URL of the smallest stored derivative of an image that is at
+    least ``width`` pixels wide, or of the original when it has none
+    """
+    
+    def __init__(self, width, format=None, **kwargs):
+        self.width = width
+        self.format = format
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        name = select_thumbnail(value, self.width, self.format)
+        if not name:
+            return None
+        url = value.storage.url(name)
+        request = self.context.get('request', None)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
 class EmployerProfileSerializer(serializers.ModelSerializer):
     """
     Serializer for Employer Profile
     """
     email = serializers.EmailField(source='user.email', read_only=True)
+    logo_thumbnail = ThumbnailImageField(source='logo', width=PROFILE_IMAGE_WIDTH)
+    created_at = serializers.DateTimeField(source='create_at', read_only=True)
+    updated_at = serializers.DateTimeField(source='update_at', read_only=True)
     
     class Meta:
         model = Employer
         fields = [
             'id', 'email', 'company_name', 'company_website',
-            'description', 'logo', 'location', 'contact_phone',
+            'description', 'logo', 'logo_thumbnail', 'location', 'contact_phone',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
@@ -48,12 +83,15 @@ class JobSeekerProfileSerializer(serializers.ModelSerializer):
     Serializer for Job Seeker Profile
     """
     email = serializers.EmailField(source='user.email', read_only=True)
+    profile_picture_thumbnail = ThumbnailImageField(source='profile_picture', width=PROFILE_IMAGE_WIDTH)
+    created_at = serializers.DateTimeField(source='create_at', read_only=True)
+    updated_at = serializers.DateTimeField(source='update_at', read_only=True)
     
     class Meta:
         model = JobSeeker
         fields = [
             'id', 'email', 'full_name', 'phone', 'resume',
-            'profile_picture', 'skills', 'experience_years',
+            'profile_picture', 'profile_picture_thumbnail', 'skills', 'experience_years',
             'education', 'bio', 'linkedin_url', 'github_url',
             'created_at', 'updated_at'
         ]
@@ -72,10 +110,39 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date_joined']
     
     def get_profile(self, obj):
+        request = self.context.get('request')
+        if request is not None and obj.pk == request.user.pk:
+            profile = get_identity(request).profile
+        else:
+            profile = obj.get_profile()
+        if profile is None:
+            return None
         if obj.user_type == 'employer':
-            if hasattr(obj, 'employer_profile'):
-                return EmployerProfileSerializer(obj.employer_profile).data
-        elif obj.user_type == 'job_seeker':
-            if hasattr(obj, 'jobseeker_profile'):
-                return JobSeekerProfileSerializer(obj.jobseeker_profile).data
-        return None
\ No newline at end of file
+            return EmployerProfileSerializer(profile).data
+        return JobSeekerProfileSerializer(profile).data
+
+
+class ProfileUploadSerializer(serializers.ModelSerializer):
+    """
+    Serializer for chunked profile uploads
+    """
+    complete = serializers.BooleanField(source='is_complete', read_only=True)
+    created_at = serializers.DateTimeField(source='create_at', read_only=True)
+    updated_at = serializers.DateTimeField(source='update_at', read_only=True)
+    
+    class Meta:
+        model = ProfileUpload
+        fields = [
+            'id', 'field', 'filename', 'size', 'offset', 'checksum',
+            'complete', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'offset']
+    
+    def validate_checksum(self, value):
+        if value and not re.fullmatch(r'[0-9a-fA-F]{64}', value):
+            raise serializers.ValidationError("Expected a hex SHA-256 digest")
+        return value.lower()
+    
+    def validate(self, attrs):
+        validate_upload(attrs['field'], attrs['filename'], attrs['size'])
+        return attrs
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import tasks, thumbnails
+from .authentication import identity_cache
+from .models import Employer, JobSeeker, User
+
+
+@receiver(post_save, sender=Employer)
+@receiver(post_save, sender=JobSeeker)
+def schedule_thumbnails(sender, instance, update_fields=None, raw=False, **kwargs):
+    field_name = thumbnails.IMAGE_FIELDS[sender]
+    if raw or (update_fields is not None and field_name not in update_fields):
+        return
+    if thumbnails.needs_thumbnails(instance, field_name):
+        # queued in the saving transaction, so workers only see committed images
+        tasks.render_thumbnails.enqueue(sender._meta.label, instance.pk, field_name)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_identity(sender, instance, **kwargs):
+    identity_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Employer)
+@receiver(post_save, sender=JobSeeker)
+@receiver(post_delete, sender=Employer)
+@receiver(post_delete, sender=JobSeeker)
+def forget_profile_identity(sender, instance, created=True, **kwargs):
+    # only creating or deleting a profile changes the cached profile id
+    if created:
+        identity_cache.invalidate(instance.user_id)
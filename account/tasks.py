@@ -0,0 +1,16 @@
+from django.apps import apps
+
+from taskqueue.queue import task
+
+from . import thumbnails
+
+
+@task
+def render_thumbnails(model_label, pk, field_name):
+    """
+    Render the derivatives of a profile image if they are still stale
+    """
+    instance = apps.get_model(model_label).objects.filter(pk=pk).first()
+    if instance is None or not thumbnails.needs_thumbnails(instance, field_name):
+        return
+    thumbnails.generate_thumbnails(instance, field_name, wait=True)
@@ -1,3 +1,355 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from JobPortal.testing import QueryBudgetTestMixin
+from taskqueue.models import Task
+from taskqueue.worker import run_pending
+
+from . import thumbnails, uploads, urls as account_urls
+from .authentication import identity_cache
+from .models import User, Employer, JobSeeker, ProfileUpload
+from .serializers import EmployerProfileSerializer
+
+
+class ProfileViewTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='seeker@example.com', password='password123', user_type='job_seeker'
+        )
+        self.profile = JobSeeker.objects.create(user=self.user, full_name='Jane Doe', phone='123')
+        self.client.force_authenticate(self.user)
+
+    def test_profile_conditional_get(self):
+        response = self.client.get(reverse('account:profile'))
+        self.assertEqual(response.data['profile']['full_name'], 'Jane Doe')
+        etag = response['ETag']
+
+        response = self.client.get(reverse('account:profile'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.profile.full_name = 'Jane Smith'
+        self.profile.save()
+        response = self.client.get(reverse('account:profile'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['profile']['full_name'], 'Jane Smith')
+
+
+class CachedAuthenticationTests(TestCase):
+
+    def setUp(self):
+        identity_cache.clear()
+        self.addCleanup(identity_cache.clear)
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='seeker@example.com', password='password123', user_type='job_seeker'
+        )
+
+    def login(self):
+        response = self.client.post(
+            reverse('account:login'), {'email': 'seeker@example.com', 'password': 'password123'}
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return AccessToken(response.data['access'])
+
+    def test_token_carries_identity_claims(self):
+        token = self.login()
+        self.assertEqual((token['user_type'], token['profile_id']), ('job_seeker', None))
+        profile = JobSeeker.objects.create(user=self.user, full_name='Jane Doe', phone='123')
+        self.assertEqual(self.login()['profile_id'], profile.pk)
+
+    def test_identity_is_cached_until_user_or_profile_changes(self):
+        self.login()
+        url = reverse('account:profile')
+        # identity, then the user with its profile in one query
+        with self.assertNumQueries(2):
+            self.assertIsNone(self.client.get(url).data['profile'])
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        self.assertIsNone(identity_cache.get(self.user.pk)['profile_id'])
+
+        profile = JobSeeker.objects.create(user=self.user, full_name='Jane Doe', phone='123')
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).data['profile']['full_name'], 'Jane Doe')
+        self.assertEqual(identity_cache.get(self.user.pk)['profile_id'], profile.pk)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_permission_checks_do_not_load_the_user(self):
+        JobSeeker.objects.create(user=self.user, full_name='Jane Doe', phone='123')
+        self.login()
+        url = reverse('account:jobseeker-profile')
+        self.client.get(url)
+        # the profile with its user; the role check reads the cached identity
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(reverse('account:employer-profile')).status_code, 403)
+
+
+class ProfileUploadTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        overrides = override_settings(
+            MEDIA_ROOT=media_root,
+            PROFILE_UPLOAD_TEMP_DIR=os.path.join(media_root, 'partial'),
+            PROFILE_UPLOAD_CHUNK_SIZE=4,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.media_root = media_root
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='seeker@example.com', password='password123', user_type='job_seeker'
+        )
+        self.profile = JobSeeker.objects.create(user=self.user, full_name='Jane Doe', phone='123')
+        self.client.force_authenticate(self.user)
+
+    def start(self, content, filename='cv.pdf', field='resume', **extra):
+        response = self.client.post(reverse('account:profile-upload-create'), {
+            'field': field, 'filename': filename, 'size': len(content), **extra
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return reverse('account:profile-upload', args=[response.data['id']])
+
+    def send(self, url, offset, chunk):
+        return self.client.patch(
+            url, chunk, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def upload(self, content, chunk_size=4, **extra):
+        url = self.start(content, **extra)
+        for offset in range(0, len(content), chunk_size):
+            response = self.send(url, offset, content[offset:offset + chunk_size])
+        return url, response
+
+    def test_resumable_upload(self):
+        content = b'%PDF resume body'
+        url = self.start(content)
+        self.assertEqual(self.send(url, 0, content[:4]).data['offset'], 4)
+        # a replayed chunk and a gap are both rejected
+        self.assertEqual(self.send(url, 0, content[:4]).status_code, 409)
+        self.assertEqual(self.send(url, 8, content[8:12]).status_code, 409)
+        self.assertEqual(self.send(url, 4, content[4:16]).status_code, 413)
+
+        # a crash after a claim is reconciled with the partial file
+        ProfileUpload.objects.update(offset=8)
+        self.assertEqual(self.send(url, 8, content[8:12]).status_code, 409)
+        self.assertEqual(ProfileUpload.objects.get().offset, 4)
+
+        # resuming in another worker rebuilds the hash from the partial file
+        uploads.hashers.discard(ProfileUpload.objects.get().pk)
+        response = self.client.head(url)
+        self.assertEqual(response['Upload-Offset'], '4')
+        for offset in range(4, len(content), 4):
+            response = self.send(url, offset, content[offset:offset + 4])
+
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertTrue(response.data['complete'])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.resume.name, f'resumes/{digest[:2]}/{digest}.pdf')
+        with self.profile.resume.open('rb') as stored:
+            self.assertEqual(stored.read(), content)
+        self.assertFalse(ProfileUpload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'partial')), [])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_identical_files_are_stored_once(self):
+        content = b'same resume'
+        self.upload(content)
+        other = User.objects.create_user(email='other@example.com', password='password123')
+        other_profile = JobSeeker.objects.create(user=other, full_name='John Doe', phone='456')
+        self.client.force_authenticate(other)
+        self.upload(content, filename='Resume.PDF')
+
+        self.profile.refresh_from_db()
+        other_profile.refresh_from_db()
+        self.assertEqual(self.profile.resume.name, other_profile.resume.name)
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'resumes', digest[:2])), [f'{digest}.pdf'])
+
+    def test_checksum_mismatch_discards_upload(self):
+        _, response = self.upload(b'tampered', checksum='0' * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ProfileUpload.objects.exists())
+        self.profile.refresh_from_db()
+        self.assertFalse(self.profile.resume)
+
+    def test_rejects_invalid_uploads(self):
+        url = reverse('account:profile-upload-create')
+        response = self.client.post(url, {'field': 'resume', 'filename': 'cv.exe', 'size': 10}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {'field': 'resume', 'filename': 'cv.pdf', 'size': 10 ** 9}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {'field': 'resume', 'filename': 'cv.pdf', 'size': 0}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        upload_url = self.start(b'resume')
+        for length in ('abc', '-1'):
+            response = self.client.patch(
+                upload_url, b'resume', content_type='application/offset+octet-stream',
+                HTTP_UPLOAD_OFFSET='0', CONTENT_LENGTH=length,
+            )
+            self.assertEqual(response.status_code, 400)
+        self.client.delete(upload_url)
+
+        _, response = self.upload(b'not an image', filename='me.png', field='profile_picture')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ProfileUpload.objects.exists())
+
+
+def png_bytes(size=(1200, 800)):
+    image = Image.effect_noise(size, 64).convert('RGBA')
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class ThumbnailTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        overrides = override_settings(MEDIA_ROOT=media_root, THUMBNAIL_WORKERS=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        user = User.objects.create_user(email='employer@example.com', password='password123', user_type='employer')
+        self.employer = Employer.objects.create(user=user, company_name='Acme')
+
+    def test_upload_generates_thumbnails(self):
+        original = png_bytes()
+        self.employer.logo.save('acme.png', ContentFile(original))
+        self.assertEqual(run_pending(), 1)
+
+        self.employer.refresh_from_db()
+        sizes = self.employer.logo_thumbnails['sizes']
+        self.assertEqual(self.employer.logo_thumbnails['source'], self.employer.logo.name)
+        self.assertEqual(set(sizes), {'64', '128', '256'})
+        with default_storage.open(sizes['128']['webp']) as thumbnail:
+            data = thumbnail.read()
+        self.assertEqual(Image.open(io.BytesIO(data)).size, (128, 85))
+        self.assertLess(len(data) * 10, len(original))
+        self.assertEqual(Image.open(default_storage.open(sizes['64']['jpeg'])).format, 'JPEG')
+
+        data = EmployerProfileSerializer(self.employer).data
+        self.assertTrue(data['logo_thumbnail'].endswith('acme.256w.webp'))
+        self.assertTrue(data['logo'].endswith('acme.png'))
+
+    def test_replaced_image_falls_back_to_original(self):
+        self.employer.logo.save('acme.png', ContentFile(png_bytes()))
+        run_pending()
+        self.employer.refresh_from_db()
+        # a new logo whose derivatives have not been rendered yet
+        self.employer.logo.save('new.png', ContentFile(png_bytes((100, 100))))
+        self.assertTrue(EmployerProfileSerializer(self.employer).data['logo_thumbnail'].endswith('new.png'))
+
+        self.employer.logo = None
+        self.employer.save()
+        run_pending()
+        self.employer.refresh_from_db()
+        self.assertEqual(self.employer.logo_thumbnails, {})
+
+    @override_settings(THUMBNAIL_WORKERS=1)
+    def test_backfill_in_process_pool(self):
+        self.addCleanup(thumbnails.shutdown_executor)
+        seeker_user = User.objects.create_user(email='seeker@example.com', password='password123')
+        seeker = JobSeeker.objects.create(user=seeker_user, full_name='Jane Doe', phone='123')
+        seeker.profile_picture.save('jane.png', ContentFile(png_bytes((300, 300))))
+        self.employer.logo.save('acme.png', ContentFile(b'not an image'))
+        # like media from before the pipeline, never picked up by a worker
+        Task.objects.all().delete()
+
+        with self.assertLogs('account.thumbnails', 'ERROR'):
+            self.assertEqual(thumbnails.backfill_thumbnails(), (1, 1))
+        seeker.refresh_from_db()
+        self.assertEqual(sorted(seeker.profile_picture_thumbnails['sizes']), ['128', '256', '64'])
+        self.assertEqual(thumbnails.backfill_thumbnails([JobSeeker]), (0, 0))
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """
+    Every account endpoint stays within its query budget
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        overrides = override_settings(
+            MEDIA_ROOT=media_root, PROFILE_UPLOAD_TEMP_DIR=os.path.join(media_root, 'partial')
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        identity_cache.clear()
+        self.addCleanup(identity_cache.clear)
+
+        self.client = APIClient()
+        self.seeker_user = User.objects.create_user(
+            email='seeker@example.com', password='password123', user_type='job_seeker'
+        )
+        JobSeeker.objects.create(user=self.seeker_user, full_name='Jane Doe', phone='123')
+        self.employer_user = User.objects.create_user(
+            email='employer@example.com', password='password123', user_type='employer'
+        )
+        Employer.objects.create(user=self.employer_user, company_name='Acme')
+        self.uploads = [uploads.start_upload(self.seeker_user, 'resume', 'cv.pdf', 4) for _ in range(2)]
+
+    def login(self, user):
+        if user is None:
+            self.client.credentials()
+        else:
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def endpoints(self):
+        """
+        (url name, kwargs, user, method, request options, expected status)
+        """
+        pending, completed = ({'pk': upload.pk} for upload in self.uploads)
+        registration = {
+            'email': 'new@example.com', 'password': 'password123', 'password_confirm': 'password123',
+            'user_type': 'job_seeker',
+        }
+        return [
+            ('register', {}, None, 'post', {'data': registration}, 201),
+            ('login', {}, None, 'post', {'data': {'email': 'seeker@example.com', 'password': 'password123'}}, 200),
+            ('token_refresh', {}, None, 'post', {'data': {'refresh': str(RefreshToken.for_user(self.seeker_user))}}, 200),
+            ('profile', {}, self.seeker_user, 'get', {}, 200),
+            ('employer-profile', {}, self.employer_user, 'get', {}, 200),
+            ('employer-profile', {}, self.employer_user, 'patch', {'data': {'company_name': 'Acme Ltd'}}, 200),
+            ('jobseeker-profile', {}, self.seeker_user, 'get', {}, 200),
+            ('jobseeker-profile', {}, self.seeker_user, 'patch', {'data': {'phone': '456'}}, 200),
+            ('profile-upload-create', {}, self.seeker_user, 'post',
+             {'data': {'field': 'resume', 'filename': 'cv.pdf', 'size': 4}, 'format': 'json'}, 201),
+            ('profile-upload', pending, self.seeker_user, 'get', {}, 200),
+            ('profile-upload', completed, self.seeker_user, 'patch',
+             {'data': b'%PDF', 'content_type': 'application/offset+octet-stream', 'HTTP_UPLOAD_OFFSET': '0'}, 200),
+            ('profile-upload', pending, self.seeker_user, 'delete', {}, 204),
+        ]
+
+    def test_every_endpoint_is_budgeted(self):
+        names = {pattern.name for pattern in account_urls.urlpatterns}
+        self.assertEqual(names, {name for name, *_ in self.endpoints()})
+
+    def test_endpoints_within_budget(self):
+        for name, kwargs, user, method, options, status_code in self.endpoints():
+            with self.subTest(name, method=method):
+                self.login(user)
+                self.assertWithinQueryBudget(
+                    method, reverse(f'account:{name}', kwargs=kwargs), status_code=status_code, **options
+                )
@@ -0,0 +1,225 @@
+"""
+Thumbnail derivatives for employer logos and job seeker profile pictures.
+
+When an image field changes, the original is read from storage and resized
+to THUMBNAIL_WIDTHS in THUMBNAIL_FORMATS by account.imaging in a process
+pool, so the CPU-heavy encoding stays off request threads and the GIL. The
+derivatives are stored next to the original (``logo.png`` ->
+``logo.128w.webp``) and recorded in the model's ``<field>_thumbnails``
+JSON, which serializers read to emit the smallest derivative that covers
+the requested width without touching storage.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import Q
+
+from .imaging import render_derivatives
+from .models import Employer, JobSeeker
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = {
+    Employer: 'logo',
+    JobSeeker: 'profile_picture',
+}
+
+
+def thumbnail_widths():
+    return tuple(getattr(settings, 'THUMBNAIL_WIDTHS', (64, 128, 256)))
+
+
+def thumbnail_formats():
+    return tuple(getattr(settings, 'THUMBNAIL_FORMATS', ('webp', 'jpeg')))
+
+
+def thumbnails_attr(field_name):
+    return f'{field_name}_thumbnails'
+
+
+def derivative_name(source_name, width, fmt):
+    root, _ = os.path.splitext(source_name)
+    return f'{root}.{width}w.{"jpg" if fmt == "jpeg" else fmt}'
+
+
+def needs_thumbnails(instance, field_name):
+    """
+    True when the stored derivatives were not made from the current image
+    """
+    source = getattr(instance, field_name)
+    thumbnails = getattr(instance, thumbnails_attr(field_name))
+    return (thumbnails or {}).get('source') != (source.name or None)
+
+
+def select_thumbnail(image, width, fmt=None):
+    """
+    Storage name of the smallest derivative of ``image`` (a FieldFile) at
+    least ``width`` wide, falling back to the largest one, or the original
+    when no derivatives exist for it
+    """
+    if not image:
+        return None
+    thumbnails = getattr(image.instance, thumbnails_attr(image.field.name), None) or {}
+    sizes = thumbnails.get('sizes')
+    if thumbnails.get('source') != image.name or not sizes:
+        return image.name
+
+    fmt = fmt or thumbnail_formats()[0]
+    widths = sorted(int(size) for size, names in sizes.items() if fmt in names)
+    if not widths:
+        return image.name
+    chosen = next((size for size in widths if size >= width), widths[-1])
+    return sizes[str(chosen)][fmt]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Process pool for rendering, or None to render inline when
+    THUMBNAIL_WORKERS is 0
+    """
+    global _executor
+    workers = getattr(settings, 'THUMBNAIL_WORKERS', 2)
+    if not workers:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+def generate_thumbnails(instance, field_name, wait=False):
+    """
+    Render and store the derivatives of the instance's current image. Runs
+    in the background unless ``wait`` is set or there is no process pool.
+    Returns a Future, or None when the work was done inline.
+    """
+    model = type(instance)
+    source = getattr(instance, field_name)
+    if not source:
+        _record(model, instance.pk, field_name, None, {})
+        return None
+
+    data = _read(source)
+    widths, formats = thumbnail_widths(), thumbnail_formats()
+
+    executor = get_executor()
+    if executor is None:
+        _store(model, instance.pk, field_name, source.name, render_derivatives(data, widths, formats))
+        return None
+
+    future = executor.submit(render_derivatives, data, widths, formats)
+    if wait:
+        _store(model, instance.pk, field_name, source.name, future.result())
+        return future
+
+    def stored(future):
+        try:
+            _store(model, instance.pk, field_name, source.name, future.result())
+        except Exception:
+            logger.exception("Could not generate thumbnails for %s", source.name)
+        finally:
+            # runs on the executor's callback thread
+            connection.close()
+
+    future.add_done_callback(stored)
+    return future
+
+
+def backfill_thumbnails(models=None, force=False):
+    """
+    Generate derivatives for existing images that lack current ones,
+    keeping a bounded number of images in flight in the process pool.
+    Returns (generated, failed).
+    """
+    executor = get_executor()
+    widths, formats = thumbnail_widths(), thumbnail_formats()
+    max_in_flight = 4 * getattr(settings, 'THUMBNAIL_WORKERS', 2)
+    in_flight = {}
+    generated = failed = 0
+
+    def collect(futures):
+        nonlocal generated, failed
+        for future in futures:
+            model, pk, field_name, source_name = in_flight.pop(future)
+            try:
+                _store(model, pk, field_name, source_name, future.result())
+                generated += 1
+            except Exception:
+                logger.exception("Could not generate thumbnails for %s", source_name)
+                failed += 1
+
+    for model, field_name in IMAGE_FIELDS.items():
+        if models and model not in models:
+            continue
+        images = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+        for instance in images.order_by('pk').iterator():
+            source = getattr(instance, field_name)
+            if not force and not needs_thumbnails(instance, field_name):
+                continue
+            try:
+                data = _read(source)
+                if executor is None:
+                    _store(model, instance.pk, field_name, source.name, render_derivatives(data, widths, formats))
+                    generated += 1
+                    continue
+            except Exception:
+                logger.exception("Could not generate thumbnails for %s", source.name)
+                failed += 1
+                continue
+
+            future = executor.submit(render_derivatives, data, widths, formats)
+            in_flight[future] = (model, instance.pk, field_name, source.name)
+            if len(in_flight) >= max_in_flight:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+    collect(list(in_flight))
+    return generated, failed
+
+
+def _read(source):
+    with source.storage.open(source.name, 'rb') as original:
+        return original.read()
+
+
+def _store(model, pk, field_name, source_name, rendered):
+    sizes = {}
+    for (width, fmt), content in rendered.items():
+        name = derivative_name(source_name, width, fmt)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        sizes.setdefault(str(width), {})[fmt] = default_storage.save(name, ContentFile(content))
+    _record(model, pk, field_name, source_name, sizes)
+
+
+def _record(model, pk, field_name, source_name, sizes):
+    # skip if the image was replaced while rendering; that save scheduled its own run
+    instances = model.objects.filter(pk=pk)
+    if source_name:
+        instances = instances.filter(**{field_name: source_name})
+    else:
+        instances = instances.filter(Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True}))
+    instance = instances.first()
+    if instance is None:
+        return
+    attr = thumbnails_attr(field_name)
+    setattr(instance, attr, {'source': source_name, 'sizes': sizes} if source_name else {})
+    instance.save(update_fields=[attr, 'update_at'])
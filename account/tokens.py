@@ -0,0 +1,23 @@
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class IdentityRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's role and profile id, which are copied
+    to every access token made from it. They are informational: the server
+    authorizes from the current identity (account.authentication), so a
+    role change or deactivation is not delayed until the token expires.
+    """
+    
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        profile = user.get_profile()
+        token['user_type'] = user.user_type
+        token['profile_id'] = profile.pk if profile else None
+        return token
+
+
+class IdentityTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = IdentityRefreshToken
@@ -0,0 +1,338 @@
+"""
+Chunked, resumable uploads of job seeker files with content-addressed storage.
+
+A client opens a ProfileUpload with the file's name and size and sends the
+bytes in order as raw PATCH bodies at the current offset, so a request only
+ever holds one bounded chunk. Each chunk is streamed to a piece file next
+to the partial file, claimed with a conditional UPDATE of the offset (a
+replayed or concurrent chunk loses and gets 409) and appended to the
+partial file while a SHA-256 of the content is updated. The claim and the
+append run under an exclusive lock on the upload's lock file, so the
+offset is only ever reconciled with the partial file when no chunk is in
+flight. When the last byte
+arrives the partial file is renamed to ``<upload_to><sha[:2]>/<sha><ext>``,
+so identical files are stored once, and the profile is updated in one
+transaction.
+"""
+import fcntl
+import hashlib
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+
+from .models import JobSeeker, ProfileUpload
+
+BLOCK_SIZE = 64 * 1024
+MB = 1024 * 1024
+
+FIELD_RULES = {
+    'resume': {
+        'extensions': ('.pdf', '.doc', '.docx', '.odt', '.rtf', '.txt'),
+        'max_size': 10 * MB,
+    },
+    'profile_picture': {
+        'extensions': ('.jpg', '.jpeg', '.png', '.gif', '.webp'),
+        'max_size': 5 * MB,
+    },
+}
+
+
+class OffsetConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Chunk does not start at the upload offset.'
+    default_code = 'offset_conflict'
+
+
+class ChunkTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Chunk is too large.'
+    default_code = 'chunk_too_large'
+
+
+def max_chunk_size():
+    return getattr(settings, 'PROFILE_UPLOAD_CHUNK_SIZE', 4 * MB)
+
+
+def max_file_size(field):
+    sizes = getattr(settings, 'PROFILE_UPLOAD_MAX_SIZE', {})
+    return sizes.get(field, FIELD_RULES[field]['max_size'])
+
+
+def temp_dir():
+    return getattr(settings, 'PROFILE_UPLOAD_TEMP_DIR', os.path.join(settings.MEDIA_ROOT, 'partial'))
+
+
+def partial_path(upload):
+    return os.path.join(temp_dir(), f'{upload.pk}.partial')
+
+
+def lock_path(upload):
+    return f'{partial_path(upload)}.lock'
+
+
+@contextmanager
+def upload_lock(upload):
+    """
+    Hold an exclusive lock on the upload across processes while its offset
+    is reconciled or a chunk is claimed and appended
+    """
+    os.makedirs(temp_dir(), exist_ok=True)
+    with open(lock_path(upload), 'ab') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def validate_upload(field, filename, size):
+    """
+    Check the file type and size before any bytes are accepted
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in FIELD_RULES[field]['extensions']:
+        raise ValidationError({'filename': f'Unsupported file type "{extension}" for {field}.'})
+    if size <= 0:
+        raise ValidationError({'size': 'File is empty.'})
+    if size > max_file_size(field):
+        raise ValidationError({'size': f'{field} must be at most {max_file_size(field)} bytes.'})
+
+
+class _Hashers:
+    """
+    SHA-256 state of in-progress uploads in this process, keyed by upload
+    id. A missing or stale entry (another worker took the previous chunk,
+    or a restart) is rebuilt by hashing the partial file.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def get(self, upload_id, offset, path):
+        with self._lock:
+            state = self._states.pop(upload_id, None)
+        if state is not None and state[0] == offset:
+            return state[1]
+
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as partial:
+            remaining = offset
+            while remaining:
+                block = partial.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+        return hasher
+
+    def put(self, upload_id, offset, hasher):
+        with self._lock:
+            self._states[upload_id] = (offset, hasher)
+
+    def discard(self, upload_id):
+        with self._lock:
+            self._states.pop(upload_id, None)
+
+
+hashers = _Hashers()
+
+
+def start_upload(user, field, filename, size, checksum=''):
+    validate_upload(field, filename, size)
+    os.makedirs(temp_dir(), exist_ok=True)
+    upload = ProfileUpload.objects.create(
+        user=user, field=field, filename=os.path.basename(filename), size=size, checksum=checksum.lower()
+    )
+    open(partial_path(upload), 'wb').close()
+    return upload
+
+
+def sync_offset(upload):
+    """
+    Make the stored offset agree with the partial file, which is the
+    source of truth after a crash between claiming and appending a chunk.
+    Call with upload_lock() held, so no claimed chunk is still being
+    appended.
+    """
+    path = partial_path(upload)
+    try:
+        on_disk = os.path.getsize(path)
+    except FileNotFoundError:
+        os.makedirs(temp_dir(), exist_ok=True)
+        open(path, 'wb').close()
+        on_disk = 0
+    if on_disk != upload.offset:
+        if on_disk > upload.offset:
+            with open(path, 'r+b') as partial:
+                partial.truncate(upload.offset)
+        elif ProfileUpload.objects.filter(pk=upload.pk, offset=upload.offset).update(offset=on_disk):
+            upload.offset = on_disk
+        hashers.discard(upload.pk)
+    return upload.offset
+
+
+def write_chunk(upload, offset, stream, length):
+    """
+    Append ``length`` bytes read from ``stream`` at ``offset``. Returns the
+    updated profile when this chunk completes the upload, else None.
+    """
+    # fail fast on the loaded offset; it is checked again under the lock
+    if offset != upload.offset:
+        raise OffsetConflict(f'Upload is at offset {upload.offset}.')
+    if length > max_chunk_size():
+        raise ChunkTooLarge(f'Chunks must be at most {max_chunk_size()} bytes.')
+    if offset + length > upload.size:
+        raise ValidationError({'detail': 'Chunk extends past the declared upload size.'})
+
+    path = partial_path(upload)
+    piece_path = f'{path}.{uuid.uuid4().hex}'
+    try:
+        received = _receive(stream, length, piece_path)
+        if received != length:
+            raise ValidationError({'detail': f'Expected {length} bytes, received {received}.'})
+
+        with upload_lock(upload):
+            try:
+                upload.refresh_from_db()
+            except ProfileUpload.DoesNotExist:
+                raise NotFound('Upload no longer exists.')
+            sync_offset(upload)
+            if offset != upload.offset:
+                raise OffsetConflict(f'Upload is at offset {upload.offset}.')
+
+            claimed = ProfileUpload.objects.filter(pk=upload.pk, offset=offset).update(
+                offset=offset + length, update_at=timezone.now()
+            )
+            if not claimed:
+                raise OffsetConflict('Another chunk was written at this offset.')
+
+            hasher = hashers.get(upload.pk, offset, path)
+            with open(piece_path, 'rb') as piece, open(path, 'ab') as partial:
+                for block in iter(lambda: piece.read(BLOCK_SIZE), b''):
+                    hasher.update(block)
+                    partial.write(block)
+            upload.offset = offset + length
+
+            if upload.is_complete:
+                return complete_upload(upload, hasher)
+            hashers.put(upload.pk, upload.offset, hasher)
+            return None
+    finally:
+        if os.path.exists(piece_path):
+            os.remove(piece_path)
+
+
+def _receive(stream, length, piece_path):
+    received = 0
+    with open(piece_path, 'wb') as piece:
+        while received < length:
+            block = stream.read(min(BLOCK_SIZE, length - received))
+            if not block:
+                break
+            piece.write(block)
+            received += len(block)
+    return received
+
+
+def complete_upload(upload, hasher=None):
+    """
+    Verify the finished file, move it to its content-addressed name and
+    point the profile at it
+    """
+    path = partial_path(upload)
+    digest = (hasher or hashers.get(upload.pk, upload.offset, path)).hexdigest()
+    hashers.discard(upload.pk)
+    try:
+        if upload.checksum and upload.checksum != digest:
+            raise ValidationError({'checksum': 'Uploaded content does not match the declared SHA-256.'})
+        if upload.field == 'profile_picture':
+            _verify_image(path)
+        name = store_content(path, digest, upload.field, upload.filename)
+    except ValidationError:
+        discard_upload(upload)
+        raise
+
+    with transaction.atomic():
+        profile = JobSeeker.objects.select_for_update().get(user_id=upload.user_id)
+        setattr(profile, upload.field, name)
+        profile.save(update_fields=[upload.field, 'update_at'])
+        ProfileUpload.objects.filter(pk=upload.pk).delete()
+    _remove_lock_file(upload)
+    return profile
+
+
+def _verify_image(path):
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        raise ValidationError({'detail': 'Uploaded file is not a valid image.'})
+
+
+def content_name(digest, field, filename):
+    upload_to = JobSeeker._meta.get_field(field).upload_to
+    extension = os.path.splitext(filename)[1].lower()
+    return f'{upload_to}{digest[:2]}/{digest}{extension}'
+
+
+def store_content(path, digest, field, filename):
+    """
+    Move the partial file to its content-addressed name, or drop it when
+    identical content is already stored. Returns the storage name.
+    """
+    name = content_name(digest, field, filename)
+    if default_storage.exists(name):
+        os.remove(path)
+    elif isinstance(default_storage, FileSystemStorage):
+        target = default_storage.path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.chmod(path, 0o644)
+        # same filesystem as MEDIA_ROOT by default, so this is an atomic rename
+        os.replace(path, target)
+    else:
+        with open(path, 'rb') as partial:
+            name = default_storage.save(name, File(partial))
+        os.remove(path)
+    return name
+
+
+def _remove_lock_file(upload):
+    # a writer still waiting on the removed file finds the row gone
+    if os.path.exists(lock_path(upload)):
+        os.remove(lock_path(upload))
+
+
+def discard_upload(upload):
+    hashers.discard(upload.pk)
+    path = partial_path(upload)
+    if os.path.exists(path):
+        os.remove(path)
+    ProfileUpload.objects.filter(pk=upload.pk).delete()
+    _remove_lock_file(upload)
+
+
+def purge_stale_uploads(max_age=None):
+    """
+    Delete uploads that have not received a chunk for ``max_age`` (default
+    PROFILE_UPLOAD_EXPIRY seconds). Returns the number removed.
+    """
+    if max_age is None:
+        max_age = timedelta(seconds=getattr(settings, 'PROFILE_UPLOAD_EXPIRY', 24 * 60 * 60))
+    stale = ProfileUpload.objects.filter(update_at__lt=timezone.now() - max_age)
+    stale = list(stale)
+    for upload in stale:
+        discard_upload(upload)
+    return len(stale)
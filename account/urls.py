@@ -11,7 +11,9 @@ urlpatterns = [
     path('token/refresh', TokenRefreshView.as_view(), name='token_refresh'),
     
 #     Profile endpoint
-    path('profile', ProfileView.as_view(), name='profile'),
+    path('profile', AsyncProfileView.as_view(), name='profile'),
     path('profile/employer/', EmployerProfileView.as_view(), name='employer-profile'),
     path('profile/jobseeker/', JobSeekerProfileView.as_view(), name='jobseeker-profile'),
+    path('profile/jobseeker/uploads/', ProfileUploadCreateView.as_view(), name='profile-upload-create'),
+    path('profile/jobseeker/uploads/<uuid:pk>/', ProfileUploadView.as_view(), name='profile-upload'),
 ]
\ No newline at end of file
@@ -1,12 +1,18 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from django.urls import reverse
+from JobPortal.async_views import AsyncAPIView
+from JobPortal.conditional import make_etag, not_modified_response, set_validators
 from .serializers import *
 from .models import *
+from .identity import get_identity
 from .permissions import *
+from .tokens import IdentityRefreshToken
+from .uploads import discard_upload, max_chunk_size, start_upload, write_chunk
 
 User = get_user_model()
 
@@ -26,7 +32,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
         
         # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = IdentityRefreshToken.for_user(user)
         
         return Response({
             'user':UserSerializer(user).data,
@@ -46,9 +52,31 @@ class ProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
+        # loads the profile and the user together
+        profile = get_identity(request).profile
         user = request.user
+        etag = make_etag(
+            user.pk, user.email, user.user_type, user.is_active,
+            profile and (profile.pk, profile.update_at),
+        )
+        response = not_modified_response(request, etag)
+        if response is not None:
+            return response
+        
         serializer = UserSerializer(user, context={'request': request})
-        return Response(serializer.data)
+        return set_validators(Response(serializer.data), etag)
+
+
+class AsyncProfileView(AsyncAPIView, ProfileView):
+    """
+    ProfileView served natively under ASGI
+    """
+    
+    async def get(self, request):
+        # load the user and profile off the event loop; the sync handler
+        # then reads them from the request identity
+        await sync_to_async(get_identity(request).load)()
+        return super().get(request)
     
 
 class EmployerProfileView(generics.RetrieveUpdateAPIView):
@@ -61,21 +89,101 @@ class EmployerProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsEmployer]
     
     def get_object(self):
-        profile, created = Employer. objects.get_or_create(user=self.request.user)
+        profile = get_identity(self.request).profile
+        if profile is None:
+            profile, created = Employer.objects.get_or_create(user_id=self.request.user.pk)
         return profile
 
 
 class JobSeekerProfileView(generics.RetrieveUpdateAPIView):
     """
-    API endpoint for employer profile
-    GET: Retrieve employer profile
-    PUT/PATCH: Update employer profile
+    API endpoint for job seeker profile
+    GET: Retrieve job seeker profile
+    PUT/PATCH: Update job seeker profile
     """
     serializer_class = JobSeekerProfileSerializer
-    permission_classes = [permissions.IsAuthenticated, IsEmployer]
+    permission_classes = [permissions.IsAuthenticated, IsJobSeeker]
     
     def get_object(self):
-        profile, created = JobSeeker.objects.get_or_create(user=self.request.user)
+        profile = get_identity(self.request).profile
+        if profile is None:
+            profile, created = JobSeeker.objects.get_or_create(user_id=self.request.user.pk)
         return profile
  
-    
\ No newline at end of file
+    
+
+
+class ProfileUploadCreateView(generics.CreateAPIView):
+    """
+    API endpoint for job seeker to start a chunked, resumable file upload
+    POST: Declare the field (resume or profile_picture), filename, size
+    and optionally the SHA-256 checksum of the file
+    """
+    serializer_class = ProfileUploadSerializer
+    permission_classes = [permissions.IsAuthenticated, IsJobSeeker]
+    
+    def create(self, request, *args, **kwargs):
+        if get_identity(request).jobseeker_id is None:
+            return Response(
+                {'error': 'Job seeker profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = start_upload(request.user, **serializer.validated_data)
+        
+        data = ProfileUploadSerializer(upload).data
+        data['chunk_size'] = max_chunk_size()
+        location = reverse('account:profile-upload', args=[upload.pk])
+        return Response(data, status=status.HTTP_201_CREATED, headers={'Location': location})
+
+
+class ProfileUploadView(APIView):
+    """
+    API endpoint for job seeker to continue a chunked upload
+    GET/HEAD: Current offset to resume from (also in the Upload-Offset header)
+    PATCH: Append the raw request body at the offset given in the
+    Upload-Offset header; the last chunk stores the file on the profile
+    DELETE: Cancel the upload
+    """
+    permission_classes = [permissions.IsAuthenticated, IsJobSeeker]
+    
+    def get_upload(self, request, pk):
+        return generics.get_object_or_404(ProfileUpload, pk=pk, user_id=request.user.pk)
+    
+    def upload_response(self, upload, **extra):
+        data = ProfileUploadSerializer(upload).data
+        data.update(extra)
+        return Response(data, headers={'Upload-Offset': str(upload.offset), 'Upload-Length': str(upload.size)})
+    
+    def get(self, request, pk):
+        return self.upload_response(self.get_upload(request, pk))
+    
+    def patch(self, request, pk):
+        upload = self.get_upload(request, pk)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'Upload-Offset header is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length <= 0:
+            return Response(
+                {'error': 'Chunk is empty or has no Content-Length'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        profile = write_chunk(upload, offset, request.stream, length)
+        if profile is None:
+            return self.upload_response(upload)
+        return self.upload_response(upload, url=getattr(profile, upload.field).url)
+    
+    def delete(self, request, pk):
+        discard_upload(self.get_upload(request, pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import *
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'queue', 'status', 'priority', 'attempts', 'run_at', 'finished_at']
+    list_filter = ['status', 'queue', 'name']
+    search_fields = ['name', 'last_error']
+    date_hierarchy = 'created_at'
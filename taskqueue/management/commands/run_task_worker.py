@@ -0,0 +1,33 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from taskqueue.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Claim and run queued background tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues', help='Queue to serve (repeatable, default all)')
+        parser.add_argument('--concurrency', type=int, default=4, help='Tasks run at once')
+        parser.add_argument('--mode', choices=('threads', 'processes'), default='threads')
+        parser.add_argument('--poll-interval', type=float, help='Seconds between polls (default TASKQUEUE_POLL_INTERVAL)')
+        parser.add_argument('--burst', action='store_true', help='Exit once no due task is left')
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            queues=options['queues'],
+            concurrency=options['concurrency'],
+            mode=options['mode'],
+            poll_interval=options['poll_interval'],
+        )
+        # finish the running tasks before exiting
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        self.stdout.write(
+            f"Worker {worker.worker_id} running {worker.concurrency} {worker.mode} "
+            f"on {', '.join(worker.queues) if worker.queues else 'all queues'}"
+        )
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} tasks"))
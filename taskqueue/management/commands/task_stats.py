@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from taskqueue.metrics import queue_stats
+
+
+class Command(BaseCommand):
+    help = "Show background task queue depth and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print the raw figures as JSON')
+
+    def handle(self, *args, **options):
+        stats = queue_stats()
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        self.stdout.write(f"{'queue':<16}{'depth':>8}{'scheduled':>11}{'running':>9}{'failed':>8}{'oldest s':>10}")
+        for name, row in stats['queues'].items():
+            oldest = '-' if row['oldest_due_age'] is None else f"{row['oldest_due_age']:.1f}"
+            self.stdout.write(
+                f"{name:<16}{row['depth']:>8}{row['scheduled']:>11}{row['running']:>9}{row['failed']:>8}{oldest:>10}"
+            )
+        for label in ('wait_time', 'run_time'):
+            summary = stats[label]
+            if summary['count']:
+                self.stdout.write(
+                    f"{label}: p50 {summary['p50']:.3f}s p95 {summary['p95']:.3f}s "
+                    f"max {summary['max']:.3f}s over {summary['count']} tasks"
+                )
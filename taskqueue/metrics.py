@@ -0,0 +1,68 @@
+"""
+Queue depth and latency figures for the task queue
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import Task
+
+SAMPLE_SIZE = 1000
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _summary(seconds):
+    return {
+        'count': len(seconds),
+        'p50': percentile(seconds, 0.5),
+        'p95': percentile(seconds, 0.95),
+        'max': max(seconds) if seconds else None,
+    }
+
+
+def queue_stats(window=timedelta(hours=1)):
+    """
+    Per-queue counts of due, scheduled and running tasks, the age of the
+    oldest due task, and wait (due -> started) and run (started -> finished)
+    time percentiles in seconds over tasks that finished within ``window``
+    """
+    now = timezone.now()
+    since = now - window
+    due = Q(status=Task.QUEUED, run_at__lte=now)
+    rows = Task.objects.values('queue').annotate(
+        depth=Count('pk', filter=due),
+        scheduled=Count('pk', filter=Q(status=Task.QUEUED, run_at__gt=now)),
+        running=Count('pk', filter=Q(status=Task.RUNNING)),
+        succeeded=Count('pk', filter=Q(status=Task.SUCCEEDED, finished_at__gte=since)),
+        failed=Count('pk', filter=Q(status=Task.FAILED, finished_at__gte=since)),
+        oldest_due=Min('run_at', filter=due),
+    ).order_by('queue')
+
+    queues = {}
+    for row in rows:
+        queue = row.pop('queue')
+        oldest_due = row.pop('oldest_due')
+        row['oldest_due_age'] = round((now - oldest_due).total_seconds(), 3) if oldest_due else None
+        queues[queue] = row
+
+    finished = Task.objects.filter(
+        status__in=(Task.SUCCEEDED, Task.FAILED), finished_at__gte=since, started_at__isnull=False
+    ).order_by('-finished_at').values_list('run_at', 'started_at', 'finished_at')[:SAMPLE_SIZE]
+    wait_times, run_times = [], []
+    for run_at, started_at, finished_at in finished:
+        wait_times.append(max(0.0, (started_at - run_at).total_seconds()))
+        run_times.append((finished_at - started_at).total_seconds())
+
+    return {
+        'queues': queues,
+        'window_seconds': int(window.total_seconds()),
+        'wait_time': _summary(wait_times),
+        'run_time': _summary(run_times),
+    }
@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    A unit of background work, claimed and run by the task worker
+    """
+    
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    )
+    
+    name = models.CharField(max_length=200, help_text="Registered task name")
+    queue = models.CharField(max_length=50, default='default')
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now, help_text="Not run before this time")
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'task_queue'
+        verbose_name = "Task"
+        verbose_name_plural = "Tasks"
+        indexes = [
+            # claim query: due tasks of a queue by priority
+            models.Index(fields=['queue', 'status', 'run_at', 'priority'], name='task_queue_due_idx'),
+            models.Index(fields=['status', 'locked_until'], name='task_queue_lease_idx'),
+            models.Index(fields=['status', 'finished_at'], name='task_queue_finished_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} [{self.status}]"
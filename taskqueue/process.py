@@ -0,0 +1,24 @@
+"""
+Entry points of ``spawn`` process pool workers.
+
+Kept free of Django imports at module level: a spawned child unpickles
+these functions before django.setup() has run.
+"""
+
+
+def setup():
+    import django
+    django.setup()
+
+
+def run(task_id, worker_id):
+    from django.db import connections
+
+    from .models import Task
+    from .worker import execute
+
+    task = Task.objects.get(pk=task_id)
+    try:
+        return execute(task, worker_id)
+    finally:
+        connections.close_all()
@@ -0,0 +1,116 @@
+"""
+Database-backed background tasks.
+
+Functions decorated with @task are registered by name and queued with
+``func.enqueue(*args, **kwargs)``, which inserts a Task row in the default
+database. Because the row is written in the caller's transaction, a task
+enqueued inside ``transaction.atomic()`` only becomes visible to workers
+if that transaction commits. Arguments must be JSON serializable (pass
+primary keys, not model instances). ``manage.py run_task_worker`` claims
+and runs due tasks; see taskqueue.worker.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Task
+
+_registry = {}
+
+
+class TaskNotRegistered(KeyError):
+    pass
+
+
+def retry_delay(attempts, base=None, maximum=None):
+    """
+    Exponential backoff in seconds before retry number ``attempts``
+    """
+    base = base if base is not None else getattr(settings, 'TASKQUEUE_RETRY_BACKOFF', 10)
+    maximum = maximum if maximum is not None else getattr(settings, 'TASKQUEUE_RETRY_BACKOFF_MAX', 3600)
+    return min(maximum, base * 2 ** max(attempts - 1, 0))
+
+
+class TaskFunction:
+    """
+    A registered task. Calling it runs the function inline; enqueue()
+    schedules it for a worker.
+    """
+
+    def __init__(self, func, name, queue, priority, max_attempts, backoff):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.__doc__ = func.__doc__
+        self.__wrapped__ = func
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<task {self.name}>'
+
+    def retry_delay(self, attempts):
+        return retry_delay(attempts, base=self.backoff)
+
+    def enqueue(self, *args, **kwargs):
+        return self.enqueue_with(args=args, kwargs=kwargs)
+
+    def enqueue_with(self, args=(), kwargs=None, run_at=None, delay=None, priority=None, queue=None):
+        """
+        Queue a call with explicit options: ``run_at`` (datetime) or
+        ``delay`` (seconds or timedelta) to schedule it, and a ``priority``
+        or ``queue`` overriding the task's defaults
+        """
+        if delay is not None:
+            if not isinstance(delay, datetime.timedelta):
+                delay = datetime.timedelta(seconds=delay)
+            run_at = timezone.now() + delay
+        task = Task.objects.create(
+            name=self.name,
+            queue=queue or self.queue,
+            args=list(args),
+            kwargs=kwargs or {},
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_at=run_at or timezone.now(),
+        )
+        if getattr(settings, 'TASKQUEUE_EAGER', False):
+            from .worker import run_task
+            transaction.on_commit(lambda: run_task(task.pk, worker_id='eager'))
+        return task
+
+
+def task(func=None, *, name=None, queue='default', priority=0, max_attempts=3, backoff=None):
+    """
+    Register a function as a background task::
+
+        @task(priority=5)
+        def send_welcome_email(user_id):
+            ...
+
+        send_welcome_email.enqueue(user.pk)
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        registered = TaskFunction(func, task_name, queue, priority, max_attempts, backoff)
+        _registry[task_name] = registered
+        return registered
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise TaskNotRegistered(name) from None
+
+
+def registered_tasks():
+    return dict(_registry)
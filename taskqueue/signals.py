@@ -0,0 +1,9 @@
+"""
+Signals sent by task workers.
+"""
+from django.dispatch import Signal
+
+# Sent with ``worker`` on every housekeeping pass of a long-running worker
+# (at startup, then every TASKQUEUE_HOUSEKEEPING_INTERVAL seconds), so apps
+# can make sure their recurring tasks stay queued
+housekeeping = Signal()
@@ -0,0 +1,165 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from account.models import User
+from .metrics import queue_stats
+from .models import Task
+from .queue import task
+from .signals import housekeeping
+from .worker import Worker, claim_tasks, recover_expired_tasks, run_pending, run_task
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.flaky', max_attempts=2, backoff=30)
+def flaky():
+    calls.append('flaky')
+    raise RuntimeError('boom')
+
+
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_by_priority_then_due_time(self):
+        record.enqueue('low')
+        record.enqueue_with(args=['high'], priority=5)
+        record.enqueue_with(args=['later'], priority=9, delay=60)
+        record.enqueue('low-2')
+
+        self.assertEqual(run_pending(), 3)
+        self.assertEqual(calls, ['high', 'low', 'low-2'])
+        scheduled = Task.objects.get(status=Task.QUEUED)
+        self.assertEqual(scheduled.args, ['later'])
+
+        Task.objects.filter(pk=scheduled.pk).update(run_at=timezone.now())
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls[-1], 'later')
+        done = Task.objects.filter(status=Task.SUCCEEDED)
+        self.assertEqual(done.count(), 4)
+        self.assertFalse(done.exclude(locked_by='').exists())
+
+    def test_retries_with_backoff_then_fails(self):
+        queued = flaky.enqueue()
+        with self.assertLogs('taskqueue.worker', 'WARNING'):
+            self.assertEqual(run_pending(), 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Task.QUEUED, 1))
+        self.assertIn('RuntimeError: boom', queued.last_error)
+        self.assertAlmostEqual((queued.run_at - timezone.now()).total_seconds(), 30, delta=2)
+
+        # not due again until the backoff has passed
+        self.assertEqual(run_pending(), 0)
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        with self.assertLogs('taskqueue.worker', 'ERROR'):
+            run_pending()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, calls), (Task.FAILED, 2, ['flaky', 'flaky']))
+        self.assertIsNotNone(queued.finished_at)
+
+    def test_unknown_task_fails_without_retry(self):
+        Task.objects.create(name='tests.missing')
+        with self.assertLogs('taskqueue.worker', 'ERROR'):
+            run_pending()
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_claims_do_not_overlap(self):
+        for value in range(5):
+            record.enqueue(value)
+        first = claim_tasks('worker-a', limit=3)
+        second = claim_tasks('worker-b', limit=3)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({t.pk for t in first} & {t.pk for t in second})
+        self.assertEqual(claim_tasks('worker-c'), [])
+        self.assertIsNone(run_task(first[0].pk))
+
+    def test_expired_lease_is_requeued(self):
+        retried, exhausted = record.enqueue('retried'), record.enqueue('exhausted')
+        Task.objects.filter(pk=exhausted.pk).update(max_attempts=1)
+        claim_tasks('dead-worker', limit=2)
+        self.assertEqual(recover_expired_tasks(), 0)
+
+        Task.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(recover_expired_tasks(), 2)
+        self.assertEqual(Task.objects.get(pk=exhausted.pk).status, Task.FAILED)
+        self.assertEqual(run_pending(), 1)
+        retried.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts, calls), (Task.SUCCEEDED, 2, ['retried']))
+
+    def test_enqueue_rolls_back_with_transaction(self):
+        try:
+            with transaction.atomic():
+                record.enqueue('lost')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKQUEUE_EAGER=True)
+    def test_eager_runs_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queued = record.enqueue('eager')
+        self.assertEqual(calls, ['eager'])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.SUCCEEDED)
+
+    def test_stats(self):
+        record.enqueue('done')
+        run_pending()
+        record.enqueue('waiting')
+        record.enqueue_with(args=['later'], delay=60)
+        Task.objects.create(name='tests.record', queue='mail', args=['x'])
+
+        stats = queue_stats()
+        self.assertEqual(stats['queues']['default'], {
+            'depth': 1, 'scheduled': 1, 'running': 0, 'succeeded': 1, 'failed': 0,
+            'oldest_due_age': stats['queues']['default']['oldest_due_age'],
+        })
+        self.assertGreaterEqual(stats['queues']['default']['oldest_due_age'], 0)
+        self.assertEqual(stats['queues']['mail']['depth'], 1)
+        self.assertEqual(stats['run_time']['count'], 1)
+
+        client = APIClient()
+        url = reverse('tasks:task-stats')
+        client.force_authenticate(User.objects.create_user(email='user@example.com', password='password123'))
+        self.assertEqual(client.get(url).status_code, 403)
+        client.force_authenticate(User.objects.create_superuser(email='admin@example.com', password='password123'))
+        self.assertEqual(client.get(url).data['queues']['mail']['depth'], 1)
+
+
+class WorkerTests(TransactionTestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_burst_worker_runs_tasks_in_threads(self):
+        for value in range(6):
+            record.enqueue(value)
+        processed = Worker(concurrency=3, poll_interval=0.01).run(burst=True)
+        self.assertEqual(processed, 6)
+        self.assertEqual(sorted(calls), list(range(6)))
+        self.assertEqual(Task.objects.filter(status=Task.SUCCEEDED).count(), 6)
+
+    def test_long_running_worker_sends_housekeeping(self):
+        def stop(sender, worker, **kwargs):
+            calls.append('housekeeping')
+            worker.stop()
+
+        housekeeping.connect(stop)
+        self.addCleanup(housekeeping.disconnect, stop)
+        Worker(poll_interval=0.01).run(burst=True)
+        self.assertEqual(calls, [])
+        Worker(poll_interval=0.01).run()
+        self.assertEqual(calls, ['housekeeping'])
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import *
+
+app_name = 'tasks'
+
+urlpatterns = [
+    path('stats/', TaskQueueStatsView.as_view(), name='task-stats'),
+]
@@ -0,0 +1,16 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import queue_stats
+
+
+class TaskQueueStatsView(APIView):
+    """
+    API endpoint for staff to watch the background task queue
+    GET: Depth per queue and wait/run time percentiles of recent tasks
+    """
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        return Response(queue_stats())
@@ -0,0 +1,269 @@
+"""
+Claiming and running queued tasks.
+
+A worker claims due tasks in priority order with a conditional UPDATE from
+queued to running, inside a transaction that locks the candidate rows with
+``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it, so
+concurrent workers never run the same task. A claimed task carries a lease
+(``locked_until``) that the worker renews while the task runs; tasks whose
+lease expired (the worker died) are put back on the queue by any worker.
+A failing task is retried with exponential backoff until it has used
+``max_attempts``. Long-running workers send taskqueue.signals.housekeeping
+with their periodic maintenance, which apps use to keep recurring tasks
+queued.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+import uuid
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import process
+from .models import Task
+from .queue import TaskNotRegistered, get_task
+from .signals import housekeeping
+
+logger = logging.getLogger(__name__)
+
+
+def lease_duration():
+    return timedelta(seconds=getattr(settings, 'TASKQUEUE_LEASE', 300))
+
+
+def make_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def claim_tasks(worker_id, queues=None, limit=1):
+    """
+    Mark up to ``limit`` due tasks as running for this worker and return them
+    """
+    now = timezone.now()
+    # without row locks (SQLite) the status condition of the UPDATE alone
+    # keeps claims exclusive, and a read-then-write transaction there would
+    # fail on the lock upgrade instead of waiting
+    locking = connection.features.has_select_for_update
+    with transaction.atomic() if locking else nullcontext():
+        due = Task.objects.filter(status=Task.QUEUED, run_at__lte=now)
+        if locking:
+            due = due.select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+        if queues:
+            due = due.filter(queue__in=queues)
+        ids = list(due.order_by('-priority', 'run_at', 'id').values_list('pk', flat=True)[:limit])
+        if not ids:
+            return []
+        Task.objects.filter(pk__in=ids, status=Task.QUEUED).update(
+            status=Task.RUNNING,
+            locked_by=worker_id,
+            locked_until=now + lease_duration(),
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+    claimed = Task.objects.filter(pk__in=ids, status=Task.RUNNING, locked_by=worker_id)
+    return list(claimed.order_by('-priority', 'run_at', 'id'))
+
+
+def renew_leases(worker_id, task_ids):
+    return Task.objects.filter(pk__in=task_ids, status=Task.RUNNING, locked_by=worker_id).update(
+        locked_until=timezone.now() + lease_duration()
+    )
+
+
+def recover_expired_tasks():
+    """
+    Requeue running tasks whose lease ran out, or fail them when they have
+    no attempts left. Returns the number of tasks recovered.
+    """
+    now = timezone.now()
+    expired = Task.objects.filter(status=Task.RUNNING, locked_until__lt=now)
+    released = dict(locked_by='', locked_until=None, last_error='Worker lease expired')
+    failed = expired.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished_at=now, **released
+    )
+    requeued = expired.filter(attempts__lt=F('max_attempts')).update(status=Task.QUEUED, run_at=now, **released)
+    return failed + requeued
+
+
+def purge_finished_tasks(max_age=None):
+    """
+    Delete succeeded tasks older than ``max_age`` (default TASKQUEUE_RETENTION
+    seconds). Failed tasks are kept for inspection.
+    """
+    if max_age is None:
+        max_age = timedelta(seconds=getattr(settings, 'TASKQUEUE_RETENTION', 7 * 24 * 60 * 60))
+    deleted, _ = Task.objects.filter(status=Task.SUCCEEDED, finished_at__lt=timezone.now() - max_age).delete()
+    return deleted
+
+
+def execute(task, worker_id):
+    """
+    Run a task claimed by this worker and record the outcome. Returns the
+    resulting status.
+    """
+    mine = Task.objects.filter(pk=task.pk, status=Task.RUNNING, locked_by=worker_id)
+    released = dict(locked_by='', locked_until=None)
+    try:
+        function = get_task(task.name)
+        function(*task.args, **task.kwargs)
+    except Exception as exc:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if isinstance(exc, TaskNotRegistered) or task.attempts >= task.max_attempts:
+            logger.error("Task %s (%s) failed after %s attempts", task.pk, task.name, task.attempts, exc_info=True)
+            mine.update(status=Task.FAILED, finished_at=now, last_error=error, **released)
+            return Task.FAILED
+        delay = function.retry_delay(task.attempts)
+        logger.warning("Task %s (%s) failed, retrying in %ss", task.pk, task.name, delay, exc_info=True)
+        mine.update(status=Task.QUEUED, run_at=now + timedelta(seconds=delay), last_error=error, **released)
+        return Task.QUEUED
+    mine.update(status=Task.SUCCEEDED, finished_at=timezone.now(), last_error='', **released)
+    return Task.SUCCEEDED
+
+
+def run_task(task_id, worker_id=None):
+    """
+    Claim and run one specific queued task now, whether or not it is due
+    """
+    worker_id = worker_id or make_worker_id()
+    claimed = Task.objects.filter(pk=task_id, status=Task.QUEUED).update(
+        status=Task.RUNNING,
+        locked_by=worker_id,
+        locked_until=timezone.now() + lease_duration(),
+        started_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return None
+    return execute(Task.objects.get(pk=task_id), worker_id)
+
+
+def run_pending(queues=None, worker_id=None, limit=None):
+    """
+    Run due tasks one at a time in this thread until none are left (or
+    ``limit`` have run). Returns the number of tasks run.
+    """
+    worker_id = worker_id or make_worker_id()
+    count = 0
+    while limit is None or count < limit:
+        tasks = claim_tasks(worker_id, queues, limit=1)
+        if not tasks:
+            break
+        execute(tasks[0], worker_id)
+        count += 1
+    return count
+
+
+def _run_in_thread(task, worker_id):
+    try:
+        return execute(task, worker_id)
+    finally:
+        # each pool thread has its own connections
+        connections.close_all()
+
+
+class Worker:
+    """
+    Polls for due tasks and runs up to ``concurrency`` of them at once in a
+    thread or process pool
+    """
+
+    def __init__(self, queues=None, concurrency=1, mode='threads', poll_interval=None, worker_id=None):
+        if mode not in ('threads', 'processes'):
+            raise ValueError(f'Unknown worker mode "{mode}"')
+        self.queues = queues
+        self.concurrency = concurrency
+        self.mode = mode
+        self.poll_interval = poll_interval or getattr(settings, 'TASKQUEUE_POLL_INTERVAL', 1.0)
+        self.worker_id = worker_id or make_worker_id()
+        self.housekeeping_interval = getattr(settings, 'TASKQUEUE_HOUSEKEEPING_INTERVAL', 60)
+        self._stopping = threading.Event()
+
+    def stop(self, *args):
+        """
+        Finish the running tasks and exit; usable as a signal handler
+        """
+        self._stopping.set()
+
+    def make_pool(self):
+        if self.mode == 'processes':
+            return ProcessPoolExecutor(
+                max_workers=self.concurrency, mp_context=get_context('spawn'), initializer=process.setup
+            )
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='task-worker')
+
+    def submit(self, pool, task):
+        if self.mode == 'processes':
+            return pool.submit(process.run, task.pk, self.worker_id)
+        return pool.submit(_run_in_thread, task, self.worker_id)
+
+    def send_housekeeping(self):
+        for receiver, result in housekeeping.send_robust(sender=self.__class__, worker=self):
+            if isinstance(result, Exception):
+                logger.error("Housekeeping receiver %r failed", receiver, exc_info=result)
+
+    def run(self, burst=False):
+        """
+        Process tasks until stopped, or, with ``burst``, until no due task
+        is left. Returns the number of tasks run.
+        """
+        in_flight = {}
+        processed = 0
+        last_housekeeping = None
+        pool = self.make_pool()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    now = timezone.now()
+                    if last_housekeeping is None or (now - last_housekeeping).total_seconds() >= self.housekeeping_interval:
+                        recover_expired_tasks()
+                        purge_finished_tasks()
+                        if not burst:
+                            self.send_housekeeping()
+                        last_housekeeping = now
+
+                    free = self.concurrency - len(in_flight)
+                    claimed = claim_tasks(self.worker_id, self.queues, limit=free) if free else []
+                    if in_flight:
+                        renew_leases(self.worker_id, list(in_flight.values()))
+                except DatabaseError:
+                    # e.g. a locked SQLite database; try again on the next poll
+                    logger.warning("Task worker could not reach the queue", exc_info=True)
+                    claimed, busy = [], True
+                else:
+                    busy = False
+
+                try:
+                    for task in claimed:
+                        in_flight[self.submit(pool, task)] = task.pk
+                except BrokenProcessPool:
+                    # a child died; unsubmitted claims are requeued once their lease expires
+                    logger.error("Process pool broke, starting a new one")
+                    pool.shutdown(wait=False)
+                    pool = self.make_pool()
+                if burst and not in_flight and not busy:
+                    break
+
+                if in_flight:
+                    done, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task_id = in_flight.pop(future)
+                        processed += 1
+                        if future.exception() is not None:
+                            logger.error("Task %s crashed the worker", task_id, exc_info=future.exception())
+                elif not claimed:
+                    self._stopping.wait(self.poll_interval)
+        finally:
+            pool.shutdown(wait=True)
+            processed += len(in_flight)
+        return processed